@@ -0,0 +1,106 @@
+# Aho-Corasick multi-pattern matcher for lexicon substring checks
+
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Automaton that finds every occurrence of a set of patterns in a single pass over the text.
+
+    Matching has substring semantics, exactly like checking `pattern in text` for each pattern,
+    but costs O(len(text) + number of matches) instead of O(len(patterns) * len(text)).
+    The automaton is built once per lexicon and can be reused for any number of texts.
+    """
+
+    def __init__(self, patterns):
+        """
+        :param patterns: Iterable of patterns (e.g. lexicon words or emojis).
+        """
+        self.patterns = []
+        self.goto = [{}]  # Trie transitions of each state
+        self.fail = [0]  # Failure link of each state
+        self.outputs = [[]]  # Indexes of the patterns ending at each state (including via failure links)
+        self.matches_empty = False
+
+        for pattern in dict.fromkeys(patterns):
+            if not pattern:
+                # The empty string is a substring of every text
+                self.matches_empty = True
+                continue
+            self.add_pattern(pattern)
+        self.build_failure_links()
+
+    def add_pattern(self, pattern):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def build_failure_links(self):
+        # Breadth-first traversal so the failure state of each node is processed before the node
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail_state = self.fail[state]
+                while fail_state and char not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.goto[fail_state].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def iter_matches(self, text):
+        """
+        Yield (start_index, pattern) for every occurrence of every pattern in the text, ordered by end index.
+        """
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        patterns = self.patterns
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_index in outputs[state]:
+                pattern = patterns[pattern_index]
+                yield index - len(pattern) + 1, pattern
+
+    def contains_any(self, text):
+        """
+        Return True if any pattern occurs in the text (same as `any(pattern in text for pattern in patterns)`).
+        """
+        if self.matches_empty:
+            return True
+        for _ in self.iter_matches(text):
+            return True
+        return False
+
+    def find_patterns(self, text):
+        """
+        Return the set of distinct patterns that occur in the text.
+        """
+        found = {pattern for _, pattern in self.iter_matches(text)}
+        if self.matches_empty:
+            found.add('')
+        return found
+
+
+def main():
+    matcher = AhoCorasick(["سعيد", "رائع", "سعيدة", "😊"])
+    tweet = "أنا سعيدة جدا اليوم 😊"
+    print(f"Tweet: {tweet}")
+    print(f"Contains any: {matcher.contains_any(tweet)}")
+    print(f"Matches: {list(matcher.iter_matches(tweet))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,20 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import time  # For measuring execution time
 from datetime import datetime  # For capturing start and end date-time
-from EmojiSentimentScoreCalculator import calculate_sentiment_scores
-from TextPreprocessor import TextPreprocessor
-from SentimentFeatureExtractor import SentimentFeatureExtractor
-from EmojiCounter import count_emojis
-from EmoSLArabicTweets import EmoSLArabicTweets
+from PipelineWorker import PipelineWorker
+from VirtualTable import ColumnStore, VirtualTable
 from Configuration import Configuration 
 
 
-# Example sentiment lexicons
-SENTIMENT_LEXICON =  Configuration.fetch_setting(Configuration.SheetName.sentiment_lexicon)
-EMOJI_SENTIMENT_LEXICON =  Configuration.fetch_setting(Configuration.SheetName.emoji_sentiment_lexicon)
-
- 
 # Create the main window
 class EmoSLApp:
-    def __init__(self, root):
+    def __init__(self, root, bundle=None):
         self.root = root
+        self.bundle = bundle  # Directory of a ModelBundle the pipeline starts from (None reads the xlsx and txt files)
         self.root.title("Emo-SL Framework: Emoji Sentiment Lexicon")
         self.root.geometry("1000x600")  # Set window size
         self.root.resizable(True, True)  # Allow resizing of the window
+        self.worker = None  # Background PipelineWorker of the current load
         self.create_widgets()
 
     def create_widgets(self):
@@ -34,8 +28,8 @@ class EmoSLApp:
         self.tweets = Configuration.fetch_tweets()
 
         # Create buttons to load and clear content
-        load_button = tk.Button(self.root, text="Load Tweets", command=self.confirm_load_tweets, font=("Helvetica", 14))
-        load_button.pack(pady=10)
+        self.load_button = tk.Button(self.root, text="Load Tweets", command=self.confirm_load_tweets, font=("Helvetica", 14))
+        self.load_button.pack(pady=10)
 
         clear_button = tk.Button(self.root, text="Clear Content", command=self.confirm_clear_content, font=("Helvetica", 14))
         clear_button.pack(pady=10)
@@ -44,6 +38,16 @@ class EmoSLApp:
         self.status_label = tk.Label(self.root, text="Action: Idle, Start Time: N/A, End Time: N/A, Time: 0.00 seconds", font=("Helvetica", 12))
         self.status_label.pack(pady=10)
 
+        # Progress bar, throughput readout and cancel button of the background load
+        progress_frame = tk.Frame(self.root)
+        progress_frame.pack(fill="x", padx=20)
+        self.progress_bar = ttk.Progressbar(progress_frame, orient="horizontal", mode="determinate")
+        self.progress_bar.pack(side="left", fill="x", expand=True)
+        self.progress_label = tk.Label(progress_frame, text="0 / 0 tweets, 0.0 tweets/sec", font=("Helvetica", 12))
+        self.progress_label.pack(side="left", padx=10)
+        self.cancel_button = tk.Button(progress_frame, text="Cancel", command=self.cancel_load, font=("Helvetica", 12), state=tk.DISABLED)
+        self.cancel_button.pack(side="left")
+
         # Display the tweets in a table (initially empty)
         self.create_tweet_table()
 
@@ -52,9 +56,13 @@ class EmoSLApp:
         frame = tk.Frame(self.root)
         frame.pack(fill="both", expand=True, pady=20)
 
+        # Results are kept column by column; the table only materializes the visible rows
+        self.results = ColumnStore(("tweet", "processed_text", "feature_vector", "positive_emojis", "negative_emojis", "sentiment"))
+
         # Create a Treeview widget for the tweet table with 7 columns (including the new row number column)
         columns = ("Row", "Tweet", "Algorithm 1 Output", "Algorithm 2 Output", "Algorithm 3 Output", "Algorithm 4 Output", "Algorithm 5 Output")
-        self.tree = ttk.Treeview(frame, columns=columns, show="headings", height=20)  # Increase height for more rows
+        self.table = VirtualTable(frame, columns, self.results, self.format_row, height=20, item_tags=("multiline",))  # Increase height for more rows
+        self.tree = self.table.tree
 
         # Define the columns for the Treeview
         self.tree.heading("Row", text="Row")
@@ -72,17 +80,8 @@ class EmoSLApp:
         # Enable multiline wrapping for "Tweet" column
         self.tree.tag_configure("multiline", font=("Helvetica", 12), anchor="w")
 
-        # Create scrollbars
-        v_scroll = tk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
-        h_scroll = tk.Scrollbar(frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scroll.set, xscrollcommand=h_scroll.set)
-
-        # Place the scrollbars
-        v_scroll.pack(side="right", fill="y")
-        h_scroll.pack(side="bottom", fill="x")
-
-        # Place the Treeview in the frame
-        self.tree.pack(fill="both", expand=True)
+        # Place the Treeview and its scrollbars in the frame
+        self.table.pack(fill="both", expand=True)
 
     def confirm_load_tweets(self):
         # Ask for confirmation before loading tweets
@@ -92,117 +91,61 @@ class EmoSLApp:
 
     def load_tweets(self):
         # Capture start time and update the label
-        start_time = time.time()
-        start_datetime = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        self.status_label.config(text=f"Action: Loading Tweets, Start Time: {start_datetime}, Time: 0.00 seconds")
+        self.start_time = time.time()
+        self.start_datetime = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.status_label.config(text=f"Action: Loading Tweets, Start Time: {self.start_datetime}, Time: 0.00 seconds")
 
         # Clear the existing content in the table
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        extractor = SentimentFeatureExtractor()
-        total_positive_emojis = {}
-        total_negative_emojis = {}
-
-        # Add tweets and their corresponding algorithm outputs to the table
-        for i, tweet in enumerate(self.tweets): 
-            algorithm_1_output = self.analyze_sentiment(tweet)  # Placeholder for Algorithm 1 output
-            algorithm_2_output = self.analyze_sentiment(tweet)  # Placeholder for Algorithm 2 output
-            algorithm_3_output = self.analyze_sentiment(tweet)  # Placeholder for Algorithm 3 output
-            algorithm_4_output = self.analyze_sentiment(tweet)  # Placeholder for Algorithm 4 output
-            algorithm_5_output = self.analyze_sentiment(tweet)  # Placeholder for Algorithm 5 output
-
-            # Preprocess the tweet text
-            # Algorithm 1 Enhanced Preprocess Arabic Tweets for Sentiment Analysis
-            processed_text = TextPreprocessor.preprocess_text(tweet)
-
-            # Algorithm 2 Feature Extraction for Sentiment Analysis 
-            feature_vector = extractor.extract_features_from_tweet(processed_text)
-            
-            # Algorithm 3 Counting Emoji Occurrences
-            # Use the output from Feature Extraction (Algorithm 2) for Emoji Counting (Algorithm 3)
-            positive_emojis, negative_emojis = count_emojis(feature_vector, extractor)
-
-            # Aggregate positive emojis
-            for emoji, count in positive_emojis.items():
-                if emoji in total_positive_emojis:
-                    total_positive_emojis[emoji] += count
-                else:
-                    total_positive_emojis[emoji] = count
-
-            # Aggregate negative emojis
-            for emoji, count in negative_emojis.items():
-                if emoji in total_negative_emojis:
-                    total_negative_emojis[emoji] += count
-                else:
-                    total_negative_emojis[emoji] = count
-
-            # Algorithm 4 Calculating Emoji Sentiment Scores
-            # Calculate sentiment scores
-            emoji_sentiment_scores = calculate_sentiment_scores(total_positive_emojis, total_negative_emojis)
-
-            # Print results
-            print("Emoji Sentiment Scores (One-Line Format):")
-            for emoji, score in emoji_sentiment_scores.items():
-                print(f"{emoji}: {score:.2f}")
-
-            print("\nEmoji Sentiment Scores (Detailed):")
-            print(emoji_sentiment_scores)
-
-            # Algorithm 5 Emo-SL for Arabic Tweets Algorithm
-            # Example lexicons
-            # Example lexicons
-            positive_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.positive_lexicon)
-            negative_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.negative_lexicon)
-            
-            # Example tweets
-            tweets = Configuration.fetch_tweets()
-            
-            # Example emojis
-            emojis = set(Configuration.fetch_data_from_file(Configuration.FileName.emojis))
-            
-            # Instantiate EmoSL for Arabic Sentiment Analysis
-            emosl = EmoSLArabicTweets(positive_lexicon, negative_lexicon)
-
-            # Step 1: Preprocess the tweets
-            preprocessed_tweets = emosl.preprocess_data(tweets)
-            
-            # Step 2: Build the Emoji Sentiment Lexicon
-            emosl.build_emo_sl(preprocessed_tweets, emojis)
-            
-            # Step 3: Extract features
-            features = emosl.extract_features(preprocessed_tweets, emojis)
-            
-            # Step 4: Classify sentiments
-            sentiment_results = emosl.classify_sentiments(preprocessed_tweets, features)
-            
-            # Step 5: Apply VADER analysis (mocked)
-            vader_scores = emosl.analyze_tweets_with_vader(preprocessed_tweets)
-            
-            # Print results
-            print("Sentiment Classification Results:", sentiment_results)
-            print("VADER Sentiment Scores (mocked):", vader_scores)
-
-
-
-            # Insert tweet and its outputs as multiline text in the table
-            self.tree.insert("", "end", values=(i+1, tweet, 
-                                                processed_text, 
-                                                feature_vector.to_one_line(), 
-                                                f"Positive Emojis Count: {positive_emojis}, Negative Emojis Count: {negative_emojis}"
-                                                , algorithm_4_output, algorithm_5_output), tags=("multiline",))
-
-
-
-
+        self.table.clear()
+
+        # Run the pipeline in a background thread; Algorithm 5 runs once over the whole corpus at the end
+        self.worker = PipelineWorker(self.tweets, finish=lambda pipeline, tweets: pipeline.run_emo_sl(tweets),
+                                     bundle=self.bundle)
+        self.progress_bar.config(maximum=max(self.worker.total_count, 1), value=0)
+        self.load_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.worker.start()
+        self.worker.poll(self.root, self.insert_results, self.load_finished, self.load_cancelled, self.load_failed)
+
+    def insert_results(self, results):
+        # Batches still queued when the load was cancelled (or the table cleared) are dropped
+        if self.worker.cancel_event.is_set():
+            return
+
+        # Store a batch of tweets and their algorithm outputs, then redraw the visible rows
+        for tweet, processed_text, feature_vector, positive_emojis, negative_emojis in results:
+            # Placeholder for Algorithm 4 and 5 outputs
+            self.results.append(tweet, processed_text, feature_vector, positive_emojis, negative_emojis, self.analyze_sentiment(tweet))
+        self.table.refresh()
+        self.update_progress()
+
+    def format_row(self, index, row):
+        # Display values of a stored row: tweet and its outputs as multiline text
+        tweet, processed_text, feature_vector, positive_emojis, negative_emojis, placeholder_output = row
+        return (index + 1, tweet,
+                processed_text,
+                feature_vector.to_one_line(),
+                f"Positive Emojis Count: {positive_emojis}, Negative Emojis Count: {negative_emojis}"
+                , placeholder_output, placeholder_output)
+
+    def update_progress(self):
+        self.progress_bar.config(value=self.worker.processed_count)
+        self.progress_label.config(text=f"{self.worker.processed_count} / {self.worker.total_count} tweets, "
+                                        f"{self.worker.tweets_per_second():.1f} tweets/sec")
+
+    def load_finished(self, pipeline, summary):
+        # Algorithm 5 Emo-SL for Arabic Tweets Algorithm results
+        sentiment_results, vader_scores = summary
+        print("Sentiment Classification Results:", sentiment_results)
+        print("VADER Sentiment Scores (mocked):", vader_scores)
 
         # Display total counts
         print("\nFinal Aggregated Emoji Counts:")
-        print(f"Total Positive Emojis Count: {total_positive_emojis}")
-        print(f"Total Negative Emojis Count: {total_negative_emojis}")
-        
-        # Calculate sentiment scores
-        emoji_sentiment_scores = calculate_sentiment_scores(positive_emojis, negative_emojis)
+        print(f"Total Positive Emojis Count: {pipeline.total_positive_emojis}")
+        print(f"Total Negative Emojis Count: {pipeline.total_negative_emojis}")
+
+        # Algorithm 4 Calculating Emoji Sentiment Scores (over the totals)
+        emoji_sentiment_scores = pipeline.emoji_sentiment_scores
 
         # Print results
         print("Emoji Sentiment Scores (One-Line Format):")
@@ -212,11 +155,31 @@ class EmoSLApp:
         print("\nEmoji Sentiment Scores (Detailed):")
         print(emoji_sentiment_scores)
 
+        self.end_load("Loaded Tweets")
+
+    def load_cancelled(self, processed_count):
+        self.end_load(f"Cancelled after {processed_count} Tweets")
+
+    def load_failed(self, error):
+        messagebox.showerror("Load Failed", f"An error occurred: {error}")
+        self.end_load("Load Failed")
+
+    def end_load(self, action):
+        self.update_progress()
+        self.load_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+
         # Capture end time and calculate execution time
         end_time = time.time()
         end_datetime = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        execution_time = round(end_time - start_time, 2)
-        self.status_label.config(text=f"Action: Loaded Tweets, Start Time: {start_datetime}, End Time: {end_datetime}, Time: {execution_time} seconds")
+        execution_time = round(end_time - self.start_time, 2)
+        self.status_label.config(text=f"Action: {action}, Start Time: {self.start_datetime}, End Time: {end_datetime}, Time: {execution_time} seconds")
+
+    def cancel_load(self):
+        # Ask the background worker to stop after the current tweet
+        if self.worker and self.worker.is_running():
+            self.worker.cancel()
+            self.cancel_button.config(state=tk.DISABLED)
 
     def confirm_clear_content(self):
         # Ask for confirmation before clearing the table
@@ -225,14 +188,16 @@ class EmoSLApp:
             self.clear_content()
 
     def clear_content(self):
+        # Stop a load that is still running
+        self.cancel_load()
+
         # Capture start time and update the label
         start_time = time.time()
         start_datetime = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         self.status_label.config(text=f"Action: Clearing Content, Start Time: {start_datetime}, Time: 0.00 seconds")
 
         # Clear the content in the table
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.table.clear()
 
         # Capture end time and calculate execution time
         end_time = time.time()
@@ -247,10 +212,14 @@ class EmoSLApp:
 
 
 # Run the application
-def main():
+def main(bundle=None):
     root = tk.Tk()
-    app = EmoSLApp(root)
+    app = EmoSLApp(root, bundle)
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the Emoji Sentiment Lexicon of the tweets.")
+    parser.add_argument('--bundle', default=None, help="Directory of a ModelBundle")
+    main(parser.parse_args().bundle)
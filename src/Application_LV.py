@@ -1,70 +1,248 @@
+import os
+import time
+from collections import deque
+
+from BatchProcessor import process_chunks
 from Configuration import Configuration
-from EmoSLArabicTweets import EmoSLArabicTweets
-from EmojiCounter import count_emojis
+from EmoSLArabicTweets import EmoSLArabicTweets, EmoSLLexiconBuilder
+from EmojiCounter import merge_emoji_counts
 from EmojiSentimentScoreCalculator import calculate_sentiment_scores
-from Excel_Helper import ExcelHelper
-from SentimentFeatureExtractor import SentimentFeatureExtractor
-from TextPreprocessor import TextPreprocessor
-
-
-def main():
-    # Create an instance of the ExcelHelper class
-    excel_helper = ExcelHelper()
-
-    # Sample tweets 
-    tweets = Configuration.fetch_tweets()
-    extractor = SentimentFeatureExtractor()
-
-    total_positive_emojis = {}
-    total_negative_emojis = {}
-   # Process each tweet
-    for tweet in tweets:
-        # Algorithm 1 Enhanced Preprocess Arabic Tweets for Sentiment Analysis
-        processed_text = TextPreprocessor.preprocess_text(tweet)
-  
-        # Extract features from the tweet using SentimentFeatureExtractor
-        feature_vector = extractor.extract_features_from_tweet(processed_text) 
-  
-        # Algorithm 3 Counting Emoji Occurrences
-        # Use the output from Feature Extraction (Algorithm 2) for Emoji Counting (Algorithm 3)
-        positive_emojis, negative_emojis = count_emojis(feature_vector, extractor)
- 
-        # Aggregate positive emojis
-        for emoji, count in positive_emojis.items():
-            if emoji in total_positive_emojis:
-                total_positive_emojis[emoji] += count
-            else:
-                total_positive_emojis[emoji] = count
-
-        # Aggregate negative emojis
-        for emoji, count in negative_emojis.items():
-            if emoji in total_negative_emojis:
-                total_negative_emojis[emoji] += count
-            else:
-                total_negative_emojis[emoji] = count
-    
+from ReportSinks import create_sink
+from TweetReader import TweetReader
+
+
+def main(file_name=Configuration.FileName.tweets, chunk_size=Configuration.Ingestion.chunk_size, workers=None,
+         report_format='xlsx', near_duplicate_threshold=None, classifier=None, bundle=None, journal=None,
+         checkpoint_interval=Configuration.Checkpoint.interval, sketch=False, final=False):
+    """
+    Run the full pipeline and write the report.
+
+    :param file_name: Input file (see TweetReader for the supported formats).
+    :param chunk_size: Number of tweets per chunk.
+    :param workers: Number of worker processes for Algorithms 1 to 3 (None or 1 runs sequentially, 0 uses all cores).
+    :param report_format: Report backend: 'xlsx', 'parquet', 'arrow' or 'csv' (see ReportSinks).
+    :param near_duplicate_threshold: Collapse near-duplicate tweets onto one scored representative when
+                                     their MinHash similarity reaches this value (e.g. 0.8, None disables it;
+                                     see NearDuplicateIndex).
+    :param classifier: Trained SentimentClassifier used by Algorithm 5 (None keeps the rule-based one,
+                       or the bundle's classifier).
+    :param bundle: Directory of a ModelBundle to start from: the resources are memory-mapped instead of
+                   parsed, and Algorithm 5 uses the bundle's Emoji Sentiment Lexicon instead of learning
+                   one from the input (None reads the xlsx and txt files).
+    :param journal: Directory of a CheckpointJournal (e.g. Configuration.FileName.checkpoints) to make the
+                    run resumable and incremental, see run_journaled (None runs without checkpoints).
+    :param checkpoint_interval: Seconds between two checkpoints of a journaled run.
+    :param sketch: Aggregate the emoji counts of Algorithm 3 in fixed-memory EmojiSketch objects: the
+                   report then lists the Configuration.Sketch.top_k most frequent emojis with
+                   estimated counts (False keeps exact, unbounded dictionaries).
+    :param final: The input of a journaled run is complete: also process a last line without a
+                  terminating newline, which is otherwise left for the next run since it may still
+                  be being written.
+    """
+    if journal is not None:
+        return run_journaled(file_name, chunk_size, workers, report_format, near_duplicate_threshold,
+                             classifier, bundle, journal, checkpoint_interval, sketch, final)
+
+    # Create the report writer (rows are streamed to the report as they are produced)
+    report_sink = create_sink(report_format)
+
+    if sketch:
+        from EmojiSketch import EmojiSketch
+
+        total_positive_emojis = EmojiSketch()
+        total_negative_emojis = EmojiSketch()
+    else:
+        total_positive_emojis = {}
+        total_negative_emojis = {}
+    cache_hits = cache_misses = near_duplicates = 0
+    # Stream the tweets in chunks and run Algorithms 1 to 3 on each chunk
+    chunks = TweetReader.iter_chunks(file_name, chunk_size)
+    for rows, positive_emojis, negative_emojis, chunk_stats in process_chunks(chunks, workers, near_duplicate_threshold, bundle):
+        cache_hits += chunk_stats['cache_hits']
+        cache_misses += chunk_stats['cache_misses']
+        near_duplicates += chunk_stats['near_duplicates']
+
+        # Aggregate the chunk's positive and negative emojis
+        merge_emoji_counts(total_positive_emojis, positive_emojis)
+        merge_emoji_counts(total_negative_emojis, negative_emojis)
+
         # Append new data
-        excel_helper.append_data([tweet, 
-                                  processed_text, 
-                                  feature_vector.positive_words_count, 
-                                  feature_vector.negative_words_count,
-                                  feature_vector.positive_emojis_count,
-                                  feature_vector.negative_emojis_count,
-                                  feature_vector.total_emojis_count,
-                                  feature_vector.positive_score,
-                                  feature_vector.negative_score,
-                                  feature_vector.emojis,
-                                  feature_vector.sentiment,
-                                  positive_emojis,
-                                  negative_emojis ])
+        for row in rows:
+            report_sink.append_data(row)
+
+    print_stats(cache_hits, cache_misses, near_duplicates, near_duplicate_threshold)
+    write_emoji_scores(report_sink, total_positive_emojis, total_negative_emojis)
+
+    emosl, emojis, builder = create_emosl(classifier, bundle)
+    if builder is not None:
+        # Step 1 and 2: Preprocess the streamed tweets and accumulate the Emoji Sentiment Lexicon counts
+        for chunk in TweetReader.iter_chunks(file_name, chunk_size):
+            builder.update(emosl.preprocess_data(chunk))
+        emosl.emoji_sentiment_lexicon.update(builder.finalize())
+
+    write_sentiments(report_sink, emosl, emojis, TweetReader.iter_chunks(file_name, chunk_size))
+
+
+def run_journaled(file_name, chunk_size, workers, report_format, near_duplicate_threshold, classifier, bundle,
+                  journal, checkpoint_interval=Configuration.Checkpoint.interval, sketch=False, final=False):
+    """
+    Run the pipeline with a CheckpointJournal (see main for the parameters).
+
+    Algorithms 1 to 3 and Steps 1 and 2 of Algorithm 5 run in a single pass that starts at the
+    journal's input offset: after a crash the run resumes from the last checkpoint, and when
+    lines were appended to the input since the last run only they are processed and folded
+    into the journaled aggregates. Every checkpoint_interval seconds, the report rows are
+    flushed to a new segment and the offset, the emoji counters and the Emoji Sentiment
+    Lexicon counts are saved. Only complete lines are processed (see final), so a run started
+    while the input is being appended to never splits a tweet.
+
+    The report is then written from the journal. Steps 3 to 5 depend on the Emoji Sentiment
+    Lexicon learned from the whole input, so they run again over every journaled tweet.
+    """
+    from CheckpointJournal import CheckpointJournal
+
+    emosl, emojis, builder = create_emosl(classifier, bundle)
+    settings = journal_settings(file_name, near_duplicate_threshold, bundle, sketch)
+    journal = CheckpointJournal.open(file_name, journal, settings, sketch)
+    if builder is not None and journal.emosl_counts:
+        builder.merge(EmoSLLexiconBuilder.from_dict(journal.emosl_counts))
+    if journal.offset:
+        print(f"Resuming '{file_name}' at byte {journal.offset} ({journal.tweet_count} tweets already processed).")
+
+    # Chunks handed to process_chunks with their end offsets (the results come back in input order)
+    pending = deque()
+
+    def read_chunks():
+        for chunk, end_offset in TweetReader.iter_chunks_from(file_name, journal.offset, chunk_size=chunk_size,
+                                                              partial_tail=final):
+            pending.append((chunk, end_offset))
+            yield chunk
+
+    new_tweets = 0
+    offset = journal.offset
+    last_checkpoint = time.monotonic()
+    for rows, positive_emojis, negative_emojis, chunk_stats in process_chunks(read_chunks(), workers, near_duplicate_threshold, bundle):
+        chunk, offset = pending.popleft()
+        if builder is not None:
+            # Step 1 and 2: Accumulate the Emoji Sentiment Lexicon counts in the same pass
+            builder.update(emosl.preprocess_data(chunk))
+        new_tweets += len(chunk)
+        journal.tweet_count += len(chunk)
+        for key, value in chunk_stats.items():
+            journal.stats[key] += value
+        merge_emoji_counts(journal.total_positive_emojis, positive_emojis)
+        merge_emoji_counts(journal.total_negative_emojis, negative_emojis)
+        journal.append_rows(rows)
+
+        if time.monotonic() - last_checkpoint >= checkpoint_interval:
+            journal.checkpoint(file_name, offset, builder)
+            last_checkpoint = time.monotonic()
+
+    if offset != journal.offset:
+        journal.checkpoint(file_name, offset, builder)
+    if not new_tweets:
+        print(f"No new tweets in '{file_name}' since the last checkpoint.")
+    if not final and has_data_after(file_name, journal.offset):
+        print(f"The last line of '{file_name}' has no terminating newline yet, it is left for the next run "
+              f"(pass final=True or --final if the input is complete).")
+    print(f"Checkpoint journal: {journal.tweet_count} tweets ({new_tweets} new) up to byte {journal.offset}")
+
+    stats = journal.stats
+    print_stats(stats['cache_hits'], stats['cache_misses'], stats['near_duplicates'], near_duplicate_threshold)
+
+    report_sink = create_sink(report_format)
+    for row in journal.iter_rows():
+        report_sink.append_data(row)
+    write_emoji_scores(report_sink, journal.total_positive_emojis, journal.total_negative_emojis)
+
+    if builder is not None:
+        emosl.emoji_sentiment_lexicon.update(builder.finalize())
+    chunks = (chunk for chunk, _ in TweetReader.iter_chunks_from(file_name, end_offset=journal.offset, chunk_size=chunk_size))
+    write_sentiments(report_sink, emosl, emojis, chunks)
+
 
+def has_data_after(file_name, offset):
+    """
+    Return True if the (decompressed) input has bytes after offset.
+    """
+    try:
+        with TweetReader.open_binary(file_name) as file:
+            file.seek(offset)
+            return bool(file.read(1))
+    except FileNotFoundError:
+        return False
+
+
+def journal_settings(file_name, near_duplicate_threshold, bundle, sketch=False):
+    """
+    Return the settings the journaled results depend on: a journal written with other settings is not resumed.
+    """
+    if bundle is None:
+        from LexiconCache import LexiconCache
+        from TweetCache import TweetCache
+
+        positive_lexicon = Configuration.FileName.positive_lexicon
+        resources = [TweetCache.lexicon_version(),
+                     LexiconCache.file_hash(positive_lexicon) if os.path.exists(positive_lexicon) else None]
+    else:
+        from ModelBundle import ModelBundle
+        resources = ModelBundle.load(bundle).version
+    return {
+        'input': os.path.abspath(file_name),
+        'file_format': TweetReader.detect_format(file_name),
+        'text_field': Configuration.Ingestion.text_field,
+        'near_duplicate_threshold': near_duplicate_threshold,
+        'sketch': [Configuration.Sketch.epsilon, Configuration.Sketch.delta, Configuration.Sketch.top_k,
+                   Configuration.Sketch.seed] if sketch else None,
+        'resources': resources,
+    }
+
+
+def create_emosl(classifier=None, bundle=None):
+    """
+    Instantiate EmoSL for Arabic Sentiment Analysis.
+
+    :return: Tuple (emosl, emojis, builder) where builder is the EmoSLLexiconBuilder to learn the
+             Emoji Sentiment Lexicon with, or None when it comes from the bundle.
+    """
+    if bundle is None:
+        # Example lexicons
+        positive_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.positive_lexicon)
+        negative_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.negative_lexicon)
+
+        # Example emojis
+        emojis = set(Configuration.fetch_data_from_file(Configuration.FileName.emojis))
+
+        emosl = EmoSLArabicTweets(positive_lexicon, negative_lexicon, classifier)
+        return emosl, emojis, EmoSLLexiconBuilder(positive_lexicon, emojis)
+
+    # Step 1 and 2 were done when the bundle was built
+    from ModelBundle import ModelBundle
+
+    model_bundle = ModelBundle.load(bundle)
+    emosl = model_bundle.create_emosl()
+    if classifier is not None:
+        emosl.classifier = classifier
+    return emosl, set(model_bundle.emojis), None
+
+
+def print_stats(cache_hits, cache_misses, near_duplicates, near_duplicate_threshold):
+    # Duplicated tweets served from the memoization cache
+    if cache_hits + cache_misses:
+        print(f"Tweet cache: {cache_hits} hits, {cache_misses} misses, "
+              f"hit rate {cache_hits / (cache_hits + cache_misses):.1%}")
+    if near_duplicate_threshold:
+        print(f"Near-duplicates: {near_duplicates} tweets scored through their cluster representative")
+
+
+def write_emoji_scores(report_sink, total_positive_emojis, total_negative_emojis):
     # Print all total_positive_emojis 
     for emoji, count in total_positive_emojis.items():
-        excel_helper.append_positive_emojis(emoji, count)
+        report_sink.append_positive_emojis(emoji, count)
 
     # Print all total_negative_emojis
     for emoji, count in total_negative_emojis.items():
-        excel_helper.append_negative_emojis(emoji, count)
+        report_sink.append_negative_emojis(emoji, count)
 
 
 
@@ -74,49 +252,53 @@ def main():
 
     # Print results 
     for emoji, score in emoji_sentiment_scores.items():
-        excel_helper.append_emoji_sentiment_score(emoji, score)
+        report_sink.append_emoji_sentiment_score(emoji, score)
 
-    
 
+def write_sentiments(report_sink, emosl, emojis, chunks):
+    # Step 3 to 5: Extract features, classify sentiments and apply VADER analysis (mocked) chunk by chunk
+    sentiment_results = emosl.sentiment_results
+    vader_scores = {}
+    for chunk in chunks:
+        preprocessed_tweets = emosl.preprocess_data(chunk)
+        features = emosl.extract_features(preprocessed_tweets, emojis)
+        emosl.classify_sentiments(preprocessed_tweets, features)
+        vader_scores.update(emosl.analyze_tweets_with_vader(preprocessed_tweets))
 
-    # Example lexicons
-    positive_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.positive_lexicon)
-    negative_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.negative_lexicon)
-    
-    # Example emojis
-    emojis = set(Configuration.fetch_data_from_file(Configuration.FileName.emojis))
-    
-     
-    
-    # Instantiate EmoSL for Arabic Sentiment Analysis
-    emosl = EmoSLArabicTweets(positive_lexicon, negative_lexicon)
-
-    # Step 1: Preprocess the tweets
-    preprocessed_tweets = emosl.preprocess_data(tweets)
-    
-    # Step 2: Build the Emoji Sentiment Lexicon
-    emosl.build_emo_sl(preprocessed_tweets, emojis)
-    
-    # Step 3: Extract features
-    features = emosl.extract_features(preprocessed_tweets, emojis)
-    
-    # Step 4: Classify sentiments
-    sentiment_results = emosl.classify_sentiments(preprocessed_tweets, features)
-    
-    # Step 5: Apply VADER analysis (mocked)
-    vader_scores = emosl.analyze_tweets_with_vader(preprocessed_tweets)
-     
     # Print all Sentiment Classification Results
     for word, sentiment in sentiment_results.items():
-        excel_helper.append_sentiment_classification_result(word, sentiment)
+        report_sink.append_sentiment_classification_result(word, sentiment)
 
     
     # Print all VADER Sentiment Scores
     for word, score in vader_scores.items():
-        excel_helper.append_vader_sentiment_score(word, score)   
+        report_sink.append_vader_sentiment_score(word, score)   
+
+    # Finish the report
+    report_sink.close()
 
-    # Create the Excel file
-    excel_helper.create_excel()
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the Emo-SL pipeline over a tweets file and write the report.")
+    parser.add_argument('file_name', nargs='?', default=Configuration.FileName.tweets)
+    parser.add_argument('--chunk-size', type=int, default=Configuration.Ingestion.chunk_size)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--format', default='xlsx', choices=('xlsx', 'parquet', 'arrow', 'csv'))
+    parser.add_argument('--bundle', default=None, help="Directory of a ModelBundle")
+    parser.add_argument('--journal', nargs='?', const=Configuration.FileName.checkpoints, default=None,
+                        help="Directory of the checkpoint journal that makes the run resumable and incremental")
+    parser.add_argument('--checkpoint-interval', type=float, default=Configuration.Checkpoint.interval)
+    parser.add_argument('--final', action='store_true',
+                        help="The journaled input is complete: also process a last line without a newline")
+    parser.add_argument('--sketch', action='store_true',
+                        help="Count the emojis in fixed-memory Count-Min and Space-Saving sketches")
+    parser.add_argument('--near-duplicate-threshold', type=float, default=None,
+                        help="Score near-duplicate tweets (estimated Jaccard similarity at least this) "
+                             "through their cluster representative")
+    args = parser.parse_args()
+
+    main(args.file_name, args.chunk_size, args.workers, args.format, args.near_duplicate_threshold, bundle=args.bundle,
+         journal=args.journal, checkpoint_interval=args.checkpoint_interval, sketch=args.sketch,
+         final=args.final)
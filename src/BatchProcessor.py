@@ -0,0 +1,219 @@
+# Parallel batch execution of Algorithms 1 to 3 for Application_LV
+
+import os
+from collections import deque
+
+from EmojiCounter import count_emojis, merge_emoji_counts
+from SentimentFeatureExtractor import SentimentFeatureExtractor
+from TextPreprocessor import PreprocessorPipeline
+from TweetCache import TweetCache
+
+# Per-process pipeline state, created once by init_worker
+_preprocessor = None
+_extractor = None
+_cache = None
+_near_duplicates = None
+_bundle = None
+
+
+def init_worker(near_duplicate_threshold=None, bundle=None):
+    """
+    Load the preprocessing resources, the SentimentFeatureExtractor lexicons, the
+    memoization cache and the optional near-duplicate index once per process.
+
+    :param near_duplicate_threshold: MinHash similarity above which a tweet reuses the features
+                                     of its cluster representative (None disables the index).
+    :param bundle: Directory of a ModelBundle to load the resources from (None reads the xlsx and txt files).
+    """
+    global _preprocessor, _extractor, _cache, _near_duplicates, _bundle
+    if bundle is None:
+        _preprocessor = PreprocessorPipeline()
+        _extractor = SentimentFeatureExtractor()
+        _cache = TweetCache()
+    else:
+        from ModelBundle import ModelBundle
+
+        model_bundle = ModelBundle.load(bundle)
+        _preprocessor = model_bundle.create_preprocessor()
+        _extractor = model_bundle.create_extractor()
+        _cache = model_bundle.create_cache()
+    _bundle = bundle
+    if near_duplicate_threshold:
+        from NearDuplicateIndex import NearDuplicateIndex
+        _near_duplicates = NearDuplicateIndex(near_duplicate_threshold)
+    else:
+        _near_duplicates = None
+
+
+def ensure_worker(near_duplicate_threshold=None, bundle=None):
+    """
+    Load the pipeline in a new process, or again when the near-duplicate setting or the bundle changed.
+    """
+    if (_extractor is None or bundle != _bundle
+            or near_duplicate_threshold != (_near_duplicates.threshold if _near_duplicates else None)):
+        init_worker(near_duplicate_threshold, bundle)
+
+
+def process_tweet(tweet):
+    """
+    Run Algorithms 1 to 3 on a tweet.
+
+    :return: Tuple (processed_text, feature_vector, positive_emojis, negative_emojis).
+    """
+    # Algorithm 1 Enhanced Preprocess Arabic Tweets for Sentiment Analysis
+    processed_text = _preprocessor.preprocess_text(tweet)
+
+    # Algorithm 2 Feature Extraction for Sentiment Analysis
+    feature_vector = _extractor.extract_features_from_tweet(processed_text)
+
+    # Algorithm 3 Counting Emoji Occurrences
+    positive_emojis, negative_emojis = count_emojis(feature_vector, _extractor)
+    return processed_text, feature_vector, positive_emojis, negative_emojis
+
+
+def process_near_duplicates(tweets):
+    """
+    Run Algorithms 1 to 3 on a chunk of tweets, scoring near-duplicates through their cluster
+    representative. Algorithm 1 runs first for every tweet missing from the cache, so the
+    MinHash signatures of the chunk are computed in one vectorized pass.
+
+    :return: List of (processed_text, feature_vector, positive_emojis, negative_emojis) tuples.
+    """
+    # Exact repeats of a tweet scored in this chunk are served from the cache once it is scored,
+    # or share the result of its first occurrence when that one was collapsed
+    results = [None] * len(tweets)
+    first_indexes = {}
+    repeats = []
+    for index, tweet in enumerate(tweets):
+        if tweet in first_indexes:
+            repeats.append(index)
+        else:
+            results[index] = _cache.get(tweet)
+            if results[index] is None:
+                first_indexes[tweet] = index
+    missing = list(first_indexes.values())
+
+    # Algorithm 1 Enhanced Preprocess Arabic Tweets for Sentiment Analysis
+    processed_texts = [_preprocessor.preprocess_text(tweets[index]) for index in missing]
+    signatures, band_keys = _near_duplicates.sketch(processed_texts)
+
+    for index, processed_text, signature, keys in zip(missing, processed_texts, signatures, band_keys):
+        cluster_id, representative = _near_duplicates.assign_sketch(signature, keys)
+        if representative is None:
+            # Algorithm 2 Feature Extraction for Sentiment Analysis
+            feature_vector = _extractor.extract_features_from_tweet(processed_text)
+
+            # Algorithm 3 Counting Emoji Occurrences
+            positive_emojis, negative_emojis = count_emojis(feature_vector, _extractor)
+
+            representative = (feature_vector, positive_emojis, negative_emojis)
+            _near_duplicates.set_payload(cluster_id, representative)
+            results[index] = (processed_text,) + representative
+            # Only exact results go to the cache, never the representative's features of a collapsed tweet
+            _cache.put(tweets[index], results[index])
+        else:
+            results[index] = (processed_text,) + representative
+
+    for index in repeats:
+        results[index] = _cache.get(tweets[index]) or results[first_indexes[tweets[index]]]
+    return results
+
+
+def process_chunk(tweets, near_duplicate_threshold=None, bundle=None):
+    """
+    Run Algorithms 1 to 3 on a chunk of tweets. Repeated tweets are served from the
+    process's TweetCache, and with a near_duplicate_threshold near-duplicate tweets are
+    collapsed onto their cluster representative (see NearDuplicateIndex).
+
+    :param tweets: List of raw tweets.
+    :param near_duplicate_threshold: See init_worker.
+    :param bundle: See init_worker.
+    :return: Tuple (rows, positive_emojis, negative_emojis, chunk_stats) where rows are the report
+             rows for ExcelHelper.append_data, the emoji dictionaries are the chunk's partial counts
+             and chunk_stats counts the chunk's cache hits, cache misses and collapsed near-duplicates.
+    """
+    ensure_worker(near_duplicate_threshold, bundle)
+
+    rows = []
+    chunk_positive_emojis = {}
+    chunk_negative_emojis = {}
+    hits, misses = _cache.hits, _cache.misses
+    collapsed = _near_duplicates.collapsed_count if _near_duplicates else 0
+
+    # Algorithms 1 to 3, memoized on the raw tweet
+    if _near_duplicates is None:
+        results = [_cache.get_or_compute(tweet, process_tweet) for tweet in tweets]
+    else:
+        results = process_near_duplicates(tweets)
+
+    for tweet, (processed_text, feature_vector, positive_emojis, negative_emojis) in zip(tweets, results):
+        merge_emoji_counts(chunk_positive_emojis, positive_emojis)
+        merge_emoji_counts(chunk_negative_emojis, negative_emojis)
+
+        rows.append([tweet,
+                     processed_text,
+                     feature_vector.positive_words_count,
+                     feature_vector.negative_words_count,
+                     feature_vector.positive_emojis_count,
+                     feature_vector.negative_emojis_count,
+                     feature_vector.total_emojis_count,
+                     feature_vector.positive_score,
+                     feature_vector.negative_score,
+                     feature_vector.emojis,
+                     feature_vector.sentiment,
+                     positive_emojis,
+                     negative_emojis])
+    chunk_stats = {
+        'cache_hits': _cache.hits - hits,
+        'cache_misses': _cache.misses - misses,
+        'near_duplicates': (_near_duplicates.collapsed_count if _near_duplicates else 0) - collapsed,
+    }
+    return rows, chunk_positive_emojis, chunk_negative_emojis, chunk_stats
+
+
+def process_batch(tweets, bundle=None):
+    """
+    Run Algorithms 1 and 2 on a batch of tweets (e.g. a micro-batch of the ScoringServer),
+    serving repeated tweets from the process's TweetCache.
+
+    :param tweets: List of raw tweets.
+    :param bundle: See init_worker.
+    :return: List of (processed_text, feature_vector) tuples.
+    """
+    ensure_worker(None, bundle)
+    return [_cache.get_or_compute(tweet, process_tweet)[:2] for tweet in tweets]
+
+
+def process_chunks(chunks, workers=None, near_duplicate_threshold=None, bundle=None):
+    """
+    Process chunks of tweets, in parallel when workers > 1.
+
+    Results are yielded in input order, so merging them gives exactly the same output as a
+    sequential run. At most two chunks per worker are in flight, which keeps memory bounded
+    when the chunks are streamed from a large file.
+
+    :param chunks: Iterable of lists of tweets (e.g. TweetReader.iter_chunks).
+    :param workers: Number of worker processes (None or 1 runs in this process, 0 uses all cores).
+    :param near_duplicate_threshold: See init_worker (each worker process has its own index).
+    :param bundle: See init_worker (the workers share the bundle's memory-mapped arrays).
+    :return: Generator of (rows, positive_emojis, negative_emojis, chunk_stats) tuples.
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if not workers or workers == 1:
+        for chunk in chunks:
+            yield process_chunk(chunk, near_duplicate_threshold, bundle)
+        return
+
+    # multiprocessing is only imported by parallel runs
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(near_duplicate_threshold, bundle)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(process_chunk, chunk, near_duplicate_threshold, bundle))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,318 @@
+# Benchmark suite: throughput and latency of Algorithms 1 to 5 and of the report export
+
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+from Configuration import Configuration
+from EmoSLArabicTweets import EmoSLArabicTweets
+from EmojiCounter import count_emojis, merge_emoji_counts
+from EmojiSentimentScoreCalculator import calculate_sentiment_scores
+from ReportSinks import create_sink
+from SentimentFeatureExtractor import SentimentFeatureExtractor
+from TextPreprocessor import PreprocessorPipeline
+from TweetGenerator import TweetGenerator
+
+
+class Benchmark:
+    """
+    Time each stage of the pipeline over a corpus of tweets.
+
+    Per-tweet stages (Algorithms 1 to 3) are timed call by call, so their p50/p99 are per-tweet
+    latencies. Corpus-level stages (Algorithm 4 over the totals, Algorithm 5 and the report
+    export) are timed run by run over `repeats` runs. Throughput is always in tweets per second.
+    """
+
+    def __init__(self, tweets, repeats=3, report_format='xlsx', warmup=100):
+        """
+        :param tweets: List of tweets to benchmark.
+        :param repeats: Number of runs of the corpus-level stages.
+        :param report_format: Report backend timed by the report export stage (see ReportSinks).
+        :param warmup: Number of tweets run through the per-tweet stages before timing.
+        """
+        self.tweets = tweets
+        self.repeats = repeats
+        self.report_format = report_format
+        self.warmup = warmup
+        self.preprocessor = PreprocessorPipeline()
+        self.extractor = SentimentFeatureExtractor()
+        self.positive_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.positive_lexicon)
+        self.negative_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.negative_lexicon)
+        self.emojis = set(Configuration.fetch_data_from_file(Configuration.FileName.emojis))
+
+    @staticmethod
+    def percentile(sorted_values, q):
+        """
+        Nearest-rank percentile of a sorted list (q between 0 and 100).
+        """
+        if not sorted_values:
+            return 0
+        rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+        return sorted_values[rank - 1]
+
+    @staticmethod
+    def summarize(latencies_ns, tweet_count, unit):
+        """
+        Statistics of a stage from its latencies in nanoseconds.
+
+        :param tweet_count: Number of tweets processed over all the latencies.
+        :param unit: What one latency measures ('tweet' or 'run').
+        """
+        latencies_ns = sorted(latencies_ns)
+        seconds = sum(latencies_ns) / 1e9
+        return {
+            'unit': unit,
+            'samples': len(latencies_ns),
+            'tweets': tweet_count,
+            'seconds': round(seconds, 6),
+            'throughput': round(tweet_count / seconds, 2) if seconds > 0 else 0.0,
+            'p50_ms': round(Benchmark.percentile(latencies_ns, 50) / 1e6, 6),
+            'p99_ms': round(Benchmark.percentile(latencies_ns, 99) / 1e6, 6),
+        }
+
+    def time_per_tweet(self, function, inputs):
+        """
+        Call function on every input, timing each call.
+
+        :return: Tuple (outputs, latencies in nanoseconds).
+        """
+        for value in inputs[:self.warmup]:
+            function(value)
+        clock = time.perf_counter_ns
+        outputs = []
+        latencies = []
+        for value in inputs:
+            start = clock()
+            output = function(value)
+            latencies.append(clock() - start)
+            outputs.append(output)
+        return outputs, latencies
+
+    def time_per_run(self, function):
+        """
+        Call function `repeats` times, timing each run.
+        """
+        latencies = []
+        for _ in range(self.repeats):
+            start = time.perf_counter_ns()
+            function()
+            latencies.append(time.perf_counter_ns() - start)
+        return latencies
+
+    def run_emo_sl(self):
+        emosl = EmoSLArabicTweets(self.positive_lexicon, self.negative_lexicon)
+        preprocessed_tweets = emosl.preprocess_data(self.tweets)
+        emosl.build_emo_sl(preprocessed_tweets, self.emojis)
+        features = emosl.extract_features(preprocessed_tweets, self.emojis)
+        sentiment_results = emosl.classify_sentiments(preprocessed_tweets, features)
+        vader_scores = emosl.analyze_tweets_with_vader(preprocessed_tweets)
+        return sentiment_results, vader_scores
+
+    def export_report(self, rows, total_positive_emojis, total_negative_emojis, emoji_sentiment_scores,
+                      sentiment_results, vader_scores):
+        # Write the full report to a temporary folder (the sink's messages are silenced)
+        with tempfile.TemporaryDirectory() as folder:
+            output_path = os.path.join(folder, 'report.xlsx') if self.report_format == 'xlsx' else folder
+            with contextlib.redirect_stdout(io.StringIO()):
+                report_sink = create_sink(self.report_format, output_path)
+                for row in rows:
+                    report_sink.append_data(row)
+                for emoji, count in total_positive_emojis.items():
+                    report_sink.append_positive_emojis(emoji, count)
+                for emoji, count in total_negative_emojis.items():
+                    report_sink.append_negative_emojis(emoji, count)
+                for emoji, score in emoji_sentiment_scores.items():
+                    report_sink.append_emoji_sentiment_score(emoji, score)
+                for word, sentiment in sentiment_results.items():
+                    report_sink.append_sentiment_classification_result(word, sentiment)
+                for word, score in vader_scores.items():
+                    report_sink.append_vader_sentiment_score(word, score)
+                report_sink.close()
+
+    def run(self):
+        """
+        Run every stage.
+
+        :return: Dictionary with the run's metadata and the statistics of each stage.
+        """
+        tweet_count = len(self.tweets)
+        stages = {}
+
+        # Algorithm 1 Enhanced Preprocess Arabic Tweets for Sentiment Analysis
+        processed_texts, latencies = self.time_per_tweet(self.preprocessor.preprocess_text, self.tweets)
+        stages['algorithm_1_preprocess'] = self.summarize(latencies, tweet_count, 'tweet')
+
+        # Algorithm 2 Feature Extraction for Sentiment Analysis
+        feature_vectors, latencies = self.time_per_tweet(self.extractor.extract_features_from_tweet, processed_texts)
+        stages['algorithm_2_feature_extraction'] = self.summarize(latencies, tweet_count, 'tweet')
+
+        # Algorithm 3 Counting Emoji Occurrences
+        emoji_counts, latencies = self.time_per_tweet(
+            lambda feature_vector: count_emojis(feature_vector, self.extractor), feature_vectors)
+        stages['algorithm_3_count_emojis'] = self.summarize(latencies, tweet_count, 'tweet')
+
+        total_positive_emojis = {}
+        total_negative_emojis = {}
+        for positive_emojis, negative_emojis in emoji_counts:
+            merge_emoji_counts(total_positive_emojis, positive_emojis)
+            merge_emoji_counts(total_negative_emojis, negative_emojis)
+
+        # Algorithm 4 Calculating Emoji Sentiment Scores over the corpus totals
+        latencies = self.time_per_run(lambda: calculate_sentiment_scores(total_positive_emojis, total_negative_emojis))
+        stages['algorithm_4_sentiment_scores'] = self.summarize(latencies, tweet_count * self.repeats, 'run')
+        emoji_sentiment_scores = calculate_sentiment_scores(total_positive_emojis, total_negative_emojis)
+
+        # Algorithm 5 Emo-SL for Arabic Tweets Algorithm
+        latencies = self.time_per_run(self.run_emo_sl)
+        stages['algorithm_5_emo_sl'] = self.summarize(latencies, tweet_count * self.repeats, 'run')
+        sentiment_results, vader_scores = self.run_emo_sl()
+
+        # Report export
+        rows = []
+        for tweet, processed_text, feature_vector, (positive_emojis, negative_emojis) in zip(
+                self.tweets, processed_texts, feature_vectors, emoji_counts):
+            rows.append([tweet, processed_text, feature_vector.positive_words_count,
+                         feature_vector.negative_words_count, feature_vector.positive_emojis_count,
+                         feature_vector.negative_emojis_count, feature_vector.total_emojis_count,
+                         feature_vector.positive_score, feature_vector.negative_score, feature_vector.emojis,
+                         feature_vector.sentiment, positive_emojis, negative_emojis])
+        latencies = self.time_per_run(lambda: self.export_report(
+            rows, total_positive_emojis, total_negative_emojis, emoji_sentiment_scores, sentiment_results, vader_scores))
+        stages['report_export'] = self.summarize(latencies, tweet_count * self.repeats, 'run')
+
+        return {
+            'meta': {
+                'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'tweets': tweet_count,
+                'repeats': self.repeats,
+                'report_format': self.report_format,
+            },
+            'stages': stages,
+        }
+
+    @staticmethod
+    def compare(results, baseline, tolerance=0.25, p99_tolerance=0.5):
+        """
+        Flag the stages that got slower than the baseline.
+
+        A stage regresses when its throughput drops by more than tolerance, its p50 latency grows
+        by more than tolerance or its p99 latency (noisier) grows by more than p99_tolerance.
+
+        :return: List of regression messages (empty when nothing regressed).
+        """
+        regressions = []
+        for stage, stats in results['stages'].items():
+            base = baseline.get('stages', {}).get(stage)
+            if not base:
+                continue
+            if base['throughput'] and stats['throughput'] < base['throughput'] * (1 - tolerance):
+                regressions.append(f"{stage}: throughput {stats['throughput']:.1f} tweets/sec, "
+                                   f"baseline {base['throughput']:.1f} tweets/sec")
+            if base['p50_ms'] and stats['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+                regressions.append(f"{stage}: p50 {stats['p50_ms']:.4f} ms, baseline {base['p50_ms']:.4f} ms")
+            if base['p99_ms'] and stats['p99_ms'] > base['p99_ms'] * (1 + p99_tolerance):
+                regressions.append(f"{stage}: p99 {stats['p99_ms']:.4f} ms, baseline {base['p99_ms']:.4f} ms")
+        return regressions
+
+    @staticmethod
+    def save(results, file_name):
+        folder = os.path.dirname(file_name)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(file_name, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+
+    @staticmethod
+    def load(file_name):
+        with open(file_name, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    @staticmethod
+    def print_results(results):
+        print(f"{'Stage':<32}{'Unit':>6}{'Tweets/sec':>14}{'p50 ms':>12}{'p99 ms':>12}")
+        for stage, stats in results['stages'].items():
+            print(f"{stage:<32}{stats['unit']:>6}{stats['throughput']:>14.1f}{stats['p50_ms']:>12.4f}{stats['p99_ms']:>12.4f}")
+
+
+def main(tweet_count=10000, source='synthetic', seed=0, repeats=3, report_format='xlsx',
+         baseline_file=Configuration.FileName.benchmark_baseline, save_baseline=False, tolerance=0.25):
+    """
+    Benchmark the pipeline, save the results and compare them with the baseline.
+
+    :param tweet_count: Number of tweets to benchmark.
+    :param source: 'synthetic' (TweetGenerator) or 'replay' (Data/tweets.txt repeated up to tweet_count).
+    :param seed: Seed of the synthetic tweets.
+    :param repeats: Number of runs of the corpus-level stages.
+    :param report_format: Report backend of the report export stage.
+    :param baseline_file: JSON baseline to compare with.
+    :param save_baseline: Save the results as the new baseline instead of comparing.
+    :param tolerance: Allowed slowdown before a stage is flagged (0.25 = 25%).
+    :return: List of regression messages.
+    """
+    if source == 'synthetic':
+        tweets = TweetGenerator(seed).generate(tweet_count)
+    elif source == 'replay':
+        tweets = TweetGenerator.replay(Configuration.fetch_tweets(), tweet_count)
+    else:
+        raise ValueError(f"Unknown tweet source '{source}', expected 'synthetic' or 'replay'.")
+
+    results = Benchmark(tweets, repeats, report_format).run()
+    results['meta'].update({'source': source, 'seed': seed})
+    Benchmark.print_results(results)
+
+    # Keep every run next to the reports
+    results_file = os.path.join('output', f"benchmark_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.json")
+    Benchmark.save(results, results_file)
+    print(f"Results saved in '{results_file}'.")
+
+    if save_baseline:
+        Benchmark.save(results, baseline_file)
+        print(f"Baseline saved in '{baseline_file}'.")
+        return []
+
+    if not os.path.exists(baseline_file):
+        print(f"No baseline found at '{baseline_file}', run with save_baseline=True to create one.")
+        return []
+
+    baseline = Benchmark.load(baseline_file)
+    for key in ('tweets', 'source', 'report_format'):
+        if baseline['meta'].get(key) != results['meta'].get(key):
+            print(f"Warning: the baseline was recorded with {key}={baseline['meta'].get(key)}, "
+                  f"this run used {key}={results['meta'].get(key)}.")
+
+    regressions = Benchmark.compare(results, baseline, tolerance)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+    else:
+        print("No regressions.")
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Benchmark Algorithms 1 to 5 and the report export.")
+    parser.add_argument('--tweets', type=int, default=10000, help="Number of tweets")
+    parser.add_argument('--source', choices=('synthetic', 'replay'), default='synthetic')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--report-format', default='xlsx')
+    parser.add_argument('--baseline', default=Configuration.FileName.benchmark_baseline)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    # A non-zero exit code fails the CI job when a stage regressed
+    sys.exit(1 if main(args.tweets, args.source, args.seed, args.repeats, args.report_format,
+                       args.baseline, args.save_baseline, args.tolerance) else 0)
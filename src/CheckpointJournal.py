@@ -0,0 +1,193 @@
+# Checkpoint journal of resumable and incremental Application_LV runs
+
+import json
+import os
+import time
+
+from Configuration import Configuration
+from TweetReader import TweetReader
+
+
+class CheckpointJournal:
+    """
+    Directory recording the progress of a batch run over one input file:
+
+    - journal.json: the input byte offset processed so far, the running total_positive_emojis
+      and total_negative_emojis counters (dictionaries or EmojiSketch states), the Emoji
+      Sentiment Lexicon counts (see EmoSLLexiconBuilder.to_dict), the cache statistics and
+      the list of flushed segments
+    - segment_NNNNNN.jsonl: the report rows of the tweets before the offset, one JSON list per line
+
+    checkpoint() flushes the current segment to disk before journal.json is atomically
+    replaced, so the journal only ever lists complete segments. After a crash, the rows
+    written since the last checkpoint are dropped and their tweets are processed again.
+    A run over a file that grew since the last run only processes the appended lines.
+    """
+
+    FORMAT = "emosl-checkpoint-journal"
+    FORMAT_VERSION = 1
+    JOURNAL_FILE = "journal.json"
+    SEGMENT_PREFIX = "segment_"
+
+    def __init__(self, directory, settings, sketch=False):
+        """
+        :param directory: Journal directory.
+        :param settings: JSON-serializable dictionary of the settings the partial results depend on.
+        :param sketch: Keep the emoji counters in EmojiSketch objects instead of dictionaries.
+        """
+        self.directory = directory
+        self.settings = settings
+        self.sketch = sketch
+        self.offset = 0
+        self.fingerprint = None
+        self.tweet_count = 0
+        if sketch:
+            from EmojiSketch import EmojiSketch
+
+            self.total_positive_emojis = EmojiSketch()
+            self.total_negative_emojis = EmojiSketch()
+        else:
+            self.total_positive_emojis = {}
+            self.total_negative_emojis = {}
+        self.emosl_counts = None
+        self.stats = {'cache_hits': 0, 'cache_misses': 0, 'near_duplicates': 0}
+        self.segments = []
+        # Segment being written since the last checkpoint
+        self.segment = None
+        self.segment_name = None
+
+    @staticmethod
+    def open(file_name, directory=Configuration.FileName.checkpoints, settings=None, sketch=False):
+        """
+        Load the journal of a directory. A new journal is started when there is none, when it
+        was written with other settings, or when the input no longer starts with the bytes
+        that were processed (the file was replaced or rewritten rather than appended to).
+
+        :param file_name: Input file of the run.
+        :param directory: Journal directory (created if needed).
+        :param settings: See __init__.
+        :param sketch: See __init__.
+        :return: CheckpointJournal
+        """
+        os.makedirs(directory, exist_ok=True)
+        # Compare the settings as they are stored (e.g. tuples become lists)
+        settings = json.loads(json.dumps(settings or {}))
+        journal = CheckpointJournal(directory, settings, sketch)
+
+        path = os.path.join(directory, CheckpointJournal.JOURNAL_FILE)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('format') != CheckpointJournal.FORMAT or data.get('format_version') != CheckpointJournal.FORMAT_VERSION:
+                print(f"'{directory}' is not a version {CheckpointJournal.FORMAT_VERSION} checkpoint journal, starting over.")
+            elif data['settings'] != settings or data.get('sketch', False) != sketch:
+                print(f"The checkpoint journal '{directory}' was written with other settings, starting over.")
+            elif TweetReader.fingerprint(file_name, data['offset']) != data['fingerprint']:
+                print(f"The file '{file_name}' changed since the last checkpoint, starting over.")
+            else:
+                journal.offset = data['offset']
+                journal.fingerprint = data['fingerprint']
+                journal.tweet_count = data['tweet_count']
+                if sketch:
+                    from EmojiSketch import EmojiSketch
+
+                    journal.total_positive_emojis = EmojiSketch.from_dict(data['total_positive_emojis'])
+                    journal.total_negative_emojis = EmojiSketch.from_dict(data['total_negative_emojis'])
+                else:
+                    journal.total_positive_emojis = data['total_positive_emojis']
+                    journal.total_negative_emojis = data['total_negative_emojis']
+                journal.emosl_counts = data['emosl_counts']
+                journal.stats = data['stats']
+                journal.segments = data['segments']
+
+        # Drop the segments written after the last checkpoint (or by a discarded journal)
+        for name in os.listdir(directory):
+            if name.startswith(CheckpointJournal.SEGMENT_PREFIX) and name not in journal.segments:
+                os.remove(os.path.join(directory, name))
+        return journal
+
+    def append_rows(self, rows):
+        """
+        Write report rows to the current segment.
+        """
+        if self.segment is None:
+            self.segment_name = f"{self.SEGMENT_PREFIX}{len(self.segments) + 1:06d}.jsonl"
+            self.segment = open(os.path.join(self.directory, self.segment_name), 'w', encoding='utf-8', newline='\n')
+        write = self.segment.write
+        for row in rows:
+            write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def checkpoint(self, file_name, offset, builder=None):
+        """
+        Flush the current segment and record the progress up to a byte offset of the input.
+
+        :param file_name: Input file of the run.
+        :param offset: Byte offset just after the last processed line (see TweetReader.iter_chunks_from).
+        :param builder: EmoSLLexiconBuilder holding the Emoji Sentiment Lexicon counts of the
+                        processed tweets, if the run learns the lexicon.
+        """
+        if self.segment is not None:
+            self.segment.flush()
+            os.fsync(self.segment.fileno())
+            self.segment.close()
+            self.segments.append(self.segment_name)
+            self.segment = None
+        self.offset = offset
+        self.fingerprint = TweetReader.fingerprint(file_name, offset)
+        if builder is not None:
+            self.emosl_counts = builder.to_dict()
+        self.save()
+
+    def save(self):
+        """
+        Write journal.json, replacing the previous one only once the new one is on disk.
+        """
+        data = {
+            'format': self.FORMAT,
+            'format_version': self.FORMAT_VERSION,
+            'updated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'settings': self.settings,
+            'offset': self.offset,
+            'fingerprint': self.fingerprint,
+            'tweet_count': self.tweet_count,
+            'stats': self.stats,
+            'segments': self.segments,
+            'sketch': self.sketch,
+            'total_positive_emojis': self.total_positive_emojis.to_dict() if self.sketch else self.total_positive_emojis,
+            'total_negative_emojis': self.total_negative_emojis.to_dict() if self.sketch else self.total_negative_emojis,
+            'emosl_counts': self.emosl_counts,
+        }
+        path = os.path.join(self.directory, self.JOURNAL_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + '.tmp', path)
+
+    def iter_rows(self):
+        """
+        Yield the report rows of every flushed segment, in input order.
+        """
+        for name in self.segments:
+            with open(os.path.join(self.directory, name), 'r', encoding='utf-8', newline='\n') as file:
+                for line in file:
+                    yield json.loads(line)
+
+
+def main():
+    directory = os.path.join(Configuration.FileName.checkpoints, "demo")
+    journal = CheckpointJournal.open(Configuration.FileName.tweets, directory)
+    print(f"Journal '{directory}': {journal.tweet_count} tweets up to byte {journal.offset}, "
+          f"{len(journal.segments)} segments")
+
+    for chunk, offset in TweetReader.iter_chunks_from(Configuration.FileName.tweets, journal.offset, chunk_size=100):
+        journal.append_rows([[tweet] for tweet in chunk])
+        journal.tweet_count += len(chunk)
+        journal.checkpoint(Configuration.FileName.tweets, offset)
+        print(f"Checkpoint at byte {offset}: {journal.tweet_count} tweets")
+
+    print(f"{sum(1 for _ in journal.iter_rows())} rows in {len(journal.segments)} segments")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import openpyxl
+from LexiconCache import LexiconCache
 
 
 class Configuration:
@@ -8,16 +8,72 @@ class Configuration:
         positive_lexicon = "Data/positive_lexicon.txt"
         negative_lexicon = "Data/negative_lexicon.txt"
         emojis = "Data/emojis.txt"
+        sentiment_lexicon = "Data/sentiment_lexicon.xlsx"
+        tweets = "Data/tweets.txt"
+        benchmark_baseline = "Data/benchmark_baseline.json"
+        model_bundle = "Data/model_bundle"
+        checkpoints = "output/checkpoints"
+
+    # Public settings for streaming tweet ingestion (see TweetReader)
+    class Ingestion:
+        chunk_size = 1000  # Tweets per chunk
+        buffer_size = 1 << 20  # Bytes read from disk at a time
+        text_field = "text"  # Field holding the tweet text in JSONL input
+
+    # Public settings for resumable batch runs (see CheckpointJournal)
+    class Checkpoint:
+        interval = 60.0  # Seconds between two checkpoints of a journaled Application_LV run
+
+    # Public settings for the fixed-memory emoji counts (see EmojiSketch)
+    class Sketch:
+        epsilon = 0.001  # Count-Min overestimate of at most epsilon * total count ...
+        delta = 0.001  # ... with probability 1 - delta
+        top_k = 1000  # Most frequent emojis tracked by Space-Saving
+        seed = 0  # Seed of the Count-Min hash functions
+
+    # Public settings for the memoization of duplicated tweets (see TweetCache)
+    class Memoization:
+        capacity = 100000  # Cached tweets per process (0 disables the cache)
+
+    # Public settings for near-duplicate collapsing (see NearDuplicateIndex)
+    class NearDuplicates:
+        threshold = 0.8  # Minimum estimated Jaccard similarity to a cluster representative
+        num_perm = 32  # MinHash permutations
+        bands = 8  # LSH bands (num_perm / bands rows each)
+        shingle_size = 1  # Words per shingle
+        capacity = 100000  # Representatives kept in the index
+
+    # Public settings for the hashed n-gram features (see HashingVectorizer)
+    class Hashing:
+        n_features = 1 << 18  # Columns of the hashed feature matrices
+        ngram_range = (1, 2)  # Token unigrams and bigrams
+        char_ngram_range = (3, 5)  # Character n-grams inside the tokens (None disables them)
+
+    # Public settings for the online scoring service (see ScoringServer)
+    class Serving:
+        host = "127.0.0.1"
+        port = 8765
+        max_batch_size = 64  # Tweets per micro-batch
+        max_wait = 0.005  # Seconds a micro-batch waits for more tweets once it has one
+        max_queue = 4096  # Tweets waiting to be scored before requests are rejected (503)
+        max_body_bytes = 1 << 20  # Largest accepted request body
+
+    # Public settings of the import-time check of the headless modules (see ImportBudget)
+    class ImportBudget:
+        seconds = 0.2  # Maximum import time of each headless module
+        forbidden = ("tkinter", "pandas", "openpyxl", "pyarrow", "xlsxwriter", "scipy")  # Loaded only when used
  
     # Public strings
     class SheetName:
         sentiment_lexicon = "sentiment_lexicon"
         emoji_sentiment_lexicon = "EMOJI_SENTIMENT_LEXICON"
+        normalization_patterns = "normalization_patterns"
 
     # Public strings
     class Sentiment:
         positive = "positive"
         negative = "negative"
+        neutral = "Neutral"
 
     @staticmethod
     def fetch_tweets():
@@ -59,18 +115,15 @@ class Configuration:
         :param sheet_name: Name of the sheet to read from.
         :return: A dictionary where keys are words and values are their sentiment scores.
         """
-        file_name = 'Data/sentiment_lexicon.xlsx'
+        file_name = Configuration.FileName.sentiment_lexicon
         setting = {}
 
         try:
-            # Load the workbook
-            workbook = openpyxl.load_workbook(file_name)
+            # Load the sheet rows from the compiled lexicon snapshot (built from the workbook on first use)
+            rows = LexiconCache.fetch_rows(file_name, sheet_name)
 
-            # Select the specified sheet or the first sheet
-            sheet = workbook[sheet_name] if sheet_name else workbook.active
-
-            # Iterate through the rows (assuming the first row contains headers)
-            for row in sheet.iter_rows(min_row=2, values_only=True):
+            # Iterate through the rows (the header row is already excluded)
+            for row in rows:
                 word, sentiment = row
                 if word and sentiment is not None:
                     setting[word.strip()] = float(sentiment)
@@ -90,18 +143,15 @@ class Configuration:
         :param sheet_name: Name of the sheet to read from.
         :return: A dictionary where keys are words and values are their sentiment scores as strings.
         """
-        file_name = 'Data/sentiment_lexicon.xlsx'
+        file_name = Configuration.FileName.sentiment_lexicon
         setting = {}
 
         try:
-            # Load the workbook
-            workbook = openpyxl.load_workbook(file_name)
-
-            # Select the specified sheet or the first sheet
-            sheet = workbook[sheet_name] if sheet_name else workbook.active
+            # Load the sheet rows from the compiled lexicon snapshot (built from the workbook on first use)
+            rows = LexiconCache.fetch_rows(file_name, sheet_name)
 
-            # Iterate through the rows (assuming the first row contains headers)
-            for row in sheet.iter_rows(min_row=2, values_only=True):
+            # Iterate through the rows (the header row is already excluded)
+            for row in rows:
                 word, sentiment = row
                 if word and sentiment is not None:
                     # Store both as strings in the dictionary
@@ -1,20 +1,129 @@
 # Algorithm 5 Emo-SL for Arabic Tweets Algorithm
 
+import json
 import re
 from collections import Counter
 
+from AhoCorasick import AhoCorasick
 from Configuration import Configuration
 
+
+class EmoSLLexiconBuilder:
+    """
+    Incremental, mergeable accumulator for the Emoji Sentiment Lexicon.
+
+    Keeps the raw positive and negative occurrence counts of every emoji, so partial
+    lexicons built from different shards (or days) can be merged map-reduce style, and
+    new tweets can refresh the scores without reprocessing the history.
+    """
+
+    def __init__(self, positive_lexicon, emojis):
+        """
+        :param positive_lexicon: Iterable of positive words used to label the tweets.
+        :param emojis: Iterable of distinct emojis to count.
+        """
+        self.positive_lexicon = set(positive_lexicon)
+        self.positive_matcher = AhoCorasick(self.positive_lexicon)
+        self.emoji_counts = {emoji: {Configuration.Sentiment.positive: 0, Configuration.Sentiment.negative: 0} for emoji in emojis}
+        self.tweet_count = 0
+
+    def update(self, tweets):
+        """
+        Count the positive and negative emoji occurrences of a batch of preprocessed tweets.
+
+        :param tweets: Iterable of tweets.
+        :return: self, so calls can be chained.
+        """
+        emoji_counts = self.emoji_counts
+        positive_matcher = self.positive_matcher
+        for tweet in tweets:
+            # A tweet is positive if any positive lexicon word occurs in it (single pass over the tweet)
+            sentiment = Configuration.Sentiment.positive if positive_matcher.contains_any(tweet) else Configuration.Sentiment.negative
+            for emoji in [char for char in tweet if char in emoji_counts]:
+                emoji_counts[emoji][sentiment] += 1
+            self.tweet_count += 1
+        return self
+
+    def merge(self, other):
+        """
+        Add the counts of another builder (e.g. from another shard) into this one.
+
+        :param other: EmoSLLexiconBuilder built with the same positive lexicon.
+        :return: self, so calls can be chained.
+        """
+        if other.positive_lexicon != self.positive_lexicon:
+            raise ValueError("Cannot merge EmoSL lexicons built with different positive lexicons.")
+        for emoji, counts in other.emoji_counts.items():
+            if emoji not in self.emoji_counts:
+                self.emoji_counts[emoji] = {Configuration.Sentiment.positive: 0, Configuration.Sentiment.negative: 0}
+            self.emoji_counts[emoji][Configuration.Sentiment.positive] += counts[Configuration.Sentiment.positive]
+            self.emoji_counts[emoji][Configuration.Sentiment.negative] += counts[Configuration.Sentiment.negative]
+        self.tweet_count += other.tweet_count
+        return self
+
+    def finalize(self):
+        """
+        Calculate the emoji sentiment scores p / (p + n) from the accumulated counts.
+
+        :return: Dictionary of emoji sentiment scores (emojis that never occurred are left out).
+        """
+        lexicon = {}
+        for emoji, counts in self.emoji_counts.items():
+            p = counts[Configuration.Sentiment.positive]
+            n = counts[Configuration.Sentiment.negative]
+            if p + n > 0:
+                lexicon[emoji] = p / (p + n)
+        return lexicon
+
+    def to_dict(self):
+        return {
+            "positive_lexicon": sorted(self.positive_lexicon),
+            "tweet_count": self.tweet_count,
+            "emoji_counts": self.emoji_counts
+        }
+
+    @staticmethod
+    def from_dict(data):
+        builder = EmoSLLexiconBuilder(data["positive_lexicon"], data["emoji_counts"].keys())
+        for emoji, counts in data["emoji_counts"].items():
+            builder.emoji_counts[emoji] = {Configuration.Sentiment.positive: counts[Configuration.Sentiment.positive],
+                                           Configuration.Sentiment.negative: counts[Configuration.Sentiment.negative]}
+        builder.tweet_count = data["tweet_count"]
+        return builder
+
+    def save(self, file_name):
+        """
+        Save the accumulated counts to a JSON file.
+        """
+        with open(file_name, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False)
+
+    @staticmethod
+    def load(file_name):
+        """
+        Load accumulated counts saved with save().
+        """
+        with open(file_name, 'r', encoding='utf-8') as file:
+            return EmoSLLexiconBuilder.from_dict(json.load(file))
+
+
 class EmoSLArabicTweets:
-    def __init__(self, positive_lexicon, negative_lexicon):
+    def __init__(self, positive_lexicon, negative_lexicon, classifier=None):
         """
         Initialize Emo-SL for Arabic Tweets with sentiment lexicons.
 
         :param positive_lexicon: List of positive words.
         :param negative_lexicon: List of negative words.
+        :param classifier: Trained SentimentClassifier (defaults to SentimentClassifier.rule_based()).
         """
         self.positive_lexicon = set(positive_lexicon)
         self.negative_lexicon = set(negative_lexicon)
+        if classifier is None:
+            # Imported here, so importing this module (e.g. from Application_LV) does not load NumPy
+            from SentimentClassifier import SentimentClassifier
+
+            classifier = SentimentClassifier.rule_based()
+        self.classifier = classifier
         self.emoji_sentiment_lexicon = {}
         self.sentiment_results = {}
 
@@ -39,21 +148,9 @@ class EmoSLArabicTweets:
         :param tweets: List of tweets.
         :param emojis: Set of distinct emojis extracted from the tweets.
         """
-        emoji_counts = {emoji: {Configuration.Sentiment.positive: 0, Configuration.Sentiment.negative: 0} for emoji in emojis}
-
-        # Count positive and negative emoji occurrences
-        for tweet in tweets:
-            sentiment = Configuration.Sentiment.positive if any(word in tweet for word in self.positive_lexicon) else Configuration.Sentiment.negative
-            tweet_emojis = [char for char in tweet if char in emojis]
-            for emoji in tweet_emojis:
-                emoji_counts[emoji][sentiment] += 1
-
-        # Calculate emoji sentiment scores
-        for emoji, counts in emoji_counts.items():
-            p = counts[Configuration.Sentiment.positive]
-            n = counts[Configuration.Sentiment.negative]
-            if p + n > 0:
-                self.emoji_sentiment_lexicon[emoji] = p / (p + n)
+        builder = EmoSLLexiconBuilder(self.positive_lexicon, emojis)
+        builder.update(tweets)
+        self.emoji_sentiment_lexicon.update(builder.finalize())
 
     def extract_features(self, tweets, emojis):
         """
@@ -64,9 +161,13 @@ class EmoSLArabicTweets:
         :return: List of feature vectors for each tweet.
         """
         features = []
+        # Find the emojis of each tweet in one pass, reported in the iteration order of emojis
+        emoji_order = {emoji: index for index, emoji in enumerate(dict.fromkeys(emojis))}
+        emoji_matcher = AhoCorasick(emoji_order)
         for tweet in tweets:
             # Feature 1: Emoji sentiment scores
-            emoji_features = [self.emoji_sentiment_lexicon.get(emoji, 0) for emoji in emojis if emoji in tweet]
+            tweet_emojis = sorted(emoji_matcher.find_patterns(tweet), key=emoji_order.__getitem__)
+            emoji_features = [self.emoji_sentiment_lexicon.get(emoji, 0) for emoji in tweet_emojis]
 
             # Feature 2: Count of positive and negative words
             positive_count = sum(1 for word in tweet.split() if word in self.positive_lexicon)
@@ -85,18 +186,22 @@ class EmoSLArabicTweets:
             })
         return features
 
-    def classify_sentiments(self, tweets, features):
+    def classify_sentiments(self, tweets, features, feature_vectors=None):
         """
-        Classify sentiments using extracted features (Dummy ML classifier).
+        Classify sentiments using extracted features, the whole batch at once with self.classifier.
         
         :param tweets: List of tweets.
         :param features: List of feature vectors.
+        :param feature_vectors: FeatureBatch or list of FeatureVector objects of the tweets, needed
+                                when the classifier was trained on the Algorithm 2 features too.
         :return: Sentiment classification for each tweet.
         """
-        for tweet, feature_vector in zip(tweets, features):
-            score = sum(feature_vector['emoji_features']) + feature_vector['positive_count'] - feature_vector['negative_count']
-            sentiment = Configuration.Sentiment.positive if score > 0 else Configuration.Sentiment.negative if score < 0 else 'Neutral'
-            self.sentiment_results[tweet] = sentiment
+        from SentimentClassifier import SentimentClassifier
+
+        matrix = SentimentClassifier.feature_matrix(features, feature_vectors)
+        if matrix.shape[1] != len(self.classifier.columns):
+            raise ValueError("The classifier was trained on other features, pass the feature_vectors of the tweets.")
+        self.sentiment_results.update(zip(tweets, self.classifier.predict(matrix)))
         return self.sentiment_results
 
     def apply_vader(self, tweet):
@@ -0,0 +1,161 @@
+# Algorithms 1 to 5 over a corpus of tweets, without any GUI
+
+from Configuration import Configuration
+from EmojiCounter import count_emojis, merge_emoji_counts
+from EmojiSentimentScoreCalculator import update_sentiment_scores
+from SentimentFeatureExtractor import SentimentFeatureExtractor
+from TextPreprocessor import PreprocessorPipeline
+from TweetCache import TweetCache
+
+
+class EmoSLPipeline:
+    """
+    Run Algorithms 1 to 3 tweet by tweet, and the corpus-level stages (Algorithm 4 over the
+    totals and Algorithm 5) once per corpus.
+
+    The lexicons and preprocessing resources are loaded once, the emoji totals and their
+    sentiment scores are kept up to date incrementally as tweets are processed.
+    """
+
+    def __init__(self, cache_capacity=Configuration.Memoization.capacity, bundle=None, sketch=False):
+        """
+        :param cache_capacity: Number of tweets memoized by the TweetCache (0 disables it).
+        :param bundle: Directory of a ModelBundle to start from (None reads the xlsx and txt files
+                       and learns the Emoji Sentiment Lexicon from each corpus in run_emo_sl).
+        :param sketch: Keep the emoji totals in fixed-memory EmojiSketch objects instead of
+                       dictionaries (approximate counts of the Configuration.Sketch.top_k most
+                       frequent emojis, for long-running streams).
+        """
+        self.sketch = sketch
+        if bundle is None:
+            self.bundle = None
+            self.cache = TweetCache(cache_capacity)
+            self.preprocessor = PreprocessorPipeline()
+            self.extractor = SentimentFeatureExtractor()
+            self.positive_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.positive_lexicon)
+            self.negative_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.negative_lexicon)
+            self.emojis = set(Configuration.fetch_data_from_file(Configuration.FileName.emojis))
+        else:
+            from ModelBundle import ModelBundle
+
+            self.bundle = ModelBundle.load(bundle)
+            self.cache = self.bundle.create_cache(cache_capacity)
+            self.preprocessor = self.bundle.create_preprocessor()
+            self.extractor = self.bundle.create_extractor()
+            self.positive_lexicon = self.bundle.positive_lexicon
+            self.negative_lexicon = self.bundle.negative_lexicon
+            self.emojis = set(self.bundle.emojis)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the running totals before processing a new corpus.
+        """
+        if self.sketch:
+            from EmojiSketch import EmojiSketch
+
+            self.total_positive_emojis = EmojiSketch()
+            self.total_negative_emojis = EmojiSketch()
+        else:
+            self.total_positive_emojis = {}
+            self.total_negative_emojis = {}
+        self.emoji_sentiment_scores = {}
+
+    def process_tweet(self, tweet):
+        """
+        Run Algorithms 1 to 3 on a tweet and fold its emoji counts into the running totals and scores.
+
+        :return: Tuple (processed_text, feature_vector, positive_emojis, negative_emojis).
+        """
+        # Algorithms 1 to 3, memoized on the raw tweet
+        processed_text, feature_vector, positive_emojis, negative_emojis = self.cache.get_or_compute(tweet, self.run_algorithms)
+        merge_emoji_counts(self.total_positive_emojis, positive_emojis)
+        merge_emoji_counts(self.total_negative_emojis, negative_emojis)
+
+        # Algorithm 4 Calculating Emoji Sentiment Scores (only the emojis of this tweet changed)
+        changed_emojis = list(positive_emojis) + list(negative_emojis)
+        if self.sketch:
+            self.update_sketch_scores(changed_emojis)
+        else:
+            update_sentiment_scores(self.emoji_sentiment_scores, self.total_positive_emojis, self.total_negative_emojis,
+                                    changed_emojis)
+
+        return processed_text, feature_vector, positive_emojis, negative_emojis
+
+    def update_sketch_scores(self, changed_emojis):
+        """
+        Update the scores of the changed emojis the sketches track, and drop the scores of the
+        emojis they stopped tracking once there are twice as many scores as tracked emojis.
+        """
+        positive, negative = self.total_positive_emojis, self.total_negative_emojis
+        update_sentiment_scores(self.emoji_sentiment_scores, positive, negative,
+                                [emoji for emoji in changed_emojis if emoji in positive or emoji in negative])
+        if len(self.emoji_sentiment_scores) > 2 * (len(positive) + len(negative)):
+            self.emoji_sentiment_scores = {emoji: score for emoji, score in self.emoji_sentiment_scores.items()
+                                           if emoji in positive or emoji in negative}
+
+    def run_algorithms(self, tweet):
+        """
+        Run Algorithms 1 to 3 on a tweet.
+
+        :return: Tuple (processed_text, feature_vector, positive_emojis, negative_emojis).
+        """
+        # Algorithm 1 Enhanced Preprocess Arabic Tweets for Sentiment Analysis
+        processed_text = self.preprocessor.preprocess_text(tweet)
+
+        # Algorithm 2 Feature Extraction for Sentiment Analysis
+        feature_vector = self.extractor.extract_features_from_tweet(processed_text)
+
+        # Algorithm 3 Counting Emoji Occurrences
+        positive_emojis, negative_emojis = count_emojis(feature_vector, self.extractor)
+        return processed_text, feature_vector, positive_emojis, negative_emojis
+
+    def run_emo_sl(self, tweets):
+        """
+        Algorithm 5 Emo-SL for Arabic Tweets Algorithm, once over the whole corpus.
+
+        :return: Tuple (sentiment_results, vader_scores).
+        """
+        # Algorithm 5 (and its NumPy classifier) is only loaded when a corpus is classified
+        from EmoSLArabicTweets import EmoSLArabicTweets
+
+        if self.bundle is None:
+            emosl = EmoSLArabicTweets(self.positive_lexicon, self.negative_lexicon)
+        else:
+            emosl = self.bundle.create_emosl()
+
+        # Step 1: Preprocess the tweets
+        preprocessed_tweets = emosl.preprocess_data(tweets)
+
+        # Step 2: Build the Emoji Sentiment Lexicon (already learned when loaded from a bundle)
+        if self.bundle is None:
+            emosl.build_emo_sl(preprocessed_tweets, self.emojis)
+
+        # Step 3: Extract features
+        features = emosl.extract_features(preprocessed_tweets, self.emojis)
+
+        # Step 4: Classify sentiments
+        sentiment_results = emosl.classify_sentiments(preprocessed_tweets, features)
+
+        # Step 5: Apply VADER analysis (mocked)
+        vader_scores = emosl.analyze_tweets_with_vader(preprocessed_tweets)
+
+        return sentiment_results, vader_scores
+
+
+def main():
+    tweets = Configuration.fetch_tweets()
+    pipeline = EmoSLPipeline()
+    for tweet in tweets:
+        pipeline.process_tweet(tweet)
+    sentiment_results, vader_scores = pipeline.run_emo_sl(tweets)
+
+    print(f"Total Positive Emojis Count: {pipeline.total_positive_emojis}")
+    print(f"Total Negative Emojis Count: {pipeline.total_negative_emojis}")
+    print(f"Emoji Sentiment Scores: {pipeline.emoji_sentiment_scores}")
+    print(f"Classified tweets: {len(sentiment_results)}, VADER scores: {len(vader_scores)}")
+    print(f"Tweet cache: {pipeline.cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,15 @@
 # Algorithm 3: Counting Emoji Occurrences (Fixed for Accurate Sentiment)
 import re
-import json
 
 from Configuration import Configuration
-
-class FeatureVector:
-    def __init__(self):
-        self.positive_words_count = 0
-        self.negative_words_count = 0
-        self.positive_emojis_count = 0
-        self.negative_emojis_count = 0
-        self.total_emojis_count = 0
-        self.positive_score = 0.0
-        self.negative_score = 0.0
-        self.emojis = []  # Store emojis for further processing in Emoji Counter
-        self.sentiment = ""  # Will be determined dynamically
-
-    def to_dict(self):
-        return {
-            "positive_words_count": self.positive_words_count,
-            "negative_words_count": self.negative_words_count,
-            "positive_emojis_count": self.positive_emojis_count,
-            "negative_emojis_count": self.negative_emojis_count,
-            "total_emojis_count": self.total_emojis_count,
-            "positive_score": self.positive_score,
-            "negative_score": self.negative_score,
-            "emojis": self.emojis,
-            "sentiment": self.sentiment
-        }
-
-    def __str__(self):
-        return json.dumps(self.to_dict(), indent=4, ensure_ascii=False)
-    
-    def to_one_line(self):
-        return json.dumps(self.to_dict(), ensure_ascii=False)
-
+from EmojiExtractor import EmojiExtractor
+from FeatureVector import FeatureVector
 
 class SentimentFeatureExtractor:
     def __init__(self):
         self.SENTIMENT_LEXICON =  Configuration.fetch_setting(Configuration.SheetName.sentiment_lexicon)
         self.EMOJI_SENTIMENT_LEXICON =  Configuration.fetch_setting(Configuration.SheetName.emoji_sentiment_lexicon)
+        self.emoji_extractor = EmojiExtractor.from_lexicon(self.EMOJI_SENTIMENT_LEXICON)
 
     def tokenize(self, text):
         # Tokenize text into words using regex
@@ -47,7 +17,7 @@ class SentimentFeatureExtractor:
 
     def extract_emojis(self, text):
         # Extract only valid emojis (filter out non-emoji punctuation)
-        return [char for char in text if char in self.EMOJI_SENTIMENT_LEXICON]
+        return [emoji for emoji in self.emoji_extractor.extract(text) if emoji in self.EMOJI_SENTIMENT_LEXICON]
 
     def extract_features_from_tweet(self, tweet):
         feature_vector = FeatureVector()
@@ -109,6 +79,21 @@ def count_emojis(feature_vector, extractor):
     return positive_emojis, negative_emojis
 
 
+def merge_emoji_counts(total_emojis, emojis):
+    """
+    Add the counts of emojis into total_emojis (new emojis keep their first-seen order).
+    total_emojis can also be an EmojiSketch, for fixed-memory totals.
+    """
+    if not isinstance(total_emojis, dict):
+        total_emojis.add_counts(emojis)
+        return
+    for emoji, count in emojis.items():
+        if emoji in total_emojis:
+            total_emojis[emoji] += count
+        else:
+            total_emojis[emoji] = count
+
+
 # Main function to demonstrate usage
 def main():
     tweets =  Configuration.fetch_tweets()
@@ -0,0 +1,176 @@
+# Grapheme-aware emoji extraction backed by a trie of known emoji sequences
+
+import re
+
+from Configuration import Configuration
+
+# Code points that can start an emoji (approximation of Unicode Extended_Pictographic)
+PICTOGRAPHIC_RANGES = (
+    (0x00A9, 0x00A9), (0x00AE, 0x00AE), (0x203C, 0x203C), (0x2049, 0x2049),
+    (0x2122, 0x2122), (0x2139, 0x2139), (0x2194, 0x2199), (0x21A9, 0x21AA),
+    (0x231A, 0x231B), (0x2328, 0x2328), (0x23CF, 0x23CF), (0x23E9, 0x23F3),
+    (0x23F8, 0x23FA), (0x24C2, 0x24C2), (0x25AA, 0x25AB), (0x25B6, 0x25B6),
+    (0x25C0, 0x25C0), (0x25FB, 0x25FE), (0x2600, 0x27BF), (0x2934, 0x2935),
+    (0x2B05, 0x2B07), (0x2B1B, 0x2B1C), (0x2B50, 0x2B50), (0x2B55, 0x2B55),
+    (0x3030, 0x3030), (0x303D, 0x303D), (0x3297, 0x3297), (0x3299, 0x3299),
+    (0x1F000, 0x1F1E5), (0x1F200, 0x1F3FA), (0x1F400, 0x1FAFF), (0x1FC00, 0x1FFFD),
+)
+REGIONAL_INDICATORS = (0x1F1E6, 0x1F1FF)  # Pairs of these form flags
+SKIN_TONE_MODIFIERS = (0x1F3FB, 0x1F3FF)
+KEYCAP_BASES = '0123456789#*'
+VARIATION_SELECTORS = '\ufe0e\ufe0f'
+ZERO_WIDTH_JOINER = '\u200d'
+KEYCAP = '\u20e3'
+TAGS = (0xE0020, 0xE007F)  # Subdivision flag tags, terminated by U+E007F
+
+
+def _chars(*ranges):
+    return frozenset(chr(code) for start, end in ranges for code in range(start, end + 1))
+
+
+PICTOGRAPHIC_CHARS = _chars(*PICTOGRAPHIC_RANGES)
+REGIONAL_INDICATOR_CHARS = _chars(REGIONAL_INDICATORS)
+SKIN_TONE_CHARS = _chars(SKIN_TONE_MODIFIERS)
+TAG_CHARS = _chars(TAGS)
+
+
+class EmojiExtractor:
+    """
+    Extract emojis from text in one pass, treating multi-codepoint emojis (ZWJ sequences,
+    skin-tone modifiers, flags, keycaps, variation selectors) as single emojis.
+
+    Known sequences (e.g. the EMOJI_SENTIMENT_LEXICON keys) are stored in a trie and matched
+    longest-first. An emoji sequence that is not known but whose base form is (e.g. a skin-tone
+    or VS16 variant of a lexicon emoji) is reported in its known base form, so it hits the lexicon.
+    Punctuation and other symbols are never reported.
+    """
+
+    def __init__(self, sequences):
+        """
+        :param sequences: Iterable of known emoji sequences.
+        """
+        self.known = set()
+        self.trie = {}
+        for sequence in sequences:
+            if sequence:
+                self.add_sequence(sequence)
+
+        # Characters at which an emoji can start; everything else is skipped by the regex engine
+        starts = ''.join(re.escape(char) for char in sorted({sequence[0] for sequence in self.known}))
+        ranges = ''.join(f"{re.escape(chr(start))}-{re.escape(chr(end))}"
+                         for start, end in PICTOGRAPHIC_RANGES + (REGIONAL_INDICATORS, SKIN_TONE_MODIFIERS))
+        self.candidates = re.compile(f"[{starts}{ranges}{re.escape(KEYCAP_BASES)}]")
+
+    def add_sequence(self, sequence):
+        node = self.trie
+        for char in sequence:
+            node = node.setdefault(char, {})
+        node[None] = sequence
+        self.known.add(sequence)
+
+    def match_known(self, text, start):
+        """
+        Return the length of the longest known sequence starting at text[start] (0 if none).
+        """
+        node = self.trie
+        length = 0
+        index = start
+        while index < len(text):
+            node = node.get(text[index])
+            if node is None:
+                break
+            index += 1
+            if None in node:
+                length = index - start
+        return length
+
+    @staticmethod
+    def match_sequence(text, start):
+        """
+        Return the length of the emoji sequence starting at text[start] (0 if it is not an emoji).
+        """
+        length = len(text)
+        char = text[start]
+        index = start + 1
+
+        # Keycap: [0-9#*] VS16? U+20E3
+        if char in KEYCAP_BASES:
+            if index < length and text[index] == '\ufe0f':
+                index += 1
+            return index + 1 - start if index < length and text[index] == KEYCAP else 0
+
+        # Flag: pair of regional indicators
+        if char in REGIONAL_INDICATOR_CHARS:
+            if index < length and text[index] in REGIONAL_INDICATOR_CHARS:
+                index += 1
+            return index - start
+
+        if char not in PICTOGRAPHIC_CHARS and char not in SKIN_TONE_CHARS:
+            return 0
+
+        while True:
+            # Modifiers of the current pictograph
+            if index < length and text[index] in VARIATION_SELECTORS:
+                index += 1
+            if index < length and text[index] in SKIN_TONE_CHARS:
+                index += 1
+            if index < length and text[index] in TAG_CHARS:
+                while index < length and text[index] in TAG_CHARS:
+                    index += 1
+                    if text[index - 1] == chr(TAGS[1]):
+                        break
+            # ZWJ followed by another pictograph continues the sequence
+            if (index + 1 < length and text[index] == ZERO_WIDTH_JOINER
+                    and text[index + 1] in PICTOGRAPHIC_CHARS):
+                index += 2
+                continue
+            return index - start
+
+    def canonical(self, sequence):
+        """
+        Return the known form of an emoji sequence: the sequence itself if known, else its base
+        form without variation selectors and skin-tone modifiers if that is known.
+        """
+        if sequence in self.known:
+            return sequence
+        base = ''.join(char for char in sequence
+                       if char not in VARIATION_SELECTORS and char not in SKIN_TONE_CHARS)
+        return base if base in self.known else sequence
+
+    def extract(self, text):
+        """
+        Return the list of emojis in the text, in order of appearance.
+        """
+        emojis = []
+        position = 0
+        while True:
+            candidate = self.candidates.search(text, position)
+            if candidate is None:
+                return emojis
+            start = candidate.start()
+            known_length = self.match_known(text, start)
+            sequence_length = self.match_sequence(text, start)
+            if known_length >= sequence_length:
+                if known_length:
+                    emojis.append(text[start:start + known_length])
+                position = start + max(known_length, 1)
+            else:
+                emojis.append(self.canonical(text[start:start + sequence_length]))
+                position = start + sequence_length
+
+    @staticmethod
+    def from_lexicon(emoji_sentiment_lexicon):
+        """
+        Build an extractor from the emoji sentiment lexicon and the emojis file.
+        """
+        return EmojiExtractor(list(emoji_sentiment_lexicon) + Configuration.fetch_data_from_file(Configuration.FileName.emojis))
+
+
+def main():
+    extractor = EmojiExtractor.from_lexicon(Configuration.fetch_setting(Configuration.SheetName.emoji_sentiment_lexicon))
+    for tweet in ["أنا سعيد جدًا 😞اليوم😂!", "عائلتي 👨‍👩‍👧 👍🏽 ❤️ 🇪🇬 #1️⃣", "لماذا أنت غاضب😞  😡؟"]:
+        print(f"{tweet} -> {extractor.extract(tweet)}")
+
+
+if __name__ == "__main__":
+    main()
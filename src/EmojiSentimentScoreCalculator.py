@@ -3,9 +3,10 @@ def calculate_sentiment_scores(positive_emojis, negative_emojis):
     """
     Calculates sentiment scores for emojis based on their positive and negative occurrences.
 
-    :param positive_emojis: Dictionary of emoji counts in positive tweets
-    :param negative_emojis: Dictionary of emoji counts in negative tweets
-    :return: Dictionary of emoji sentiment scores
+    :param positive_emojis: Dictionary (or EmojiSketch) of emoji counts in positive tweets
+    :param negative_emojis: Dictionary (or EmojiSketch) of emoji counts in negative tweets
+    :return: Dictionary of emoji sentiment scores (of the emojis tracked by the sketches, from
+             their estimated counts, when EmojiSketch totals are given)
     """
     scores = {}
     # Get the union of all emojis from positive and negative counts
@@ -24,6 +25,26 @@ def calculate_sentiment_scores(positive_emojis, negative_emojis):
     return scores
 
 
+def update_sentiment_scores(scores, positive_emojis, negative_emojis, emojis):
+    """
+    Incrementally update running sentiment scores after the counts of some emojis changed.
+
+    Only the given emojis are recomputed, so keeping scores up to date over running totals
+    costs O(changed emojis) per tweet instead of recalculating every emoji.
+
+    :param scores: Dictionary of emoji sentiment scores to update in place
+    :param positive_emojis: Dictionary of running emoji counts in positive tweets
+    :param negative_emojis: Dictionary of running emoji counts in negative tweets
+    :param emojis: Iterable of emojis whose counts changed
+    :return: The updated scores dictionary
+    """
+    for emoji in emojis:
+        p = positive_emojis.get(emoji, 0)
+        n = negative_emojis.get(emoji, 0)
+        scores[emoji] = (p - n) / (p + n) if p + n > 0 else 0.0
+    return scores
+
+
 def main():
     # Example input data
     positive_emojis = {
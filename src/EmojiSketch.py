@@ -0,0 +1,319 @@
+# Fixed-memory emoji counts for Algorithms 3 and 4: Count-Min sketch and Space-Saving top-K
+
+import hashlib
+import heapq
+import math
+
+import numpy as np
+
+from Configuration import Configuration
+
+
+class CountMinSketch:
+    """
+    Frequency estimates of a stream of items in a fixed depth x width table of counters.
+
+    Each item increments one counter per row, and its estimate is the smallest of its
+    counters. Estimates are never below the true count, and with probability 1 - delta
+    they exceed it by at most epsilon * total, where total is the sum of all the counts
+    (width = ceil(e / epsilon), depth = ceil(ln(1 / delta))).
+
+    Sketches with the same epsilon, delta and seed can be merged by adding their tables.
+    """
+
+    def __init__(self, epsilon=Configuration.Sketch.epsilon, delta=Configuration.Sketch.delta,
+                 seed=Configuration.Sketch.seed):
+        """
+        :param epsilon: Relative error of the estimates (in units of the total count).
+        :param delta: Probability that an estimate exceeds the error bound.
+        :param seed: Seed of the hash functions (the same in every process, so sketches can be merged).
+        """
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be between 0 and 1.")
+        self.epsilon = epsilon
+        self.delta = delta
+        self.seed = seed
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.rows = np.arange(self.depth)
+        self.total = 0
+
+    def columns(self, item):
+        """
+        Return the counter of the item in each row (double hashing of one 128-bit BLAKE2 digest).
+        """
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16,
+                                 salt=self.seed.to_bytes(8, 'little')).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, item, count=1):
+        self.table[self.rows, self.columns(item)] += count
+        self.total += count
+
+    def estimate(self, item):
+        return int(self.table[self.rows, self.columns(item)].min())
+
+    def error_bound(self):
+        """
+        Return the maximum overestimate of estimate() (with probability 1 - delta).
+        """
+        return self.epsilon * self.total
+
+    def merge(self, other):
+        """
+        Add the counts of another sketch built with the same epsilon, delta and seed.
+
+        :return: self, so calls can be chained.
+        """
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Cannot merge Count-Min sketches with different dimensions or seeds.")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+
+class SpaceSaving:
+    """
+    The (approximately) most frequent items of a stream, tracking at most `capacity` of them.
+
+    A new item replaces the tracked item with the smallest count m when the summary is full,
+    and starts at m + count with an error of m. Tracked counts are never below the true
+    counts and overestimate them by at most their error, itself at most total / capacity,
+    so every item more frequent than total / capacity is tracked.
+    """
+
+    def __init__(self, capacity=Configuration.Sketch.top_k):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counts = {}  # item -> [count, error]
+        # Min-heap with one (count, item) entry per tracked item, whose count can be out of date (too small)
+        self.heap = []
+        self.total = 0
+
+    def add(self, item, count=1):
+        """
+        Count an item.
+
+        :return: The item evicted to make room for it, or None.
+        """
+        self.total += count
+        entry = self.counts.get(item)
+        if entry is not None:
+            entry[0] += count
+            return None
+
+        evicted = None
+        if len(self.counts) >= self.capacity:
+            evicted, minimum = self.pop_min()
+            self.counts[item] = [minimum + count, minimum]
+        else:
+            self.counts[item] = [count, 0]
+        heapq.heappush(self.heap, (self.counts[item][0], item))
+        return evicted
+
+    def pop_min(self):
+        """
+        Stop tracking the item with the smallest count and return (item, count).
+        """
+        heap = self.heap
+        while True:
+            count, item = heap[0]
+            current = self.counts[item][0]
+            if current == count:
+                heapq.heappop(heap)
+                del self.counts[item]
+                return item, count
+            # Refresh the out-of-date entry and look again
+            heapq.heapreplace(heap, (current, item))
+
+    def minimum(self):
+        """
+        Return the smallest tracked count when the summary is full (an upper bound of the
+        count of any untracked item), 0 otherwise.
+        """
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counts.values())
+
+    def top(self, k=None):
+        """
+        Return the k (default all) tracked items with the highest counts as (item, count, error) tuples.
+        """
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1][0])
+        return [(item, count, error) for item, (count, error) in ranked[:k]]
+
+    def merge(self, other):
+        """
+        Add the counts of another summary. An item tracked by only one of them gets the other's
+        minimum() as count and error, and the capacity largest counts are kept.
+
+        :return: self, so calls can be chained.
+        """
+        own_minimum, other_minimum = self.minimum(), other.minimum()
+        merged = {}
+        for item in self.counts.keys() | other.counts.keys():
+            count, error = self.counts.get(item, (own_minimum, own_minimum))
+            other_count, other_error = other.counts.get(item, (other_minimum, other_minimum))
+            merged[item] = [count + other_count, error + other_error]
+        kept = sorted(merged.items(), key=lambda item: -item[1][0])[:self.capacity]
+        self.counts = dict(kept)
+        self.heap = [(count, item) for item, (count, _) in kept]
+        heapq.heapify(self.heap)
+        self.total += other.total
+        return self
+
+
+class EmojiSketch:
+    """
+    Fixed-memory replacement of an emoji count dictionary for long streaming aggregations.
+
+    Frequencies come from a CountMinSketch and the emojis kept come from a SpaceSaving
+    summary of the top_k most frequent ones. The memory used only depends on epsilon, delta
+    and top_k, however many distinct emojis (or noisy tokens) the stream holds.
+
+    It offers the read-only dictionary methods calculate_sentiment_scores and the report use
+    (keys, items, get, [], in, len), listing the tracked emojis by decreasing count, and is
+    filled with add_counts (or merge_emoji_counts).
+    """
+
+    def __init__(self, epsilon=Configuration.Sketch.epsilon, delta=Configuration.Sketch.delta,
+                 top_k=Configuration.Sketch.top_k, seed=Configuration.Sketch.seed):
+        """
+        :param epsilon: See CountMinSketch.
+        :param delta: See CountMinSketch.
+        :param top_k: Number of emojis tracked by the SpaceSaving summary.
+        :param seed: See CountMinSketch.
+        """
+        self.frequencies = CountMinSketch(epsilon, delta, seed)
+        self.top_emojis = SpaceSaving(top_k)
+
+    def add(self, emoji, count=1):
+        self.frequencies.add(emoji, count)
+        self.top_emojis.add(emoji, count)
+
+    def add_counts(self, emojis):
+        """
+        Add a dictionary of emoji counts (e.g. the partial counts of a tweet or a chunk).
+        """
+        for emoji, count in emojis.items():
+            self.add(emoji, count)
+
+    def estimate(self, emoji):
+        """
+        Return the estimated count of an emoji: the smaller of its Count-Min estimate and of its
+        Space-Saving count, both upper bounds of the true count.
+        """
+        estimate = self.frequencies.estimate(emoji)
+        entry = self.top_emojis.counts.get(emoji)
+        return min(estimate, entry[0]) if entry is not None else estimate
+
+    def error_bound(self):
+        """
+        Return the maximum overestimate of estimate() (with probability 1 - delta).
+        """
+        return self.frequencies.error_bound()
+
+    @property
+    def total(self):
+        return self.frequencies.total
+
+    def merge(self, other):
+        """
+        Add the counts of another EmojiSketch built with the same settings (e.g. from another worker).
+
+        :return: self, so calls can be chained.
+        """
+        self.frequencies.merge(other.frequencies)
+        self.top_emojis.merge(other.top_emojis)
+        return self
+
+    def keys(self):
+        return [emoji for emoji, _ in self.items()]
+
+    def items(self):
+        estimates = [(emoji, self.estimate(emoji)) for emoji in self.top_emojis.counts]
+        return sorted(estimates, key=lambda item: -item[1])
+
+    def get(self, emoji, default=0):
+        return self.estimate(emoji) or default
+
+    def __getitem__(self, emoji):
+        if emoji not in self.top_emojis.counts:
+            raise KeyError(emoji)
+        return self.estimate(emoji)
+
+    def __contains__(self, emoji):
+        return emoji in self.top_emojis.counts
+
+    def __len__(self):
+        return len(self.top_emojis.counts)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __repr__(self):
+        return f"EmojiSketch({dict(self.items())})"
+
+    def to_dict(self):
+        frequencies = self.frequencies
+        return {
+            "epsilon": frequencies.epsilon,
+            "delta": frequencies.delta,
+            "top_k": self.top_emojis.capacity,
+            "seed": frequencies.seed,
+            "total": frequencies.total,
+            "table": frequencies.table.tolist(),
+            "top_emojis": self.top_emojis.counts,
+            "top_total": self.top_emojis.total
+        }
+
+    @staticmethod
+    def from_dict(data):
+        sketch = EmojiSketch(data["epsilon"], data["delta"], data["top_k"], data["seed"])
+        sketch.frequencies.table = np.array(data["table"], dtype=np.int64).reshape(sketch.frequencies.table.shape)
+        sketch.frequencies.total = data["total"]
+        top_emojis = sketch.top_emojis
+        top_emojis.counts = {emoji: [count, error] for emoji, (count, error) in data["top_emojis"].items()}
+        top_emojis.heap = [(count, emoji) for emoji, (count, _) in top_emojis.counts.items()]
+        heapq.heapify(top_emojis.heap)
+        top_emojis.total = data["top_total"]
+        return sketch
+
+
+def main():
+    import random
+
+    from EmojiSentimentScoreCalculator import calculate_sentiment_scores
+
+    # A skewed stream: a few frequent emojis and a long tail of noisy one-off tokens
+    generator = random.Random(7)
+    frequent = ["😂", "😊", "😢", "😡", "❤️", "👍"]
+    positive_counts, negative_counts = {}, {}
+    positive_sketch = EmojiSketch(epsilon=0.01, delta=0.01, top_k=20)
+    negative_sketch = EmojiSketch(epsilon=0.01, delta=0.01, top_k=20)
+    for i in range(50000):
+        emoji = generator.choice(frequent) if generator.random() < 0.7 else f"noise{i}"
+        counts, sketch = (positive_counts, positive_sketch) if generator.random() < 0.6 else (negative_counts, negative_sketch)
+        counts[emoji] = counts.get(emoji, 0) + 1
+        sketch.add(emoji)
+
+    print(f"Exact counts: {len(positive_counts) + len(negative_counts)} emojis, "
+          f"sketches: {len(positive_sketch) + len(negative_sketch)} tracked emojis, "
+          f"error bound {positive_sketch.error_bound():.0f} / {negative_sketch.error_bound():.0f}")
+    for emoji in frequent:
+        print(f"{emoji}: positive {positive_counts.get(emoji, 0)} ~ {positive_sketch.get(emoji)}, "
+              f"negative {negative_counts.get(emoji, 0)} ~ {negative_sketch.get(emoji)}")
+
+    exact_scores = calculate_sentiment_scores(positive_counts, negative_counts)
+    sketch_scores = calculate_sentiment_scores(positive_sketch, negative_sketch)
+    print("Sentiment scores (exact ~ sketch):")
+    for emoji in frequent:
+        print(f"{emoji}: {exact_scores[emoji]:.3f} ~ {sketch_scores[emoji]:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,38 @@
-import pandas as pd
 from datetime import datetime
 import os
 
+# Column names of every report sheet
+REPORT_COLUMNS = ['Tweets', 'processed_text', 'positive_words_count', 'negative_words_count',
+                  'positive_emojis_count', 'negative_emojis_count', 'total_emojis_count', 'positive_score',
+                  'negative_score', 'emojis', 'sentiment', 'positive_emojis', 'negative_emojis']
+SHEET_COLUMNS = {
+    'report': REPORT_COLUMNS,
+    'total_positive_emojis': ['Emoji', 'Count'],
+    'total_negative_emojis': ['Emoji', 'Count'],
+    'emoji_sentiment_scores': ['Emoji', 'Score'],
+    'Classification_Results': ['Word', 'Sentiment'],
+    'VADER Sentiment Scores': ['Word', 'Score'],
+}
+
+
+def report_file_path(extension, output_folder='output'):
+    """
+    Return a timestamped report path (e.g. output/report_2024_1_31_12_0_0.xlsx), creating the folder if needed.
+    """
+    current_time = datetime.now()
+    file_name = f"report_{current_time.year}_{current_time.month}_{current_time.day}_{current_time.hour}_{current_time.minute}_{current_time.second}.{extension}"
+
+    # Ensure the output folder exists
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    return os.path.join(output_folder, file_name)
+
+
 class ExcelHelper:
     def __init__(self):
         # Define column names and initial fixed data
-        self.columns = ['Tweets', 'processed_text', 'positive_words_count', 'negative_words_count',
-                        'positive_emojis_count', 'negative_emojis_count', 'total_emojis_count', 'positive_score', 
-                        'negative_score', 'emojis', 'sentiment', 'positive_emojis', 'negative_emojis']
+        self.columns = REPORT_COLUMNS
         self.fixed_data = []
         
         # Emoji data
@@ -18,32 +43,23 @@ class ExcelHelper:
         self.vader_sentiment_scores = []  # Each entry: [word, score]
 
     def create_excel(self):
-        # Create an empty DataFrame with the specified columns
-        df = pd.DataFrame(columns=self.columns)
+        # pandas is only needed by this in-memory writer
+        import pandas as pd
 
-        # Loop to append fixed data rows to the DataFrame
-        for row in self.fixed_data:
-            new_row = pd.DataFrame([row], columns=self.columns)
-            df = pd.concat([df, new_row], ignore_index=True)
+        # Create the DataFrame with all the fixed data rows at once
+        df = pd.DataFrame(self.fixed_data, columns=self.columns, dtype=object)
 
         # Create DataFrames for all sheets
-        df_positive = pd.DataFrame(self.total_positive_emojis, columns=['Emoji', 'Count'])
-        df_negative = pd.DataFrame(self.total_negative_emojis, columns=['Emoji', 'Count'])
-        df_sentiment_scores = pd.DataFrame(self.emoji_sentiment_scores, columns=['Emoji', 'Score'])
-        df_sentiment_classification_results = pd.DataFrame(self.sentiment_classification_results, columns=['Word', 'Sentiment'])
-        df_vader_sentiment_scores = pd.DataFrame(self.vader_sentiment_scores, columns=['Word', 'Score'])
-
-        # Get the current time and format the filename
-        current_time = datetime.now()
-        file_name = f"report_{current_time.year}_{current_time.month}_{current_time.day}_{current_time.hour}_{current_time.minute}_{current_time.second}.xlsx"
-        
-        # Ensure the output folder exists
-        output_folder = 'output'
-        if not os.path.exists(output_folder):
-            os.makedirs(output_folder)
+        df_positive = pd.DataFrame(self.total_positive_emojis, columns=SHEET_COLUMNS['total_positive_emojis'])
+        df_negative = pd.DataFrame(self.total_negative_emojis, columns=SHEET_COLUMNS['total_negative_emojis'])
+        df_sentiment_scores = pd.DataFrame(self.emoji_sentiment_scores, columns=SHEET_COLUMNS['emoji_sentiment_scores'])
+        df_sentiment_classification_results = pd.DataFrame(self.sentiment_classification_results, columns=SHEET_COLUMNS['Classification_Results'])
+        df_vader_sentiment_scores = pd.DataFrame(self.vader_sentiment_scores, columns=SHEET_COLUMNS['VADER Sentiment Scores'])
 
-        # Define the full file path
-        file_path = os.path.join(output_folder, file_name)
+        # Get the timestamped file path in the output folder
+        file_path = report_file_path('xlsx')
+        file_name = os.path.basename(file_path)
+        output_folder = os.path.dirname(file_path)
 
         # Write the DataFrames to an Excel file with multiple sheets
         with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
@@ -80,6 +96,76 @@ class ExcelHelper:
         # Append data to the VADER sentiment scores
         self.vader_sentiment_scores.append([word, score])
 
+class StreamingExcelHelper:
+    """
+    Constant-memory variant of ExcelHelper with the same append_* methods.
+
+    Rows are written to the xlsx file as soon as they are appended (xlsxwriter's
+    constant_memory mode keeps only the current row of each sheet in memory), instead
+    of being collected and converted to DataFrames at the end. Call close() (or
+    create_excel()) to finish the workbook.
+    """
+
+    def __init__(self, file_path=None):
+        import xlsxwriter
+
+        self.file_path = file_path or report_file_path('xlsx')
+        self.workbook = xlsxwriter.Workbook(self.file_path, {'constant_memory': True, 'strings_to_urls': False})
+        header_format = self.workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+
+        # Create the sheets up front so they keep the same order as ExcelHelper's report
+        self.worksheets = {}
+        self.next_rows = {}
+        for sheet_name, columns in SHEET_COLUMNS.items():
+            worksheet = self.workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, columns, header_format)
+            self.worksheets[sheet_name] = worksheet
+            self.next_rows[sheet_name] = 1
+
+    def write_row(self, sheet_name, values):
+        # Numbers stay numbers, everything else is written as text (lists and dicts as their str())
+        worksheet = self.worksheets[sheet_name]
+        row = self.next_rows[sheet_name]
+        for column, value in enumerate(values):
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                worksheet.write_boolean(row, column, value)
+            elif isinstance(value, (int, float)):
+                worksheet.write_number(row, column, value)
+            else:
+                worksheet.write_string(row, column, value if isinstance(value, str) else str(value))
+        self.next_rows[sheet_name] = row + 1
+
+    def append_data(self, new_data):
+        # Write a row of the main report sheet
+        self.write_row('report', new_data)
+
+    def append_positive_emojis(self, emoji, count):
+        self.write_row('total_positive_emojis', [emoji, count])
+
+    def append_negative_emojis(self, emoji, count):
+        self.write_row('total_negative_emojis', [emoji, count])
+
+    def append_emoji_sentiment_score(self, emoji, score):
+        self.write_row('emoji_sentiment_scores', [emoji, score])
+
+    def append_sentiment_classification_result(self, word, sentiment):
+        self.write_row('Classification_Results', [word, sentiment])
+
+    def append_vader_sentiment_score(self, word, score):
+        self.write_row('VADER Sentiment Scores', [word, score])
+
+    def close(self):
+        # Flush the remaining rows of every sheet and finish the file
+        self.workbook.close()
+        file_name = os.path.basename(self.file_path)
+        output_folder = os.path.dirname(self.file_path)
+        print(f"Excel file '{file_name}' has been created and saved in the '{output_folder}' folder.")
+
+    def create_excel(self):
+        self.close()
+
 def main():
     # Create an instance of the ExcelHelper class
     excel_helper = ExcelHelper()
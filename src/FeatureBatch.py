@@ -0,0 +1,120 @@
+# Columnar (NumPy) feature matrix for batches of tweets
+
+import numpy as np
+
+from Configuration import Configuration
+from FeatureVector import FeatureVector
+from SentimentFeatureExtractor import SentimentFeatureExtractor
+
+
+class FeatureBatch:
+    """
+    Features of a batch of tweets stored column-wise in NumPy arrays.
+
+    - counts: int32 matrix (n, 5) with COUNT_COLUMNS
+    - scores: float32 matrix (n, 2) with SCORE_COLUMNS
+    - emoji_ids / emoji_offsets: ragged array of the tweets' emojis; the emojis of tweet i are
+      emoji_vocabulary[emoji_ids[emoji_offsets[i]:emoji_offsets[i + 1]]]
+    - sentiment: uint8 vector of labels, decoded with SENTIMENT_LABELS
+    """
+
+    COUNT_COLUMNS = ('positive_words_count', 'negative_words_count', 'positive_emojis_count',
+                     'negative_emojis_count', 'total_emojis_count')
+    SCORE_COLUMNS = ('positive_score', 'negative_score')
+    SENTIMENT_LABELS = (Configuration.Sentiment.negative, Configuration.Sentiment.positive)
+
+    def __init__(self, counts, scores, emoji_ids, emoji_offsets, emoji_vocabulary, sentiment):
+        self.counts = counts
+        self.scores = scores
+        self.emoji_ids = emoji_ids
+        self.emoji_offsets = emoji_offsets
+        self.emoji_vocabulary = emoji_vocabulary
+        self.sentiment = sentiment
+
+    @staticmethod
+    def from_tweets(extractor, tweets):
+        """
+        Extract the features of the tweets with a SentimentFeatureExtractor.
+
+        The sentiment label is decided on the full-precision scores, exactly as
+        extract_features_from_tweet does; only the stored scores are float32.
+        """
+        counts = []
+        scores = []
+        sentiment = []
+        emoji_ids = []
+        emoji_offsets = [0]
+        vocabulary_index = {}
+
+        for tweet in tweets:
+            (positive_words_count, negative_words_count, positive_emojis_count,
+             negative_emojis_count, positive_score, negative_score, emojis) = extractor.score_tweet(tweet)
+            counts.append((positive_words_count, negative_words_count, positive_emojis_count,
+                           negative_emojis_count, len(emojis)))
+            scores.append((positive_score, negative_score))
+            sentiment.append(1 if positive_score > negative_score else 0)
+            for emoji in emojis:
+                emoji_ids.append(vocabulary_index.setdefault(emoji, len(vocabulary_index)))
+            emoji_offsets.append(len(emoji_ids))
+
+        return FeatureBatch(
+            np.array(counts, dtype=np.int32).reshape(-1, len(FeatureBatch.COUNT_COLUMNS)),
+            np.array(scores, dtype=np.float32).reshape(-1, len(FeatureBatch.SCORE_COLUMNS)),
+            np.array(emoji_ids, dtype=np.int32),
+            np.array(emoji_offsets, dtype=np.int64),
+            list(vocabulary_index),
+            np.array(sentiment, dtype=np.uint8)
+        )
+
+    def __len__(self):
+        return len(self.sentiment)
+
+    def column(self, name):
+        """
+        Return one numeric column by its FeatureVector field name.
+        """
+        if name in self.COUNT_COLUMNS:
+            return self.counts[:, self.COUNT_COLUMNS.index(name)]
+        if name in self.SCORE_COLUMNS:
+            return self.scores[:, self.SCORE_COLUMNS.index(name)]
+        raise KeyError(name)
+
+    def emojis(self, index):
+        """
+        Return the list of emojis of one tweet.
+        """
+        ids = self.emoji_ids[self.emoji_offsets[index]:self.emoji_offsets[index + 1]]
+        return [self.emoji_vocabulary[emoji_id] for emoji_id in ids.tolist()]
+
+    def sentiments(self):
+        """
+        Return the sentiment labels as strings.
+        """
+        return [self.SENTIMENT_LABELS[label] for label in self.sentiment.tolist()]
+
+    def feature_vector(self, index):
+        """
+        Rebuild the FeatureVector of one tweet (scores are float32 precision).
+        """
+        feature_vector = FeatureVector()
+        for name, value in zip(self.COUNT_COLUMNS, self.counts[index].tolist()):
+            setattr(feature_vector, name, value)
+        for name, value in zip(self.SCORE_COLUMNS, self.scores[index].tolist()):
+            setattr(feature_vector, name, value)
+        feature_vector.emojis = self.emojis(index)
+        feature_vector.sentiment = self.SENTIMENT_LABELS[self.sentiment[index]]
+        return feature_vector
+
+
+def main():
+    extractor = SentimentFeatureExtractor()
+    batch = extractor.extract_features_batch(Configuration.fetch_tweets())
+    print(f"Tweets: {len(batch)}")
+    print(f"Counts matrix {batch.counts.shape} {batch.counts.dtype}, scores matrix {batch.scores.shape} {batch.scores.dtype}")
+    print(f"Distinct emojis: {len(batch.emoji_vocabulary)}, emoji occurrences: {len(batch.emoji_ids)}")
+    print(f"Positive tweets: {int(batch.sentiment.sum())}")
+    print(f"First tweet: {batch.feature_vector(0).to_one_line()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Feature vector shared by Algorithm 2 (Feature Extraction) and Algorithm 3 (Emoji Counter)
+
+import json
+import math
+import struct
+
+from Configuration import Configuration
+
+
+class FeatureVector:
+    """
+    Features of one tweet.
+
+    Uses __slots__ so millions of vectors can be held in memory, and serializes either to a
+    JSON line or to a compact struct-packed binary record, both appended to a reusable buffer.
+    """
+
+    __slots__ = ('positive_words_count', 'negative_words_count', 'positive_emojis_count',
+                 'negative_emojis_count', 'total_emojis_count', 'positive_score', 'negative_score',
+                 'emojis', 'sentiment')
+
+    # Binary record: 5 int32 counts, 2 float64 scores, sentiment code, number of emojis,
+    # followed by each emoji as a uint8 byte length and its UTF-8 bytes
+    RECORD_HEADER = struct.Struct('<5i2dBH')
+    SENTIMENT_CODES = {"": 0, Configuration.Sentiment.positive: 1, Configuration.Sentiment.negative: 2}
+    SENTIMENTS = {code: sentiment for sentiment, code in SENTIMENT_CODES.items()}
+
+    def __init__(self):
+        self.positive_words_count = 0
+        self.negative_words_count = 0
+        self.positive_emojis_count = 0
+        self.negative_emojis_count = 0
+        self.total_emojis_count = 0
+        self.positive_score = 0.0
+        self.negative_score = 0.0
+        self.emojis = []  # Store emojis for further processing in Emoji Counter
+        self.sentiment = ""  # Store sentiment for further processing
+
+    def to_dict(self):
+        return {
+            "positive_words_count": self.positive_words_count,
+            "negative_words_count": self.negative_words_count,
+            "positive_emojis_count": self.positive_emojis_count,
+            "negative_emojis_count": self.negative_emojis_count,
+            "total_emojis_count": self.total_emojis_count,
+            "positive_score": self.positive_score,
+            "negative_score": self.negative_score,
+            "emojis": self.emojis,
+            "sentiment": self.sentiment
+        }
+
+    def __str__(self):
+        return json.dumps(self.to_dict(), indent=4, ensure_ascii=False)
+
+    def to_one_line(self):
+        """
+        Return the vector as one JSON line (same text as json.dumps(self.to_dict(), ensure_ascii=False)).
+        """
+        positive_score = self.positive_score
+        negative_score = self.negative_score
+        if not (math.isfinite(positive_score) and math.isfinite(negative_score)):
+            return json.dumps(self.to_dict(), ensure_ascii=False)
+        return (
+            f'{{"positive_words_count": {self.positive_words_count!r}, '
+            f'"negative_words_count": {self.negative_words_count!r}, '
+            f'"positive_emojis_count": {self.positive_emojis_count!r}, '
+            f'"negative_emojis_count": {self.negative_emojis_count!r}, '
+            f'"total_emojis_count": {self.total_emojis_count!r}, '
+            f'"positive_score": {positive_score!r}, '
+            f'"negative_score": {negative_score!r}, '
+            f'"emojis": {json.dumps(self.emojis, ensure_ascii=False)}, '
+            f'"sentiment": {json.dumps(self.sentiment, ensure_ascii=False)}}}'
+        )
+
+    def write_json_line(self, buffer):
+        """
+        Append the vector as a UTF-8 JSON line to a bytearray (clear and reuse it between flushes).
+        """
+        buffer += self.to_one_line().encode('utf-8')
+        buffer += b'\n'
+
+    def pack_into(self, buffer):
+        """
+        Append the vector as a binary record to a bytearray (clear and reuse it between flushes).
+        """
+        buffer += self.RECORD_HEADER.pack(
+            self.positive_words_count, self.negative_words_count, self.positive_emojis_count,
+            self.negative_emojis_count, self.total_emojis_count, self.positive_score,
+            self.negative_score, self.SENTIMENT_CODES[self.sentiment], len(self.emojis))
+        for emoji in self.emojis:
+            encoded = emoji.encode('utf-8')
+            buffer.append(len(encoded))
+            buffer += encoded
+
+    @staticmethod
+    def unpack_from(buffer, offset=0):
+        """
+        Read one binary record written by pack_into.
+
+        :return: Tuple (feature_vector, offset of the next record).
+        """
+        feature_vector = FeatureVector()
+        (feature_vector.positive_words_count, feature_vector.negative_words_count,
+         feature_vector.positive_emojis_count, feature_vector.negative_emojis_count,
+         feature_vector.total_emojis_count, feature_vector.positive_score,
+         feature_vector.negative_score, sentiment_code, emoji_count) = FeatureVector.RECORD_HEADER.unpack_from(buffer, offset)
+        feature_vector.sentiment = FeatureVector.SENTIMENTS[sentiment_code]
+        offset += FeatureVector.RECORD_HEADER.size
+
+        view = memoryview(buffer)
+        for _ in range(emoji_count):
+            length = view[offset]
+            feature_vector.emojis.append(str(view[offset + 1:offset + 1 + length], 'utf-8'))
+            offset += 1 + length
+        return feature_vector, offset
+
+    @staticmethod
+    def iter_records(buffer):
+        """
+        Yield every FeatureVector stored in a buffer of binary records.
+        """
+        offset = 0
+        while offset < len(buffer):
+            feature_vector, offset = FeatureVector.unpack_from(buffer, offset)
+            yield feature_vector
@@ -0,0 +1,215 @@
+# Hashing-trick vectorizer for token, token-bigram, character n-gram and emoji features
+
+import zlib
+
+import numpy as np
+
+from Configuration import Configuration
+
+
+class CSRMatrix:
+    """
+    Compressed sparse row matrix: the non-zero values of row i are data[indptr[i]:indptr[i + 1]]
+    in the columns indices[indptr[i]:indptr[i + 1]] (sorted, without duplicates).
+
+    Convert it with to_scipy() when SciPy is installed; it is not required otherwise.
+    """
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = shape
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def row(self, index):
+        """
+        Return the (indices, values) of one row.
+        """
+        start, end = self.indptr[index], self.indptr[index + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def dot(self, vector):
+        """
+        Return the product of the matrix with a dense vector of shape[1] values.
+        """
+        products = self.data * np.asarray(vector)[self.indices]
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        return np.bincount(rows, weights=products, minlength=self.shape[0])
+
+    def toarray(self):
+        array = np.zeros(self.shape, dtype=self.data.dtype)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        array[rows, self.indices] = self.data
+        return array
+
+    def to_scipy(self):
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+    @staticmethod
+    def vstack(matrices):
+        """
+        Stack CSR matrices with the same number of columns on top of each other.
+        """
+        matrices = list(matrices)
+        if not matrices:
+            raise ValueError("Cannot stack an empty list of matrices.")
+        indptr = [matrices[0].indptr[:1]]
+        offset = 0
+        for matrix in matrices:
+            indptr.append(matrix.indptr[1:] + offset)
+            offset += matrix.nnz
+        return CSRMatrix(np.concatenate([matrix.data for matrix in matrices]),
+                         np.concatenate([matrix.indices for matrix in matrices]),
+                         np.concatenate(indptr),
+                         (sum(len(matrix) for matrix in matrices), matrices[0].shape[1]))
+
+
+class HashingVectorizer:
+    """
+    Turn tweets into sparse feature rows of a fixed width with the hashing trick.
+
+    Every feature (a token, a pair of consecutive tokens, a character n-gram of a token or an
+    emoji) is hashed with CRC-32 to one of n_features columns, and with alternate_sign one bit
+    of the hash gives its sign, so colliding features tend to cancel out instead of adding up.
+    No vocabulary is kept: memory does not grow with the number of distinct features, and
+    the same feature gets the same column in every process and run.
+
+    Tokens and emojis come from SentimentFeatureExtractor.tokenize and extract_emojis, as in
+    Algorithm 2. Feature kinds are prefixed before hashing so that e.g. a token and a character
+    n-gram with the same text fall into different columns.
+    """
+
+    def __init__(self, n_features=Configuration.Hashing.n_features, ngram_range=Configuration.Hashing.ngram_range,
+                 char_ngram_range=Configuration.Hashing.char_ngram_range, emojis=True, alternate_sign=True,
+                 binary=False, norm='l2', extractor=None):
+        """
+        :param n_features: Number of columns of the output matrices.
+        :param ngram_range: (min_n, max_n) of the token n-grams, e.g. (1, 2) for unigrams and bigrams.
+        :param char_ngram_range: (min_n, max_n) of the character n-grams taken inside each token
+                                 (padded with spaces), or None for no character n-grams.
+        :param emojis: Add the extracted emojis as features.
+        :param alternate_sign: Give each feature a sign taken from its hash.
+        :param binary: Count each feature once per tweet.
+        :param norm: 'l2', 'l1' or None, normalization of each row.
+        :param extractor: SentimentFeatureExtractor used to tokenize the tweets and extract their
+                          emojis (created when not given).
+        """
+        if norm not in ('l1', 'l2', None):
+            raise ValueError(f"Unknown norm '{norm}', expected 'l1', 'l2' or None.")
+        if extractor is None:
+            from SentimentFeatureExtractor import SentimentFeatureExtractor
+            extractor = SentimentFeatureExtractor()
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.char_ngram_range = char_ngram_range
+        self.emojis = emojis
+        self.alternate_sign = alternate_sign
+        self.binary = binary
+        self.norm = norm
+        self.extractor = extractor
+
+    def features(self, tweet):
+        """
+        Return the list of feature strings of a tweet (before hashing), with repetitions.
+        """
+        tokens = self.extractor.tokenize(tweet)
+        features = []
+        min_n, max_n = self.ngram_range
+        for n in range(max(min_n, 1), max_n + 1):
+            if n == 1:
+                features.extend('w ' + token for token in tokens)
+            else:
+                features.extend(f'w{n} ' + ' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        if self.char_ngram_range is not None:
+            min_n, max_n = self.char_ngram_range
+            for token in tokens:
+                padded = ' ' + token + ' '
+                for n in range(min_n, min(max_n, len(padded)) + 1):
+                    features.extend(f'c{n} ' + padded[i:i + n] for i in range(len(padded) - n + 1))
+        if self.emojis:
+            features.extend('e ' + emoji for emoji in self.extractor.extract_emojis(tweet))
+        return features
+
+    def transform(self, tweets):
+        """
+        Vectorize a batch of tweets.
+
+        :param tweets: List of tweets.
+        :return: CSRMatrix of shape (len(tweets), n_features) with float32 values.
+        """
+        crc32 = zlib.crc32
+        hashes = []
+        row_lengths = []
+        for tweet in tweets:
+            features = self.features(tweet)
+            hashes.extend(crc32(feature.encode('utf-8')) for feature in features)
+            row_lengths.append(len(features))
+        hashes = np.array(hashes, dtype=np.int64)
+        rows = np.repeat(np.arange(len(row_lengths), dtype=np.int64), row_lengths)
+
+        # Sum the values of the features hashed to the same cell (row, column)
+        columns = hashes % self.n_features
+        values = np.where(hashes & (1 << 31), -1.0, 1.0) if self.alternate_sign else np.ones(len(hashes))
+        cells, inverse = np.unique(rows * self.n_features + columns, return_inverse=True)
+        data = np.bincount(inverse, weights=values)
+        if self.binary:
+            data = np.sign(data)
+
+        # Drop the cells where colliding features cancelled out
+        kept = data != 0
+        cells, data = cells[kept], data[kept]
+        cell_rows = cells // self.n_features
+        indptr = np.zeros(len(row_lengths) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell_rows, minlength=len(row_lengths)), out=indptr[1:])
+
+        if self.norm is not None and len(data):
+            magnitudes = np.abs(data) if self.norm == 'l1' else data * data
+            row_norms = np.bincount(cell_rows, weights=magnitudes, minlength=len(row_lengths))
+            if self.norm == 'l2':
+                row_norms = np.sqrt(row_norms)
+            data = data / row_norms[cell_rows]
+
+        return CSRMatrix(data.astype(np.float32), (cells % self.n_features).astype(np.int32), indptr,
+                         (len(row_lengths), self.n_features))
+
+    def iter_transform(self, tweets, batch_size=Configuration.Ingestion.chunk_size):
+        """
+        Vectorize a stream of tweets batch by batch, yielding one CSRMatrix per batch.
+        """
+        batch = []
+        for tweet in tweets:
+            batch.append(tweet)
+            if len(batch) == batch_size:
+                yield self.transform(batch)
+                batch = []
+        if batch:
+            yield self.transform(batch)
+
+
+def main():
+    vectorizer = HashingVectorizer(n_features=1 << 10, char_ngram_range=(2, 3))
+    tweets = ["أنا سعيد جدًا اليوم 😊", "أنا حزين جدًا اليوم 😢", "لماذا أنت غاضب😞  😡؟"]
+    for tweet in tweets:
+        print(tweet, vectorizer.features(tweet)[:8])
+
+    matrix = vectorizer.transform(tweets)
+    print(f"Shape {matrix.shape}, {matrix.nnz} non-zero values")
+    for index in range(len(matrix)):
+        columns, values = matrix.row(index)
+        print(index, [(column, round(value, 3)) for column, value in zip(columns.tolist(), values.tolist())][:6])
+
+    # Streaming over the tweets file: the memory used does not depend on the vocabulary
+    matrix = CSRMatrix.vstack(HashingVectorizer().iter_transform(Configuration.fetch_tweets(), batch_size=100))
+    print(f"Tweets file: shape {matrix.shape}, {matrix.nnz} non-zero values")
+
+
+if __name__ == "__main__":
+    main()
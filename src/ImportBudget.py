@@ -0,0 +1,91 @@
+# Import-time budget of the headless scoring modules (no GUI, pandas or openpyxl at import)
+
+import os
+import subprocess
+import sys
+
+from Configuration import Configuration
+
+# Modules of the headless scoring core: batch and cron workers, the scoring server and the
+# report writers. The GUI modules (main, Application, VirtualTable) are not part of it.
+HEADLESS_MODULES = ('Configuration', 'LexiconCache', 'TextPreprocessor', 'SentimentFeatureExtractor',
+                    'EmojiExtractor', 'EmojiCounter', 'EmojiSentimentScoreCalculator', 'EmojiSketch', 'FeatureVector',
+                    'TweetReader', 'TweetCache', 'BatchProcessor', 'EmoSLPipeline', 'PipelineWorker',
+                    'ReportSinks', 'Excel_Helper', 'CheckpointJournal', 'Application_LV', 'ScoringServer')
+
+
+class ImportBudget:
+    """
+    Measure the import time of modules in fresh interpreters (python -X importtime) and check
+    it against a budget. Also check that no forbidden heavy module (GUI toolkit, pandas,
+    openpyxl, ...) is loaded at import time.
+    """
+
+    @staticmethod
+    def measure(module, repeats=3):
+        """
+        Import a module in `repeats` fresh interpreters.
+
+        :return: Tuple (best cumulative import time in seconds, set of the modules loaded).
+        """
+        source_dir = os.path.dirname(os.path.abspath(__file__))
+        best = None
+        loaded = set()
+        for _ in range(repeats):
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', f"import sys, {module}; print(' '.join(sys.modules))"],
+                cwd=source_dir, capture_output=True, text=True)
+            if result.returncode:
+                raise ImportError(f"Cannot import {module}: {result.stderr.strip().splitlines()[-1]}")
+            loaded = set(result.stdout.split())
+            # Lines are "import time: self [us] | cumulative | name", top-level imports are not indented
+            for line in result.stderr.splitlines():
+                fields = line.split('|')
+                if len(fields) == 3 and fields[2].rstrip() == ' ' + module:
+                    seconds = int(fields[1]) / 1e6
+                    best = seconds if best is None else min(best, seconds)
+        return best or 0.0, loaded
+
+    @staticmethod
+    def check(modules=HEADLESS_MODULES, budget=Configuration.ImportBudget.seconds,
+              forbidden=Configuration.ImportBudget.forbidden):
+        """
+        Print the import time of each module and return the budget violations.
+
+        :return: List of violation messages (empty when every module is within budget).
+        """
+        violations = []
+        for module in modules:
+            seconds, loaded = ImportBudget.measure(module)
+            heavy = sorted(name for name in forbidden if name in loaded)
+            print(f"{module:<30} {seconds * 1000:>8.1f} ms  {', '.join(heavy)}")
+            if seconds > budget:
+                violations.append(f"{module} takes {seconds * 1000:.1f} ms to import (budget {budget * 1000:.0f} ms)")
+            if heavy:
+                violations.append(f"{module} imports {', '.join(heavy)} at import time")
+        return violations
+
+
+def main(budget=Configuration.ImportBudget.seconds):
+    """
+    Check the headless modules and print the violations.
+
+    :return: List of violation messages.
+    """
+    violations = ImportBudget.check(budget=budget)
+    for violation in violations:
+        print(violation)
+    if not violations:
+        print(f"All {len(HEADLESS_MODULES)} headless modules are within the {budget * 1000:.0f} ms import budget.")
+    return violations
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check the import time of the headless scoring modules.")
+    parser.add_argument('--budget-ms', type=float, default=Configuration.ImportBudget.seconds * 1000)
+    args = parser.parse_args()
+
+    # A non-zero exit code fails the CI job when a module is over budget
+    sys.exit(1 if main(args.budget_ms / 1000) else 0)
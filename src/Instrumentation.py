@@ -0,0 +1,184 @@
+# Opt-in per-stage instrumentation of Algorithms 1 and 2 (counters, time, allocations, latency histograms)
+
+import bisect
+import json
+import time
+import tracemalloc
+
+# Upper bounds (seconds) of the latency histogram buckets, as in Prometheus histograms
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+
+class StageStats:
+    """
+    Counters of one named stage: calls, cumulative time, bytes allocated and latency histogram.
+    """
+
+    __slots__ = ('count', 'total_ns', 'allocated_bytes', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.allocated_bytes = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # Last bucket is +Inf
+
+    def record(self, elapsed_ns, allocated_bytes=0):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.allocated_bytes += allocated_bytes
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed_ns / 1e9)] += 1
+
+    def to_dict(self):
+        cumulative = 0
+        histogram = {}
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), self.buckets):
+            cumulative += count
+            histogram[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'total_seconds': self.total_ns / 1e9,
+            'mean_us': self.total_ns / self.count / 1e3 if self.count else 0.0,
+            'allocated_bytes': self.allocated_bytes,
+            'histogram': histogram,
+        }
+
+
+class Instrumentation:
+    """
+    Process-wide registry of stage statistics.
+
+    Disabled by default: the instrumented code paths only check Instrumentation.enabled and
+    run their normal, untimed code when it is False. When enabled, each named step (e.g.
+    'preprocess.normalize', 'features.emoji_lookup') is timed with perf_counter_ns and, with
+    track_allocations, the peak memory allocated during the step is measured with tracemalloc.
+    """
+
+    enabled = False
+    track_allocations = False
+    stages = {}
+    _started_tracemalloc = False
+
+    @staticmethod
+    def enable(track_allocations=False):
+        """
+        :param track_allocations: Also measure the bytes allocated by each step (tracemalloc, much slower).
+        """
+        Instrumentation.track_allocations = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            Instrumentation._started_tracemalloc = True
+        Instrumentation.enabled = True
+
+    @staticmethod
+    def disable():
+        Instrumentation.enabled = False
+        if Instrumentation._started_tracemalloc:
+            tracemalloc.stop()
+            Instrumentation._started_tracemalloc = False
+        Instrumentation.track_allocations = False
+
+    @staticmethod
+    def reset():
+        Instrumentation.stages = {}
+
+    @staticmethod
+    def record(name, elapsed_ns, allocated_bytes=0):
+        stats = Instrumentation.stages.get(name)
+        if stats is None:
+            stats = Instrumentation.stages[name] = StageStats()
+        stats.record(elapsed_ns, allocated_bytes)
+
+    @staticmethod
+    def measure(name, function, *args):
+        """
+        Call function(*args) and record its time (and allocations) under name.
+        Steps are measured one after another, not nested.
+
+        :return: The function's return value.
+        """
+        if Instrumentation.track_allocations:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter_ns()
+            result = function(*args)
+            elapsed_ns = time.perf_counter_ns() - start
+            Instrumentation.record(name, elapsed_ns, max(tracemalloc.get_traced_memory()[1] - before, 0))
+        else:
+            start = time.perf_counter_ns()
+            result = function(*args)
+            Instrumentation.record(name, time.perf_counter_ns() - start)
+        return result
+
+    @staticmethod
+    def summary():
+        """
+        Return the statistics of every stage, plus each stage's share of the total time.
+        """
+        stages = {name: stats.to_dict() for name, stats in sorted(Instrumentation.stages.items())}
+        total_seconds = sum(stats['total_seconds'] for stats in stages.values())
+        for stats in stages.values():
+            stats['time_share'] = stats['total_seconds'] / total_seconds if total_seconds else 0.0
+        return stages
+
+    @staticmethod
+    def to_json():
+        return json.dumps(Instrumentation.summary(), indent=4)
+
+    @staticmethod
+    def to_prometheus(prefix='emosl'):
+        """
+        Return the statistics in the Prometheus text exposition format.
+        """
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for name, stats in sorted(Instrumentation.stages.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), stats.buckets):
+                cumulative += count
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats.total_ns / 1e9}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats.count}')
+        lines.append(f"# HELP {prefix}_stage_allocated_bytes_total Peak bytes allocated by each pipeline stage.")
+        lines.append(f"# TYPE {prefix}_stage_allocated_bytes_total counter")
+        for name, stats in sorted(Instrumentation.stages.items()):
+            lines.append(f'{prefix}_stage_allocated_bytes_total{{stage="{name}"}} {stats.allocated_bytes}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def write(file_name):
+        """
+        Write the run summary to a file: Prometheus text for .prom/.txt files, JSON otherwise.
+        """
+        text = Instrumentation.to_prometheus() if file_name.endswith(('.prom', '.txt')) else Instrumentation.to_json()
+        with open(file_name, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+
+def main():
+    # The pipeline modules import this file as the Instrumentation module, not as __main__
+    from Instrumentation import Instrumentation
+    from Configuration import Configuration
+    from SentimentFeatureExtractor import SentimentFeatureExtractor
+    from TextPreprocessor import PreprocessorPipeline
+
+    preprocessor = PreprocessorPipeline()
+    extractor = SentimentFeatureExtractor()
+
+    # Instrument Algorithms 1 and 2 over the tweets
+    Instrumentation.enable(track_allocations=True)
+    for tweet in Configuration.fetch_tweets():
+        extractor.extract_features_from_tweet(preprocessor.preprocess_text(tweet))
+    Instrumentation.disable()
+
+    for name, stats in Instrumentation.summary().items():
+        print(f"{name:<28} {stats['count']:>6} calls {stats['mean_us']:>9.2f} us/call "
+              f"{stats['time_share']:>7.1%} {stats['allocated_bytes']:>10} bytes")
+    print()
+    print(Instrumentation.to_prometheus())
+
+
+if __name__ == "__main__":
+    main()
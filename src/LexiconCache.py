@@ -0,0 +1,154 @@
+import hashlib
+import os
+import pickle
+
+
+class LexiconCache:
+    """
+    Compiled binary snapshot of the sentiment lexicon workbook.
+
+    Every sheet of the workbook is parsed once with openpyxl and its raw data
+    rows (header excluded) are written to a pickle file next to the workbook.
+    The snapshot records the workbook's modification time and SHA-256 hash, so
+    it is rebuilt automatically whenever the xlsx file changes.
+    """
+
+    MAGIC = b"EMOSLLEX"
+    VERSION = 1
+
+    # Snapshots already loaded in this process, keyed by workbook path
+    _loaded = {}
+
+    @staticmethod
+    def cache_path(file_name):
+        """
+        Return the snapshot path for a workbook (e.g. 'Data/sentiment_lexicon.bin').
+        """
+        return os.path.splitext(file_name)[0] + ".bin"
+
+    @staticmethod
+    def file_hash(file_name):
+        """
+        Compute the SHA-256 hash of a file's content.
+        """
+        digest = hashlib.sha256()
+        with open(file_name, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 16), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def compile_workbook(file_name):
+        """
+        Parse every sheet of the workbook into a dictionary of row tuples.
+
+        :param file_name: Path to the xlsx workbook.
+        :return: A dictionary where keys are sheet names and values are lists of rows.
+            The active sheet is stored first so it stays the default sheet.
+        """
+        # openpyxl is only needed when the snapshot is (re)built
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(file_name, read_only=True)
+        try:
+            active = workbook.active
+            worksheets = [active] + [sheet for sheet in workbook.worksheets if sheet.title != active.title]
+            sheets = {}
+            for sheet in worksheets:
+                sheets[sheet.title] = [tuple(row) for row in sheet.iter_rows(min_row=2, values_only=True)]
+            return sheets
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def read_snapshot(cache_file):
+        """
+        Read a snapshot file, returning None if it is missing or unreadable.
+        """
+        try:
+            with open(cache_file, 'rb') as file:
+                if file.read(len(LexiconCache.MAGIC)) != LexiconCache.MAGIC:
+                    return None
+                snapshot = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get("version") != LexiconCache.VERSION:
+            return None
+        return snapshot
+
+    @staticmethod
+    def write_snapshot(cache_file, snapshot):
+        """
+        Atomically write a snapshot file. Failures (e.g. a read-only data folder) are not fatal.
+        """
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, 'wb') as file:
+                file.write(LexiconCache.MAGIC)
+                pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            print(f"Could not write lexicon cache '{cache_file}': {e}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+    @staticmethod
+    def load(file_name):
+        """
+        Return the sheets of a workbook, using the compiled snapshot when it is up to date.
+
+        The snapshot is trusted when the workbook's mtime and size match; otherwise the
+        content hash decides whether the workbook really changed and has to be recompiled.
+
+        :param file_name: Path to the xlsx workbook.
+        :return: A dictionary where keys are sheet names and values are lists of rows.
+        """
+        stat = os.stat(file_name)
+        cached = LexiconCache._loaded.get(file_name)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            return cached["sheets"]
+
+        cache_file = LexiconCache.cache_path(file_name)
+        snapshot = LexiconCache.read_snapshot(cache_file)
+
+        if not (snapshot and snapshot["mtime_ns"] == stat.st_mtime_ns and snapshot["size"] == stat.st_size):
+            content_hash = LexiconCache.file_hash(file_name)
+            if not (snapshot and snapshot["sha256"] == content_hash):
+                snapshot = {
+                    "version": LexiconCache.VERSION,
+                    "sha256": content_hash,
+                    "sheets": LexiconCache.compile_workbook(file_name),
+                }
+            # Same content with a new mtime (e.g. a fresh checkout) only refreshes the stamp
+            snapshot["mtime_ns"] = stat.st_mtime_ns
+            snapshot["size"] = stat.st_size
+            LexiconCache.write_snapshot(cache_file, snapshot)
+
+        LexiconCache._loaded[file_name] = snapshot
+        return snapshot["sheets"]
+
+    @staticmethod
+    def fetch_rows(file_name, sheet_name):
+        """
+        Return the data rows of one sheet.
+
+        :param file_name: Path to the xlsx workbook.
+        :param sheet_name: Name of the sheet, or None for the active sheet.
+        :raises KeyError: If the sheet does not exist in the workbook.
+        """
+        sheets = LexiconCache.load(file_name)
+        if not sheet_name:
+            return next(iter(sheets.values()), [])
+        return sheets[sheet_name]
+
+
+def main():
+    file_name = 'Data/sentiment_lexicon.xlsx'
+    sheets = LexiconCache.load(file_name)
+    print(f"Compiled '{file_name}' into '{LexiconCache.cache_path(file_name)}':")
+    for sheet_name, rows in sheets.items():
+        print(f"{sheet_name}: {len(rows)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# Versioned, memory-mappable bundle of everything the scoring pipeline loads at startup
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+from Configuration import Configuration
+
+
+class MappedLexicon(Mapping):
+    """
+    Read-only dictionary of key -> score whose scores stay in a (memory-mapped) float64 array.
+
+    Only the keys and their row numbers are held by each process; the scores are read from
+    the array, so the processes mapping the same .npy file share one read-only copy of them
+    through the OS page cache.
+    """
+
+    def __init__(self, keys, scores):
+        """
+        :param keys: List of keys, in the order of the scores.
+        :param scores: 1-D float64 array (e.g. np.load(..., mmap_mode='r')).
+        """
+        if len(keys) != len(scores):
+            raise ValueError(f"{len(keys)} keys for {len(scores)} scores.")
+        self.index = {key: row for row, key in enumerate(keys)}
+        self.array = scores
+        # Indexing a memoryview returns Python floats, without a NumPy scalar per lookup
+        self.scores = memoryview(np.ascontiguousarray(scores)).cast('B').cast('d') if len(scores) else []
+
+    def __getitem__(self, key):
+        return self.scores[self.index[key]]
+
+    def get(self, key, default=None):
+        row = self.index.get(key)
+        return default if row is None else self.scores[row]
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+
+class ModelBundle:
+    """
+    Directory holding the resources of Algorithms 1, 2 and 5 in a form that loads without
+    parsing the workbook or relearning anything:
+
+    - manifest.json: format version, content version, source lexicon version and the
+      SHA-256 of every file
+    - <lexicon>.keys.txt and <lexicon>.npy for the word lexicon, the emoji lexicon and the
+      learned Emoji Sentiment Lexicon (EmoSL): the keys one per line and their scores as a
+      float64 array in the same order
+    - normalization_patterns.json, stop_words.txt, positive_lexicon.txt, negative_lexicon.txt
+      and emojis.txt
+    - classifier_weights.npy when a trained SentimentClassifier is bundled
+
+    The .npy arrays are opened with np.load(mmap_mode='r') and the lexicons are loaded as
+    MappedLexicon objects reading their scores from them, so the processes scoring with the
+    same bundle share the score pages read-only through the OS page cache.
+    """
+
+    FORMAT = "emosl-model-bundle"
+    FORMAT_VERSION = 1
+    LEXICONS = ('sentiment_lexicon', 'emoji_sentiment_lexicon', 'emosl_lexicon')
+    WORD_LISTS = ('stop_words', 'positive_lexicon', 'negative_lexicon', 'emojis')
+
+    def __init__(self, sentiment_lexicon, emoji_sentiment_lexicon, emosl_lexicon, normalization_patterns,
+                 stop_words, positive_lexicon, negative_lexicon, emojis, classifier=None, manifest=None):
+        self.sentiment_lexicon = sentiment_lexicon
+        self.emoji_sentiment_lexicon = emoji_sentiment_lexicon
+        self.emosl_lexicon = emosl_lexicon
+        self.normalization_patterns = normalization_patterns
+        self.stop_words = stop_words
+        self.positive_lexicon = positive_lexicon
+        self.negative_lexicon = negative_lexicon
+        self.emojis = emojis
+        self.classifier = classifier
+        self.manifest = manifest or {}
+
+    @property
+    def version(self):
+        return self.manifest.get('version', '')
+
+    @staticmethod
+    def from_sources(tweets=None, classifier=None):
+        """
+        Load the resources from the configured xlsx and txt files and learn the EmoSL from a corpus.
+
+        :param tweets: Corpus the Emoji Sentiment Lexicon is learned from (defaults to the tweets file).
+        :param classifier: Optional trained SentimentClassifier to bundle.
+        """
+        from EmoSLArabicTweets import EmoSLArabicTweets
+
+        positive_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.positive_lexicon)
+        negative_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.negative_lexicon)
+        emojis = Configuration.fetch_data_from_file(Configuration.FileName.emojis)
+
+        # Algorithm 5 Steps 1 and 2, done once here instead of at every startup
+        emosl = EmoSLArabicTweets(positive_lexicon, negative_lexicon)
+        tweets = Configuration.fetch_tweets() if tweets is None else tweets
+        emosl.build_emo_sl(emosl.preprocess_data(tweets), set(emojis))
+
+        return ModelBundle(
+            Configuration.fetch_setting(Configuration.SheetName.sentiment_lexicon),
+            Configuration.fetch_setting(Configuration.SheetName.emoji_sentiment_lexicon),
+            emosl.emoji_sentiment_lexicon,
+            Configuration.fetch_setting_pattern(Configuration.SheetName.normalization_patterns),
+            Configuration.fetch_data_from_file(Configuration.FileName.stopWordsFileName),
+            positive_lexicon,
+            negative_lexicon,
+            emojis,
+            classifier
+        )
+
+    @staticmethod
+    def file_hash(file_name):
+        digest = hashlib.sha256()
+        with open(file_name, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 16), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def write_lines(file_name, lines):
+        with open(file_name, 'w', encoding='utf-8', newline='\n') as file:
+            for line in lines:
+                file.write(line + '\n')
+
+    @staticmethod
+    def read_lines(file_name):
+        with open(file_name, 'r', encoding='utf-8', newline='\n') as file:
+            return file.read().split('\n')[:-1]
+
+    def save(self, directory=Configuration.FileName.model_bundle):
+        """
+        Write the bundle to a directory, replacing an existing bundle only once the new one is complete.
+        """
+        from TweetCache import TweetCache
+
+        staging = directory.rstrip('/\\') + '.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        for name in self.LEXICONS:
+            lexicon = getattr(self, name)
+            ModelBundle.write_lines(os.path.join(staging, name + '.keys.txt'), lexicon)
+            np.save(os.path.join(staging, name + '.npy'), np.array(list(lexicon.values()), dtype=np.float64))
+        for name in self.WORD_LISTS:
+            ModelBundle.write_lines(os.path.join(staging, name + '.txt'), getattr(self, name))
+        with open(os.path.join(staging, 'normalization_patterns.json'), 'w', encoding='utf-8') as file:
+            # A list of pairs keeps the order the normalization steps are applied in
+            json.dump(list(self.normalization_patterns.items()), file, ensure_ascii=False)
+
+        classifier = None
+        if self.classifier is not None:
+            np.save(os.path.join(staging, 'classifier_weights.npy'), np.asarray(self.classifier.weights, dtype=np.float64))
+            classifier = {
+                'columns': list(self.classifier.columns),
+                'loss': self.classifier.loss,
+                'neutral_margin': self.classifier.neutral_margin,
+                'bias': self.classifier.bias,
+            }
+
+        files = {name: ModelBundle.file_hash(os.path.join(staging, name)) for name in sorted(os.listdir(staging))}
+        content = hashlib.sha256(json.dumps([files, classifier], sort_keys=True).encode('utf-8'))
+        self.manifest = {
+            'format': self.FORMAT,
+            'format_version': self.FORMAT_VERSION,
+            'version': content.hexdigest()[:16],
+            'lexicon_version': TweetCache.lexicon_version(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'classifier': classifier,
+            'files': files,
+        }
+        with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as file:
+            json.dump(self.manifest, file, indent=4)
+
+        # Swap the complete bundle in
+        previous = directory.rstrip('/\\') + '.old'
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.exists(directory):
+            os.replace(directory, previous)
+        os.replace(staging, directory)
+        shutil.rmtree(previous, ignore_errors=True)
+        return self
+
+    @staticmethod
+    def load(directory=Configuration.FileName.model_bundle, mmap=True, verify=False):
+        """
+        Load a bundle written by save().
+
+        :param directory: Bundle directory.
+        :param mmap: Memory-map the .npy arrays read-only instead of reading them into memory (the
+                     lexicons are MappedLexicon objects either way).
+        :param verify: Check the SHA-256 of every file against the manifest.
+        :return: ModelBundle
+        """
+        with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        if manifest.get('format') != ModelBundle.FORMAT or manifest.get('format_version') != ModelBundle.FORMAT_VERSION:
+            raise ValueError(f"'{directory}' is not a version {ModelBundle.FORMAT_VERSION} model bundle.")
+        if verify:
+            for name, digest in manifest['files'].items():
+                if ModelBundle.file_hash(os.path.join(directory, name)) != digest:
+                    raise ValueError(f"The file '{name}' of the model bundle '{directory}' is corrupted.")
+
+        mmap_mode = 'r' if mmap else None
+        lexicons = {}
+        for name in ModelBundle.LEXICONS:
+            keys = ModelBundle.read_lines(os.path.join(directory, name + '.keys.txt'))
+            scores = np.load(os.path.join(directory, name + '.npy'), mmap_mode=mmap_mode)
+            lexicons[name] = MappedLexicon(keys, scores)
+        word_lists = {name: ModelBundle.read_lines(os.path.join(directory, name + '.txt'))
+                      for name in ModelBundle.WORD_LISTS}
+        with open(os.path.join(directory, 'normalization_patterns.json'), 'r', encoding='utf-8') as file:
+            normalization_patterns = dict(json.load(file))
+
+        classifier = None
+        if manifest.get('classifier'):
+            from SentimentClassifier import SentimentClassifier
+
+            settings = manifest['classifier']
+            classifier = SentimentClassifier(settings['columns'], settings['loss'], settings['neutral_margin'])
+            classifier.weights = np.load(os.path.join(directory, 'classifier_weights.npy'), mmap_mode=mmap_mode)
+            classifier.bias = settings['bias']
+
+        bundle = ModelBundle(classifier=classifier, normalization_patterns=normalization_patterns, manifest=manifest,
+                             **lexicons, **word_lists)
+        # Without the source files (e.g. a deployed bundle) there is nothing to compare with
+        if os.path.exists(Configuration.FileName.sentiment_lexicon) and bundle.is_stale():
+            print(f"Warning: the model bundle '{directory}' is older than the lexicon files, "
+                  f"rebuild it with python src/ModelBundle.py.")
+        return bundle
+
+    def is_stale(self):
+        """
+        Return True if the source lexicon files changed since the bundle was built.
+        """
+        from TweetCache import TweetCache
+        return self.manifest.get('lexicon_version') != TweetCache.lexicon_version()
+
+    def create_preprocessor(self):
+        from TextPreprocessor import PreprocessorPipeline
+        return PreprocessorPipeline(self.normalization_patterns, self.stop_words)
+
+    def create_extractor(self):
+        from SentimentFeatureExtractor import SentimentFeatureExtractor
+        return SentimentFeatureExtractor(self.sentiment_lexicon, self.emoji_sentiment_lexicon, self.emojis)
+
+    def create_emosl(self):
+        """
+        Return an EmoSLArabicTweets with the learned Emoji Sentiment Lexicon and the bundled classifier.
+        """
+        from EmoSLArabicTweets import EmoSLArabicTweets
+        emosl = EmoSLArabicTweets(self.positive_lexicon, self.negative_lexicon, self.classifier)
+        emosl.emoji_sentiment_lexicon.update(self.emosl_lexicon)
+        return emosl
+
+    def create_cache(self, capacity=Configuration.Memoization.capacity):
+        from TweetCache import TweetCache
+        return TweetCache(capacity, self.version)
+
+
+def main():
+    directory = Configuration.FileName.model_bundle
+
+    start = time.perf_counter()
+    bundle = ModelBundle.from_sources().save(directory)
+    print(f"Built the model bundle {bundle.version} in '{directory}' in {time.perf_counter() - start:.3f} s")
+
+    start = time.perf_counter()
+    bundle = ModelBundle.load(directory)
+    preprocessor = bundle.create_preprocessor()
+    extractor = bundle.create_extractor()
+    emosl = bundle.create_emosl()
+    print(f"Loaded the model bundle in {time.perf_counter() - start:.3f} s "
+          f"({len(bundle.sentiment_lexicon)} words, {len(bundle.emoji_sentiment_lexicon)} emojis, "
+          f"{len(emosl.emoji_sentiment_lexicon)} EmoSL emojis, stale: {bundle.is_stale()})")
+
+    tweet = "أنا سعيد جدًا اليوم 😊"
+    print(tweet, extractor.extract_features_from_tweet(preprocessor.preprocess_text(tweet)).sentiment)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# MinHash/LSH index collapsing near-duplicate tweets onto one scored representative
+
+from hashlib import blake2b
+
+import numpy as np
+
+from Configuration import Configuration
+
+
+class NearDuplicateIndex:
+    """
+    Online clustering of preprocessed tweets by MinHash similarity.
+
+    Each tweet is turned into word shingles, hashed into a MinHash signature of num_perm
+    values and split into bands for locality-sensitive hashing. A tweet whose band hashes hit
+    a cluster representative with an estimated Jaccard similarity of at least threshold joins
+    that cluster and reuses the representative's payload (e.g. its features and emoji counts);
+    otherwise it becomes the representative of a new cluster.
+
+    Memory does not grow with the number of tweets: only the last `capacity` representatives
+    are kept (their signatures in NumPy ring buffers and their band hashes in one dictionary
+    per band), which suits the bursty, time-local duplication of retweets and campaigns.
+    Shingles are hashed directly to 64-bit values, so no vocabulary is kept either.
+    """
+
+    def __init__(self, threshold=Configuration.NearDuplicates.threshold, num_perm=Configuration.NearDuplicates.num_perm,
+                 bands=Configuration.NearDuplicates.bands, shingle_size=Configuration.NearDuplicates.shingle_size,
+                 capacity=Configuration.NearDuplicates.capacity, seed=1):
+        """
+        :param threshold: Minimum estimated Jaccard similarity of a tweet to its cluster representative.
+        :param num_perm: Number of MinHash permutations (length of a signature).
+        :param bands: Number of LSH bands (must divide num_perm).
+        :param shingle_size: Number of words per shingle.
+        :param capacity: Maximum number of representatives kept in the index.
+        :param seed: Seed of the hash permutations.
+        """
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm}).")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.capacity = capacity
+
+        # Odd multipliers of the multiply-shift hash functions
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = generator.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self.band_multipliers = generator.randint(1, 1 << 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+
+        # Ring buffers of the representatives (slot = cluster_id % capacity)
+        self.signatures = np.zeros((capacity, num_perm), dtype=np.uint32)
+        self.band_keys = np.zeros((capacity, bands), dtype=np.uint64)
+        self.payloads = [None] * capacity
+        self.tables = [{} for _ in range(bands)]
+
+        self.cluster_count = 0
+        self.tweet_count = 0
+        self.collapsed_count = 0
+
+    @staticmethod
+    def shingle_hash(shingle):
+        # Stable 64-bit hash (unlike hash(), the same in every run and process)
+        return int.from_bytes(blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    def shingle_ids(self, text):
+        """
+        Return the 64-bit hashes of the word shingles of a preprocessed text (runs of shingle_size
+        words). Algorithm 2 only looks at the words and emojis of a tweet, so word shingles are
+        what makes two tweets score alike.
+        """
+        shingle_hash = self.shingle_hash
+        words = text.split()
+        size = self.shingle_size
+        if len(words) <= size:
+            return [shingle_hash(text)]
+        if size > 1:
+            words = [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+        return [shingle_hash(word) for word in words]
+
+    def sketch(self, texts):
+        """
+        Compute the MinHash signatures and LSH band hashes of a batch of texts in one vectorized pass.
+
+        Each of the num_perm hash functions (a * x + b) >> 32 is applied to the shingle hashes
+        of all the texts at once, then the minimum is taken per text.
+
+        :return: Tuple (signatures, band_keys): uint32 array (len(texts), num_perm) and a list
+                 of `bands` int keys per text.
+        """
+        if not texts:
+            return np.zeros((0, self.num_perm), dtype=np.uint32), []
+        text_shingles = [self.shingle_ids(text) for text in texts]
+        counts = np.fromiter((len(ids) for ids in text_shingles), dtype=np.int64, count=len(texts))
+        first_shingles = np.cumsum(counts) - counts
+        shingles = np.fromiter((value for ids in text_shingles for value in ids), dtype=np.uint64,
+                               count=int(counts.sum()))
+
+        with np.errstate(over='ignore'):
+            hashed = (self.a[:, None] * shingles[None, :] + self.b[:, None]) >> np.uint64(32)
+            signatures = np.minimum.reduceat(hashed, first_shingles, axis=1).T.astype(np.uint32)
+            band_keys = (signatures.reshape(len(texts), self.bands, self.rows).astype(np.uint64)
+                         * self.band_multipliers).sum(axis=2)
+        return signatures, band_keys.tolist()
+
+    def similarity(self, signature, cluster_id):
+        """
+        Estimated Jaccard similarity between a signature and a cluster representative.
+        """
+        return float(np.count_nonzero(self.signatures[cluster_id % self.capacity] == signature)) / self.num_perm
+
+    def evict(self, cluster_id):
+        slot = cluster_id % self.capacity
+        for table, key in zip(self.tables, self.band_keys[slot].tolist()):
+            if table.get(key) == cluster_id:
+                del table[key]
+        self.payloads[slot] = None
+
+    def assign(self, text):
+        """
+        Find the cluster of a preprocessed tweet, creating a new one if no representative is similar enough.
+
+        :return: Tuple (cluster_id, payload) where payload is the representative's payload, or
+                 None for a new cluster (set it with set_payload once the tweet is scored).
+        """
+        signatures, band_keys = self.sketch([text])
+        return self.assign_sketch(signatures[0], band_keys[0])
+
+    def assign_sketch(self, signature, keys):
+        """
+        Same as assign, for a signature and band keys computed by sketch.
+        """
+        self.tweet_count += 1
+
+        # Candidates are the representatives sharing at least one band
+        checked = set()
+        for table, key in zip(self.tables, keys):
+            cluster_id = table.get(key)
+            if cluster_id is None or cluster_id in checked:
+                continue
+            checked.add(cluster_id)
+            if self.similarity(signature, cluster_id) >= self.threshold:
+                payload = self.payloads[cluster_id % self.capacity]
+                if payload is not None:
+                    self.collapsed_count += 1
+                    return cluster_id, payload
+
+        # New representative (the oldest one leaves the index when it is full)
+        cluster_id = self.cluster_count
+        self.cluster_count += 1
+        if cluster_id >= self.capacity:
+            self.evict(cluster_id - self.capacity)
+        slot = cluster_id % self.capacity
+        self.signatures[slot] = signature
+        self.band_keys[slot] = keys
+        for table, key in zip(self.tables, keys):
+            table.setdefault(key, cluster_id)
+        return cluster_id, None
+
+    def set_payload(self, cluster_id, payload):
+        if cluster_id > self.cluster_count - 1 - self.capacity:
+            self.payloads[cluster_id % self.capacity] = payload
+
+    def stats(self):
+        return {
+            'tweets': self.tweet_count,
+            'clusters': self.cluster_count,
+            'collapsed': self.collapsed_count,
+            'collapsed_rate': self.collapsed_count / self.tweet_count if self.tweet_count else 0.0,
+        }
+
+
+def main():
+    from TextPreprocessor import PreprocessorPipeline
+
+    preprocessor = PreprocessorPipeline()
+    index = NearDuplicateIndex(threshold=0.7)
+    tweets = ["أنا سعيد جدًا اليوم بالنجاح 😊 @user1", "أنا سعيد جدًا اليوم بالنجاح 😊 @user2 https://t.co/x",
+              "أنا سعيد جدًا اليوم بالنجاح 😊😊", "لماذا أنت غاضب😞  😡؟"]
+    for tweet in tweets:
+        processed_text = preprocessor.preprocess_text(tweet)
+        cluster_id, payload = index.assign(processed_text)
+        if payload is None:
+            index.set_payload(cluster_id, processed_text)
+        print(f"{cluster_id} {'duplicate of ' + payload if payload else 'new'}: {tweet}")
+    print(index.stats())
+
+
+if __name__ == "__main__":
+    main()
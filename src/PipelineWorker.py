@@ -0,0 +1,157 @@
+# Background execution of the tweet pipeline for the Tkinter front ends
+
+import queue
+import threading
+import time
+
+from EmoSLPipeline import EmoSLPipeline
+
+
+class PipelineWorker:
+    """
+    Run EmoSLPipeline over a list of tweets in a background thread.
+
+    Results are posted in batches to a bounded queue that the GUI drains from its event
+    loop with after(), so the window stays responsive. The run can be cancelled at any time.
+
+    Messages posted to the bounded queue (batches still waiting for room are dropped once
+    the run is cancelled):
+    - ('batch', results, processed_count) where results are (tweet, processed_text,
+      feature_vector, positive_emojis, negative_emojis) tuples
+
+    The message ending the run goes to a separate unbounded control queue, so it is never
+    dropped, and is handled once every queued batch has been:
+    - ('done', pipeline, summary) where summary is the return value of finish (or None)
+    - ('cancelled', processed_count)
+    - ('error', exception)
+    """
+
+    def __init__(self, tweets, finish=None, batch_size=200, max_pending_batches=8, pipeline_factory=EmoSLPipeline,
+                 bundle=None):
+        """
+        :param tweets: List of tweets to process.
+        :param finish: Optional callable(pipeline, tweets) run in the worker after the last tweet
+                       (e.g. the corpus-level Algorithm 5).
+        :param batch_size: Number of results per posted batch.
+        :param max_pending_batches: Size of the queue; the worker waits when the GUI falls behind.
+        :param pipeline_factory: Callable creating the pipeline (called in the worker thread).
+        :param bundle: Directory of a ModelBundle passed to pipeline_factory as bundle=, so the
+                       pipeline starts from it instead of parsing the xlsx files.
+        """
+        self.tweets = tweets
+        self.finish = finish
+        self.batch_size = batch_size
+        self.pipeline_factory = pipeline_factory
+        self.bundle = bundle
+        self.messages = queue.Queue(maxsize=max_pending_batches)
+        self.control = queue.Queue()
+        self.end_message = None
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="PipelineWorker", daemon=True)
+        self.start_time = None
+        self.processed_count = 0
+
+    @property
+    def total_count(self):
+        return len(self.tweets)
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_running(self):
+        return self.thread.is_alive()
+
+    def tweets_per_second(self):
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0
+        return self.processed_count / elapsed if elapsed > 0 else 0.0
+
+    def post(self, message):
+        # Wait for room in the queue, unless the run is cancelled (the GUI may have stopped polling)
+        while True:
+            try:
+                self.messages.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                if self.cancel_event.is_set():
+                    return False
+
+    def post_end(self, message):
+        # The control queue is unbounded: the message ending the run is never lost
+        self.control.put(message)
+
+    def run(self):
+        try:
+            pipeline = self.pipeline_factory() if self.bundle is None else self.pipeline_factory(bundle=self.bundle)
+            batch = []
+            processed_count = 0
+            for tweet in self.tweets:
+                if self.cancel_event.is_set():
+                    break
+                batch.append((tweet,) + pipeline.process_tweet(tweet))
+                processed_count += 1
+                if len(batch) >= self.batch_size:
+                    self.post(('batch', batch, processed_count))
+                    batch = []
+            if batch:
+                self.post(('batch', batch, processed_count))
+
+            if self.cancel_event.is_set():
+                self.post_end(('cancelled', processed_count))
+                return
+            summary = self.finish(pipeline, self.tweets) if self.finish else None
+            self.post_end(('done', pipeline, summary))
+        except Exception as e:
+            self.post_end(('error', e))
+
+    def poll(self, widget, on_batch, on_done, on_cancelled=None, on_error=None, interval=50, max_messages=4):
+        """
+        Drain the queues from the Tk event loop every interval milliseconds until the run ends.
+        Polling also stops (with on_error) if the worker thread died without ending the run.
+
+        :param widget: Any Tk widget (used for after()).
+        :param on_batch: Callable(results) for each batch of results.
+        :param on_done: Callable(pipeline, summary) when the run completed.
+        :param on_cancelled: Callable(processed_count) when the run was cancelled.
+        :param on_error: Callable(exception) when the pipeline raised.
+        :param max_messages: Maximum number of messages handled per tick, so the GUI stays responsive.
+        """
+        # Checked before the queues: a thread that has exited posted everything it ever will
+        finished = not self.thread.is_alive()
+        for _ in range(max_messages):
+            # The end message is taken before looking for batches: every batch posted before it is then
+            # already in the queue, and the run ends once they were all handled
+            if self.end_message is None:
+                try:
+                    self.end_message = self.control.get_nowait()
+                except queue.Empty:
+                    if finished:
+                        self.end_message = ('error', RuntimeError("The pipeline worker stopped without ending the run."))
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                if self.end_message is None:
+                    break
+                message = self.end_message
+            kind = message[0]
+            if kind == 'batch':
+                self.processed_count = message[2]
+                on_batch(message[1])
+            elif kind == 'done':
+                on_done(message[1], message[2])
+                return
+            elif kind == 'cancelled':
+                self.processed_count = message[1]
+                if on_cancelled:
+                    on_cancelled(message[1])
+                return
+            elif kind == 'error':
+                if on_error:
+                    on_error(message[1])
+                else:
+                    print(f"An error occurred: {message[1]}")
+                return
+        widget.after(interval, self.poll, widget, on_batch, on_done, on_cancelled, on_error, interval, max_messages)
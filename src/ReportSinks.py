@@ -0,0 +1,278 @@
+# Pluggable report sinks: the six report tables written to xlsx, Parquet, Arrow IPC (Feather) or CSV
+
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+
+from Excel_Helper import SHEET_COLUMNS, StreamingExcelHelper, report_file_path
+
+# File name of each logical table in the columnar backends
+TABLE_FILE_NAMES = {
+    'report': 'report',
+    'total_positive_emojis': 'total_positive_emojis',
+    'total_negative_emojis': 'total_negative_emojis',
+    'emoji_sentiment_scores': 'emoji_sentiment_scores',
+    'Classification_Results': 'classification_results',
+    'VADER Sentiment Scores': 'vader_sentiment_scores',
+}
+
+
+class ReportSink(ABC):
+    """
+    Base class of the report sinks.
+
+    Offers the append_* methods of ExcelHelper and buffers the rows of each table,
+    handing them to write_batch() in batches of batch_size rows. close() writes the
+    remaining rows and finishes the output. Subclasses implement write_batch() and can
+    override open_output() and finish().
+    """
+
+    extension = None
+
+    def __init__(self, output_path=None, batch_size=10000):
+        """
+        :param output_path: Output folder of the report (a timestamped folder under 'output' by default).
+        :param batch_size: Number of rows of a table buffered before they are written.
+        """
+        self.output_path = self.open_output(output_path)
+        self.batch_size = batch_size
+        self.buffers = {table: [] for table in SHEET_COLUMNS}
+
+    def open_output(self, output_path):
+        """
+        Create the output of the report: a folder holding one file per table.
+
+        :param output_path: See __init__.
+        :return: Path of the output.
+        """
+        if output_path is None:
+            output_path = os.path.splitext(report_file_path(self.extension))[0]
+        os.makedirs(output_path, exist_ok=True)
+        return output_path
+
+    def table_path(self, table):
+        return os.path.join(self.output_path, f"{TABLE_FILE_NAMES[table]}.{self.extension}")
+
+    def append_row(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.write_batch(table, buffer)
+            buffer.clear()
+
+    def append_data(self, new_data):
+        self.append_row('report', new_data)
+
+    def append_positive_emojis(self, emoji, count):
+        self.append_row('total_positive_emojis', [emoji, count])
+
+    def append_negative_emojis(self, emoji, count):
+        self.append_row('total_negative_emojis', [emoji, count])
+
+    def append_emoji_sentiment_score(self, emoji, score):
+        self.append_row('emoji_sentiment_scores', [emoji, score])
+
+    def append_sentiment_classification_result(self, word, sentiment):
+        self.append_row('Classification_Results', [word, sentiment])
+
+    def append_vader_sentiment_score(self, word, score):
+        self.append_row('VADER Sentiment Scores', [word, score])
+
+    @abstractmethod
+    def write_batch(self, table, rows):
+        """
+        Write a batch of rows of a table.
+        """
+
+    def finish(self):
+        """
+        Finish the output files once every row has been written.
+        """
+
+    def close(self):
+        for table, buffer in self.buffers.items():
+            if buffer:
+                self.write_batch(table, buffer)
+                buffer.clear()
+        self.finish()
+        print(f"Report has been created and saved in the '{self.output_path}' folder.")
+
+    def create_excel(self):
+        # Same entry point as ExcelHelper
+        self.close()
+
+
+class ExcelSink(ReportSink):
+    """
+    xlsx backend: all the tables as the sheets of one workbook (see StreamingExcelHelper).
+    """
+
+    extension = 'xlsx'
+
+    def __init__(self, output_path=None, batch_size=1):
+        super().__init__(output_path, batch_size)
+
+    def open_output(self, output_path):
+        # The output is one xlsx file (a timestamped one under 'output' by default)
+        self.helper = StreamingExcelHelper(output_path)
+        return self.helper.file_path
+
+    def write_batch(self, table, rows):
+        for row in rows:
+            self.helper.write_row(table, row)
+
+    def close(self):
+        for table, buffer in self.buffers.items():
+            self.write_batch(table, buffer)
+            buffer.clear()
+        self.helper.close()
+
+
+class ArrowSink(ReportSink):
+    """
+    Base of the pyarrow backends: rows are converted to typed Arrow record batches.
+
+    Lists of emojis are stored as list<string> and emoji count dictionaries as map<string, int64>.
+    """
+
+    def __init__(self, output_path=None, batch_size=10000):
+        import pyarrow as pa
+
+        self.pa = pa
+        self.schemas = {
+            'report': pa.schema([
+                ('Tweets', pa.string()), ('processed_text', pa.string()),
+                ('positive_words_count', pa.int64()), ('negative_words_count', pa.int64()),
+                ('positive_emojis_count', pa.int64()), ('negative_emojis_count', pa.int64()),
+                ('total_emojis_count', pa.int64()), ('positive_score', pa.float64()),
+                ('negative_score', pa.float64()), ('emojis', pa.list_(pa.string())),
+                ('sentiment', pa.string()), ('positive_emojis', pa.map_(pa.string(), pa.int64())),
+                ('negative_emojis', pa.map_(pa.string(), pa.int64())),
+            ]),
+            'total_positive_emojis': pa.schema([('Emoji', pa.string()), ('Count', pa.int64())]),
+            'total_negative_emojis': pa.schema([('Emoji', pa.string()), ('Count', pa.int64())]),
+            'emoji_sentiment_scores': pa.schema([('Emoji', pa.string()), ('Score', pa.float64())]),
+            'Classification_Results': pa.schema([('Word', pa.string()), ('Sentiment', pa.string())]),
+            'VADER Sentiment Scores': pa.schema([('Word', pa.string()), ('Score', pa.float64())]),
+        }
+        self.writers = {}
+        super().__init__(output_path, batch_size)
+
+    def record_batch(self, table, rows):
+        schema = self.schemas[table]
+        columns = [self.pa.array([row[index] for row in rows], type=field.type) for index, field in enumerate(schema)]
+        return self.pa.record_batch(columns, schema=schema)
+
+    @abstractmethod
+    def open_writer(self, table):
+        """
+        Open the writer of a table's file.
+
+        :return: pyarrow writer with write_batch() and close() methods.
+        """
+
+    def write_batch(self, table, rows):
+        if table not in self.writers:
+            self.writers[table] = self.open_writer(table)
+        self.writers[table].write_batch(self.record_batch(table, rows))
+
+    def finish(self):
+        # Tables without rows still get a file with their schema
+        for table in self.schemas:
+            if table not in self.writers:
+                self.writers[table] = self.open_writer(table)
+        for writer in self.writers.values():
+            writer.close()
+
+
+class ParquetSink(ArrowSink):
+    """
+    Parquet backend: one .parquet file per table, one row group per batch.
+    """
+
+    extension = 'parquet'
+
+    def open_writer(self, table):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.table_path(table), self.schemas[table])
+
+
+class ArrowIpcSink(ArrowSink):
+    """
+    Arrow IPC file (Feather v2) backend: one .arrow file per table.
+    """
+
+    extension = 'arrow'
+
+    def open_writer(self, table):
+        return self.pa.ipc.new_file(self.table_path(table), self.schemas[table])
+
+
+class CsvSink(ReportSink):
+    """
+    CSV backend: one UTF-8 .csv file per table, written in batches.
+    Lists and dictionaries are written as JSON.
+    """
+
+    extension = 'csv'
+
+    def __init__(self, output_path=None, batch_size=10000):
+        self.files = {}
+        self.writers = {}
+        super().__init__(output_path, batch_size)
+        for table, columns in SHEET_COLUMNS.items():
+            file = open(self.table_path(table), 'w', encoding='utf-8', newline='')
+            self.files[table] = file
+            self.writers[table] = csv.writer(file)
+            self.writers[table].writerow(columns)
+
+    @staticmethod
+    def cell(value):
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    def write_batch(self, table, rows):
+        cell = self.cell
+        self.writers[table].writerows([[cell(value) for value in row] for row in rows])
+
+    def finish(self):
+        for file in self.files.values():
+            file.close()
+
+
+SINKS = {
+    'xlsx': ExcelSink,
+    'parquet': ParquetSink,
+    'arrow': ArrowIpcSink,
+    'csv': CsvSink,
+}
+
+
+def create_sink(report_format='xlsx', output_path=None, **options):
+    """
+    Create the report sink of a format ('xlsx', 'parquet', 'arrow' or 'csv').
+    """
+    if report_format not in SINKS:
+        raise ValueError(f"Unknown report format '{report_format}', expected one of {', '.join(SINKS)}.")
+    return SINKS[report_format](output_path, **options)
+
+
+def main():
+    # Write the same small report with every backend
+    for report_format in SINKS:
+        sink = create_sink(report_format)
+        sink.append_data(['Tweet1', 'processed_tweet1', 2, 1, 1, 0, 1, 1.8, 0.0, ['😊'], 'positive', {'😊': 1}, {}])
+        sink.append_data(['Tweet2', 'processed_tweet2', 0, 1, 0, 1, 1, 0.0, -1.8, ['😡'], 'negative', {}, {'😡': 1}])
+        sink.append_positive_emojis('😊', 1)
+        sink.append_negative_emojis('😡', 1)
+        sink.append_emoji_sentiment_score('😊', 1.0)
+        sink.append_emoji_sentiment_score('😡', -1.0)
+        sink.append_sentiment_classification_result('happy', 'positive')
+        sink.append_vader_sentiment_score('happy', 0)
+        sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+# Local asyncio scoring service: Algorithms 1 and 2 over HTTP, with request micro-batching
+
+import asyncio
+import functools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from BatchProcessor import init_worker, process_batch
+from Configuration import Configuration
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class MicroBatcher:
+    """
+    Group the tweets of concurrent requests into micro-batches scored on an executor.
+
+    A batch is sent as soon as it holds max_batch_size tweets, or max_wait seconds after its
+    first tweet arrived. Both the waiting tweets (max_queue) and the batches being scored
+    (max_inflight_batches) are bounded: when the queue is full, submit raises asyncio.QueueFull
+    and the caller rejects the request instead of letting the backlog grow. More tweets than
+    max_queue at once can never fit, and submit raises ValueError instead.
+    """
+
+    def __init__(self, score_batch, executor, max_batch_size=Configuration.Serving.max_batch_size,
+                 max_wait=Configuration.Serving.max_wait, max_queue=Configuration.Serving.max_queue,
+                 max_inflight_batches=1):
+        """
+        :param score_batch: Function scoring a list of tweets into a list of results, run on the executor.
+        :param executor: concurrent.futures executor running score_batch.
+        :param max_batch_size: Maximum number of tweets per batch.
+        :param max_wait: Seconds a batch waits for more tweets once it has one.
+        :param max_queue: Maximum number of tweets waiting for a batch.
+        :param max_inflight_batches: Maximum number of batches scored at the same time.
+        """
+        self.score_batch = score_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue(max_queue)
+        self.inflight = asyncio.Semaphore(max_inflight_batches)
+        self.tasks = set()
+        self.collector = None
+        self.batch_count = 0
+        self.tweet_count = 0
+
+    def start(self):
+        self.collector = asyncio.get_running_loop().create_task(self.collect())
+
+    async def stop(self):
+        if self.collector is not None:
+            self.collector.cancel()
+            await asyncio.gather(self.collector, return_exceptions=True)
+            self.collector = None
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        # Tweets still waiting will not be scored
+        while not self.queue.empty():
+            self.queue.get_nowait()[1].cancel()
+
+    def submit(self, tweets):
+        """
+        Queue tweets for scoring, all or none of them.
+
+        :return: List of futures, one per tweet, resolved with its result.
+        :raise ValueError: When there are more tweets than the queue can ever hold.
+        :raise asyncio.QueueFull: When there is no room for all the tweets now.
+        """
+        maxsize = self.queue.maxsize
+        if maxsize > 0 and len(tweets) > maxsize:
+            raise ValueError(f"At most {maxsize} tweets can be scored per request, got {len(tweets)}.")
+        if maxsize > 0 and maxsize - self.queue.qsize() < len(tweets):
+            raise asyncio.QueueFull()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for tweet in tweets:
+            future = loop.create_future()
+            self.queue.put_nowait((tweet, future))
+            futures.append(future)
+        return futures
+
+    async def collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free executor slot first, so the backlog stays in the bounded queue
+            await self.inflight.acquire()
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = loop.create_task(self.run_batch(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def run_batch(self, batch):
+        try:
+            # Tweets whose client went away are not scored
+            batch = [(tweet, future) for tweet, future in batch if not future.done()]
+            if not batch:
+                return
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.score_batch, [tweet for tweet, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            self.batch_count += 1
+            self.tweet_count += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.inflight.release()
+
+
+class ScoringServer:
+    """
+    Long-running scoring service over HTTP/1.1 on a TCP port or a Unix socket.
+
+    Endpoints:
+    - POST /score with {"tweet": "..."} or {"tweets": ["...", ...]}: the processed text and the
+      FeatureVector of each tweet (Algorithms 1 and 2, see BatchProcessor.process_batch)
+    - GET /health and GET /stats
+
+    Tweets of concurrent requests are scored together in micro-batches (see MicroBatcher).
+    The scoring runs in a worker thread, or in `workers` processes for parallel scoring.
+    Responses are written with drain(), so slow clients are throttled by TCP flow control.
+    When the queue is full, requests get a 503 with a Retry-After header, and requests with
+    more tweets than max_queue get a 413 (they would never fit).
+    """
+
+    def __init__(self, host=Configuration.Serving.host, port=Configuration.Serving.port, unix_path=None, workers=1,
+                 bundle=None, max_batch_size=Configuration.Serving.max_batch_size, max_wait=Configuration.Serving.max_wait,
+                 max_queue=Configuration.Serving.max_queue, max_body_bytes=Configuration.Serving.max_body_bytes):
+        """
+        :param host: Interface to listen on (localhost by default).
+        :param port: TCP port (0 picks a free port, see self.port once started).
+        :param unix_path: Listen on this Unix socket instead of TCP.
+        :param workers: Number of scoring processes (1 scores in a thread of this process).
+        :param bundle: Directory of a ModelBundle to load the resources from (see BatchProcessor.init_worker).
+        :param max_batch_size: See MicroBatcher.
+        :param max_wait: See MicroBatcher.
+        :param max_queue: See MicroBatcher.
+        :param max_body_bytes: Largest accepted request body (413 above).
+        """
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.workers = workers
+        self.bundle = bundle
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.max_body_bytes = max_body_bytes
+        self.executor = None
+        self.batcher = None
+        self.server = None
+        self.request_count = 0
+        self.rejected_count = 0
+        self.started = None
+
+    async def start(self):
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(None, self.bundle))
+        else:
+            self.executor = ThreadPoolExecutor(1, initializer=init_worker, initargs=(None, self.bundle))
+        self.batcher = MicroBatcher(functools.partial(process_batch, bundle=self.bundle), self.executor,
+                                    self.max_batch_size, self.max_wait, self.max_queue, max(self.workers, 1))
+        # Start the workers and load the pipeline before accepting connections: processes forked
+        # later would inherit the client sockets open at that time and keep them from closing
+        await asyncio.get_running_loop().run_in_executor(self.executor, process_batch, [], self.bundle)
+        self.batcher.start()
+        if self.unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=self.unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+        self.started = time.time()
+        return self
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.batcher is not None:
+            await self.batcher.stop()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def serve_forever(self):
+        await self.server.serve_forever()
+
+    def stats(self):
+        batcher = self.batcher
+        return {
+            'requests': self.request_count,
+            'rejected': self.rejected_count,
+            'tweets': batcher.tweet_count,
+            'batches': batcher.batch_count,
+            'mean_batch_size': batcher.tweet_count / batcher.batch_count if batcher.batch_count else 0.0,
+            'queued': batcher.queue.qsize(),
+            'uptime_seconds': time.time() - self.started,
+        }
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > self.max_body_bytes:
+                    await self.respond(writer, 413, {'error': f"The body exceeds {self.max_body_bytes} bytes."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                status, payload = await self.route(method, path.split('?', 1)[0], body)
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = [f"HTTP/1.1 {status} {HTTP_REASONS[status]}",
+                   "Content-Type: application/json; charset=utf-8",
+                   f"Content-Length: {len(body)}",
+                   f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def route(self, method, path, body):
+        """
+        :return: Tuple (status, JSON payload).
+        """
+        if path == '/health':
+            return (200, {'status': 'ok'}) if method == 'GET' else (405, {'error': "Use GET."})
+        if path == '/stats':
+            return (200, self.stats()) if method == 'GET' else (405, {'error': "Use GET."})
+        if path != '/score':
+            return 404, {'error': f"Unknown path '{path}'."}
+        if method != 'POST':
+            return 405, {'error': "Use POST."}
+
+        self.request_count += 1
+        try:
+            request = json.loads(body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return 400, {'error': f"Invalid JSON: {e}"}
+        single = isinstance(request, dict) and 'tweet' in request
+        tweets = [request['tweet']] if single else request.get('tweets') if isinstance(request, dict) else None
+        if not isinstance(tweets, list) or not all(isinstance(tweet, str) for tweet in tweets):
+            return 400, {'error': 'Expected {"tweet": "..."} or {"tweets": ["...", ...]}.'}
+
+        try:
+            futures = self.batcher.submit(tweets)
+        except ValueError as e:
+            self.rejected_count += 1
+            return 413, {'error': f"{e} Split the tweets into smaller requests."}
+        except asyncio.QueueFull:
+            self.rejected_count += 1
+            return 503, {'error': "The scoring queue is full, retry later."}
+        try:
+            results = await asyncio.gather(*futures)
+        except Exception as e:
+            return 500, {'error': f"An error occurred: {e}"}
+        finally:
+            for future in futures:
+                future.cancel()
+
+        results = [{'tweet': tweet, 'processed_text': processed_text, 'feature_vector': feature_vector.to_dict()}
+                   for tweet, (processed_text, feature_vector) in zip(tweets, results)]
+        return 200, results[0] if single else {'results': results}
+
+
+async def request(method, path, payload=None, host=Configuration.Serving.host, port=Configuration.Serving.port,
+                  unix_path=None):
+    """
+    Send one request to a ScoringServer (a minimal client for scripts and local tests).
+
+    :return: Tuple (status, JSON payload).
+    """
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b''
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split(b' ', 2)[1]), json.loads(body)
+
+
+async def demo():
+    """
+    Start a server on a free localhost port, score the tweets file with concurrent requests and stop.
+    """
+    server = await ScoringServer(port=0).start()
+    try:
+        tweets = Configuration.fetch_tweets()
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(request('POST', '/score', {'tweet': tweet}, port=server.port)
+                                           for tweet in tweets))
+        elapsed = time.perf_counter() - start
+        status, payload = responses[0]
+        print(f"{status}: {json.dumps(payload, ensure_ascii=False)}")
+        print(f"Scored {len(tweets)} tweets in {elapsed:.3f} s with {len(tweets)} concurrent requests")
+        print((await request('GET', '/stats', port=server.port))[1])
+    finally:
+        await server.stop()
+
+
+async def serve(host=Configuration.Serving.host, port=Configuration.Serving.port, unix_path=None, workers=1,
+                bundle=None, max_batch_size=Configuration.Serving.max_batch_size, max_wait=Configuration.Serving.max_wait,
+                max_queue=Configuration.Serving.max_queue):
+    server = await ScoringServer(host, port, unix_path, workers, bundle, max_batch_size, max_wait, max_queue).start()
+    print(f"Scoring server listening on {unix_path or f'http://{server.host}:{server.port}'}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main():
+    asyncio.run(demo())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score tweets over HTTP with Algorithms 1 and 2.")
+    parser.add_argument('--host', default=Configuration.Serving.host)
+    parser.add_argument('--port', type=int, default=Configuration.Serving.port)
+    parser.add_argument('--unix', help="Listen on this Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=1, help="Number of scoring processes")
+    parser.add_argument('--bundle', help="Directory of a model bundle (see ModelBundle)")
+    parser.add_argument('--max-batch-size', type=int, default=Configuration.Serving.max_batch_size)
+    parser.add_argument('--max-wait-ms', type=float, default=Configuration.Serving.max_wait * 1000)
+    parser.add_argument('--max-queue', type=int, default=Configuration.Serving.max_queue)
+    parser.add_argument('--demo', action='store_true', help="Score the tweets file on a free port and exit")
+    args = parser.parse_args()
+
+    if args.demo:
+        main()
+    else:
+        try:
+            asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.bundle, args.max_batch_size,
+                              args.max_wait_ms / 1000, args.max_queue))
+        except KeyboardInterrupt:
+            pass
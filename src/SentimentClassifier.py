@@ -0,0 +1,235 @@
+# Trainable linear sentiment classifier (NumPy, CPU) for Algorithm 5
+
+import numpy as np
+
+from Configuration import Configuration
+
+
+class SentimentClassifier:
+    """
+    Binary linear classifier over the Emo-SL features, trained with mini-batch gradient descent.
+
+    A tweet's decision value is x . weights + bias, computed for a whole batch at once
+    with NumPy. It is positive above neutral_margin, negative below -neutral_margin
+    and Neutral in between. The loss is 'logistic' (logistic regression) or 'hinge'
+    (linear SVM). Training standardizes the columns, and the learned weights are folded
+    back into raw-feature weights, so prediction needs no scaling step.
+
+    The feature matrix is built by feature_matrix. It holds the EMOSL_COLUMNS of
+    EmoSLArabicTweets.extract_features, optionally stacked with the FEATURE_VECTOR_COLUMNS
+    of SentimentFeatureExtractor (Algorithm 2).
+
+    rule_based() returns the untrained classifier. Its weights reproduce the original rule
+    sum(emoji_features) + positive_count - negative_count.
+    """
+
+    EMOSL_COLUMNS = ('emoji_score_sum', 'positive_count', 'negative_count', 'emoji_count',
+                     'positive_emoji_count', 'negative_emoji_count')
+    FEATURE_VECTOR_COLUMNS = ('positive_words_count', 'negative_words_count', 'positive_emojis_count',
+                              'negative_emojis_count', 'total_emojis_count', 'positive_score', 'negative_score')
+    LOSSES = ('logistic', 'hinge')
+
+    def __init__(self, columns=EMOSL_COLUMNS, loss='logistic', neutral_margin=0.0):
+        """
+        :param columns: Names of the feature matrix columns the classifier is trained on.
+        :param loss: 'logistic' for logistic regression or 'hinge' for a linear SVM.
+        :param neutral_margin: Decision values within [-neutral_margin, neutral_margin] are Neutral.
+        """
+        if loss not in self.LOSSES:
+            raise ValueError(f"Unknown loss '{loss}', expected one of {self.LOSSES}.")
+        self.columns = tuple(columns)
+        self.loss = loss
+        self.neutral_margin = neutral_margin
+        self.weights = np.zeros(len(self.columns), dtype=np.float64)
+        self.bias = 0.0
+
+    @staticmethod
+    def rule_based():
+        """
+        Return a classifier reproducing the original dummy rule of classify_sentiments.
+        """
+        classifier = SentimentClassifier()
+        classifier.weights[:3] = (1.0, 1.0, -1.0)
+        return classifier
+
+    @staticmethod
+    def feature_matrix(features, feature_vectors=None):
+        """
+        Stack the features of a batch of tweets into a float64 matrix.
+
+        :param features: List of feature dictionaries returned by EmoSLArabicTweets.extract_features.
+        :param feature_vectors: Optional FeatureBatch or list of FeatureVector objects for the same
+                                tweets (Algorithm 2), appended as FEATURE_VECTOR_COLUMNS.
+        :return: Matrix (len(features), number of columns).
+        """
+        rows = []
+        for feature_vector in features:
+            emoji_features = feature_vector['emoji_features']
+            rows.append((sum(emoji_features), feature_vector['positive_count'], feature_vector['negative_count'],
+                         len(emoji_features), sum(1 for score in emoji_features if score > 0.5),
+                         sum(1 for score in emoji_features if score < 0.5)))
+        matrix = np.array(rows, dtype=np.float64).reshape(-1, len(SentimentClassifier.EMOSL_COLUMNS))
+        if feature_vectors is None:
+            return matrix
+        return np.hstack([matrix, SentimentClassifier.feature_vector_matrix(feature_vectors)])
+
+    @staticmethod
+    def feature_vector_matrix(feature_vectors):
+        """
+        Return the FEATURE_VECTOR_COLUMNS of a FeatureBatch or of a list of FeatureVector objects.
+        """
+        if hasattr(feature_vectors, 'counts'):
+            return np.hstack([feature_vectors.counts, feature_vectors.scores]).astype(np.float64)
+        return np.array([[getattr(feature_vector, column) for column in SentimentClassifier.FEATURE_VECTOR_COLUMNS]
+                         for feature_vector in feature_vectors],
+                        dtype=np.float64).reshape(-1, len(SentimentClassifier.FEATURE_VECTOR_COLUMNS))
+
+    def fit(self, matrix, labels, epochs=50, batch_size=256, learning_rate=0.1, l2=1e-4, seed=0):
+        """
+        Train the classifier with mini-batch gradient descent.
+
+        :param matrix: Feature matrix (n, len(columns)), see feature_matrix.
+        :param labels: n labels; Configuration.Sentiment.positive and negative rows are used,
+                       other labels (e.g. Neutral) are ignored.
+        :param epochs: Number of passes over the training rows.
+        :param batch_size: Number of rows per gradient step.
+        :param learning_rate: Step size.
+        :param l2: L2 regularization strength.
+        :param seed: Seed of the row shuffling.
+        :return: self, so calls can be chained.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.columns):
+            raise ValueError(f"Expected a matrix with {len(self.columns)} columns, got shape {matrix.shape}.")
+        labels = np.asarray(labels)
+        known = (labels == Configuration.Sentiment.positive) | (labels == Configuration.Sentiment.negative)
+        matrix = matrix[known]
+        targets = np.where(labels[known] == Configuration.Sentiment.positive, 1.0, -1.0)
+        if not len(targets):
+            raise ValueError("No positive or negative labels to train on.")
+
+        # Standardize the columns so one learning rate suits every feature
+        mean = matrix.mean(axis=0)
+        scale = matrix.std(axis=0)
+        scale[scale == 0] = 1.0
+        standardized = (matrix - mean) / scale
+
+        weights = np.zeros(matrix.shape[1], dtype=np.float64)
+        bias = 0.0
+        generator = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = generator.permutation(len(targets))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                rows = standardized[batch]
+                batch_targets = targets[batch]
+                margins = batch_targets * (rows @ weights + bias)
+                if self.loss == 'logistic':
+                    # d/dm log(1 + exp(-m)) = -1 / (1 + exp(m))
+                    coefficients = -batch_targets * np.exp(-np.logaddexp(0.0, margins))
+                else:
+                    coefficients = -batch_targets * (margins < 1.0)
+                weights -= learning_rate * (rows.T @ coefficients / len(batch) + l2 * weights)
+                bias -= learning_rate * coefficients.mean()
+
+        # Fold the standardization into the weights: w . (x - mean) / scale + b = (w / scale) . x + b'
+        self.weights = weights / scale
+        self.bias = float(bias - np.dot(weights, mean / scale))
+        return self
+
+    def decision_function(self, matrix):
+        """
+        Return the decision values of a batch of tweets.
+
+        The product is accumulated column by column over the whole batch rather than with
+        matrix @ weights: BLAS reorders the sum, and a last-bit difference turns the exact
+        zeros of the rule (Neutral tweets) into positive or negative ones.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        values = np.zeros(len(matrix), dtype=np.float64)
+        for column, weight in enumerate(self.weights.tolist()):
+            if weight:
+                values += matrix[:, column] * weight
+        return values + self.bias
+
+    def predict(self, matrix):
+        """
+        Return the sentiment labels of a batch of tweets.
+        """
+        values = self.decision_function(matrix)
+        labels = np.full(len(values), Configuration.Sentiment.neutral, dtype=object)
+        labels[values > self.neutral_margin] = Configuration.Sentiment.positive
+        labels[values < -self.neutral_margin] = Configuration.Sentiment.negative
+        return labels.tolist()
+
+    def predict_proba(self, matrix):
+        """
+        Return the probability that each tweet is positive (logistic loss only).
+        """
+        if self.loss != 'logistic':
+            raise ValueError("Probabilities are only available with the logistic loss.")
+        return np.exp(-np.logaddexp(0.0, -self.decision_function(matrix)))
+
+    def accuracy(self, matrix, labels):
+        """
+        Return the share of the labels predicted correctly.
+        """
+        predictions = self.predict(matrix)
+        return sum(1 for predicted, label in zip(predictions, labels) if predicted == label) / len(labels) if len(labels) else 0.0
+
+    def save(self, file_name):
+        """
+        Save the trained classifier to a NumPy .npz file.
+        """
+        np.savez(file_name, weights=self.weights, bias=self.bias, columns=np.array(self.columns),
+                 loss=self.loss, neutral_margin=self.neutral_margin)
+
+    @staticmethod
+    def load(file_name):
+        """
+        Load a classifier saved with save().
+        """
+        with np.load(file_name) as data:
+            classifier = SentimentClassifier(data['columns'].tolist(), str(data['loss']), float(data['neutral_margin']))
+            classifier.weights = data['weights'].astype(np.float64)
+            classifier.bias = float(data['bias'])
+        return classifier
+
+
+def main():
+    from EmoSLArabicTweets import EmoSLArabicTweets
+    from FeatureBatch import FeatureBatch
+    from SentimentFeatureExtractor import SentimentFeatureExtractor
+    from TweetGenerator import TweetGenerator
+
+    positive_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.positive_lexicon)
+    negative_lexicon = Configuration.fetch_data_from_file(Configuration.FileName.negative_lexicon)
+    emojis = set(Configuration.fetch_data_from_file(Configuration.FileName.emojis))
+    extractor = SentimentFeatureExtractor()
+
+    # Synthetic tweets, weakly labeled by the Algorithm 2 scores (the repository has no hand-labeled tweets)
+    tweets = TweetGenerator(seed=7).generate(4000)
+    emosl = EmoSLArabicTweets(positive_lexicon, negative_lexicon)
+    preprocessed_tweets = emosl.preprocess_data(tweets)
+    emosl.build_emo_sl(preprocessed_tweets, emojis)
+    features = emosl.extract_features(preprocessed_tweets, emojis)
+    batch = FeatureBatch.from_tweets(extractor, tweets)
+    # (the negative scores are stored as negative numbers, so the net score is their sum)
+    labels = [Configuration.Sentiment.positive if positive + negative > 0 else
+              Configuration.Sentiment.negative if positive + negative < 0 else Configuration.Sentiment.neutral
+              for positive, negative in batch.scores.tolist()]
+
+    # Train on the EmoSL features only (the Algorithm 2 columns decide the weak labels)
+    matrix = SentimentClassifier.feature_matrix(features)
+    split = len(tweets) * 3 // 4
+    rule = SentimentClassifier.rule_based()
+    print(f"Rule accuracy on the held-out tweets: {rule.accuracy(matrix[split:], labels[split:]):.3f}")
+    for loss in SentimentClassifier.LOSSES:
+        classifier = SentimentClassifier(loss=loss).fit(matrix[:split], labels[:split])
+        print(f"{loss} accuracy on the held-out tweets: {classifier.accuracy(matrix[split:], labels[split:]):.3f}")
+        for column, weight in zip(classifier.columns, classifier.weights):
+            print(f"    {column:<22} {weight:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
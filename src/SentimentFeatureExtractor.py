@@ -1,84 +1,123 @@
 # Algorithm 2 Feature Extraction for Sentiment Analysis
 
 import re
-import json
 
 from Configuration import Configuration
+from EmojiExtractor import EmojiExtractor
+from FeatureVector import FeatureVector
+from Instrumentation import Instrumentation
  
  
 
-class FeatureVector:
-    def __init__(self):
-        self.positive_words_count = 0
-        self.negative_words_count = 0
-        self.positive_emojis_count = 0
-        self.negative_emojis_count = 0
-        self.total_emojis_count = 0
-        self.positive_score = 0.0
-        self.negative_score = 0.0
-        self.emojis = []  # Store emojis for further processing in Emoji Counter
-        self.sentiment = ""  # Store sentiment for further processing
-
-    def to_dict(self):
-        return {
-            "positive_words_count": self.positive_words_count,
-            "negative_words_count": self.negative_words_count,
-            "positive_emojis_count": self.positive_emojis_count,
-            "negative_emojis_count": self.negative_emojis_count,
-            "total_emojis_count": self.total_emojis_count,
-            "positive_score": self.positive_score,
-            "negative_score": self.negative_score,
-            "emojis": self.emojis,
-            "sentiment": self.sentiment
-        }
-
-    def __str__(self):
-        return json.dumps(self.to_dict(), indent=4, ensure_ascii=False)
-    
-    def to_one_line(self):
-        return json.dumps(self.to_dict(), ensure_ascii=False)
-
-
 class SentimentFeatureExtractor:
-    def __init__(self):
-        self.SENTIMENT_LEXICON = Configuration.fetch_setting(Configuration.SheetName.sentiment_lexicon)        
-        self.EMOJI_SENTIMENT_LEXICON =  Configuration.fetch_setting(Configuration.SheetName.emoji_sentiment_lexicon)
+    def __init__(self, sentiment_lexicon=None, emoji_sentiment_lexicon=None, emojis=None):
+        """
+        :param sentiment_lexicon: Dictionary of word -> score (defaults to the sentiment_lexicon sheet).
+        :param emoji_sentiment_lexicon: Dictionary of emoji -> score (defaults to the EMOJI_SENTIMENT_LEXICON sheet).
+        :param emojis: List of the emojis to extract besides the lexicon's (defaults to the emojis file).
+        """
+        if sentiment_lexicon is None:
+            sentiment_lexicon = Configuration.fetch_setting(Configuration.SheetName.sentiment_lexicon)
+        if emoji_sentiment_lexicon is None:
+            emoji_sentiment_lexicon = Configuration.fetch_setting(Configuration.SheetName.emoji_sentiment_lexicon)
+        self.SENTIMENT_LEXICON = sentiment_lexicon
+        self.EMOJI_SENTIMENT_LEXICON = emoji_sentiment_lexicon
+        if emojis is None:
+            self.emoji_extractor = EmojiExtractor.from_lexicon(self.EMOJI_SENTIMENT_LEXICON)
+        else:
+            self.emoji_extractor = EmojiExtractor(list(self.EMOJI_SENTIMENT_LEXICON) + list(emojis))
 
     def tokenize(self, text):
         return re.findall(r'\b\w+\b', text)
 
     def extract_emojis(self, text):
-        return re.findall(r'[^\w\s]', text)
+        # Extract whole emoji sequences (ZWJ sequences, skin tones, flags) without punctuation
+        return self.emoji_extractor.extract(text)
 
-    def extract_features_from_tweet(self, tweet):
-        feature_vector = FeatureVector()
+    def score_tweet(self, tweet):
+        """
+        Compute the raw features of a tweet.
+
+        :return: Tuple (positive_words_count, negative_words_count, positive_emojis_count,
+                 negative_emojis_count, positive_score, negative_score, emojis).
+        """
+        if Instrumentation.enabled:
+            return self.score_tweet_instrumented(tweet)
 
         # Extract text-based features
-        words = self.tokenize(tweet)
+        positive_words_count, negative_words_count, positive_score, negative_score = self.score_words(self.tokenize(tweet))
+
+        # Extract emoji-based features
+        emojis = self.extract_emojis(tweet)
+        positive_emojis_count, negative_emojis_count, positive_score, negative_score = self.score_emojis(
+            emojis, positive_score, negative_score)
+
+        return (positive_words_count, negative_words_count, positive_emojis_count,
+                negative_emojis_count, positive_score, negative_score, emojis)
+
+    def score_tweet_instrumented(self, tweet):
+        """
+        Same as score_tweet, timing each step (see Instrumentation).
+        """
+        measure = Instrumentation.measure
+        words = measure('features.tokenize', self.tokenize, tweet)
+        positive_words_count, negative_words_count, positive_score, negative_score = measure(
+            'features.word_lookup', self.score_words, words)
+        emojis = measure('features.emoji_extract', self.extract_emojis, tweet)
+        positive_emojis_count, negative_emojis_count, positive_score, negative_score = measure(
+            'features.emoji_lookup', self.score_emojis, emojis, positive_score, negative_score)
+        return (positive_words_count, negative_words_count, positive_emojis_count,
+                negative_emojis_count, positive_score, negative_score, emojis)
+
+    def score_words(self, words):
+        """
+        Look the words up in the sentiment lexicon.
+
+        :return: Tuple (positive_words_count, negative_words_count, positive_score, negative_score).
+        """
+        positive_words_count = negative_words_count = 0
+        positive_score = negative_score = 0.0
         for word in words:
             if word in self.SENTIMENT_LEXICON:
                 sentiment_score = self.SENTIMENT_LEXICON[word]
                 if sentiment_score > 0:
-                    feature_vector.positive_words_count += 1
-                    feature_vector.positive_score += sentiment_score
+                    positive_words_count += 1
+                    positive_score += sentiment_score
                 else:
-                    feature_vector.negative_words_count += 1
-                    feature_vector.negative_score += sentiment_score
+                    negative_words_count += 1
+                    negative_score += sentiment_score
+        return positive_words_count, negative_words_count, positive_score, negative_score
 
-        # Extract emoji-based features
-        emojis = self.extract_emojis(tweet)
-        feature_vector.total_emojis_count = len(emojis)
-        feature_vector.emojis = emojis  # Store the emojis
+    def score_emojis(self, emojis, positive_score=0.0, negative_score=0.0):
+        """
+        Look the emojis up in the emoji sentiment lexicon, adding their scores to the given word scores.
+
+        :return: Tuple (positive_emojis_count, negative_emojis_count, positive_score, negative_score).
+        """
+        positive_emojis_count = negative_emojis_count = 0
         for emoji in emojis:
             if emoji in self.EMOJI_SENTIMENT_LEXICON:
                 sentiment_score = self.EMOJI_SENTIMENT_LEXICON[emoji]
                 if sentiment_score > 0:
-                    feature_vector.positive_emojis_count += 1
-                    feature_vector.positive_score += sentiment_score
+                    positive_emojis_count += 1
+                    positive_score += sentiment_score
                 else:
-                    feature_vector.negative_emojis_count += 1
-                    feature_vector.negative_score += sentiment_score
-        
+                    negative_emojis_count += 1
+                    negative_score += sentiment_score
+        return positive_emojis_count, negative_emojis_count, positive_score, negative_score
+
+    def extract_features_from_tweet(self, tweet):
+        feature_vector = FeatureVector()
+        (feature_vector.positive_words_count,
+         feature_vector.negative_words_count,
+         feature_vector.positive_emojis_count,
+         feature_vector.negative_emojis_count,
+         feature_vector.positive_score,
+         feature_vector.negative_score,
+         emojis) = self.score_tweet(tweet)
+        feature_vector.total_emojis_count = len(emojis)
+        feature_vector.emojis = emojis  # Store the emojis
+
         # Determine sentiment from word analysis (for simplicity, use positive/negative score)
         if feature_vector.positive_score > feature_vector.negative_score:
             feature_vector.sentiment = Configuration.Sentiment.positive
@@ -87,6 +126,16 @@ class SentimentFeatureExtractor:
 
         return feature_vector
 
+    def extract_features_batch(self, tweets):
+        """
+        Extract the features of many tweets into a columnar FeatureBatch (NumPy arrays).
+
+        :param tweets: Iterable of (preprocessed) tweets.
+        :return: FeatureBatch
+        """
+        from FeatureBatch import FeatureBatch
+        return FeatureBatch.from_tweets(self, tweets)
+
 
 # Main function to run the example
 def main():
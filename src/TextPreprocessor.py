@@ -3,6 +3,40 @@
 import re
 
 from Configuration import Configuration 
+from Instrumentation import Instrumentation
+
+# Characters kept by remove_special_chars, built once at import time
+ALLOWED_CHARS = frozenset(
+    set('0123456789') |  # Arabic/Western digits
+    set('ء-ي') |  # Arabic letters
+    set('،؛؟') |  # Relevant Arabic punctuation marks
+    set('ًٌٍَُِّْْ') |  # Arabic diacritics (fatha, kasra, damma, etc.)
+    set(chr(i) for i in range(0x0600, 0x06FF + 1)) |  # Arabic block (more characters)
+    set(chr(i) for i in range(0x0750, 0x077F + 1)) |  # Arabic Supplement block (additional Arabic characters)
+    set(chr(i) for i in range(0x08A0, 0x08FF + 1)) |  # Arabic Extended-A block
+    set(chr(i) for i in range(0x1F600, 0x1F64F + 1)) |  # Emoji range (smiling faces)
+    set(chr(i) for i in range(0x1F300, 0x1F5FF + 1)) |  # Emoji range (symbols and pictographs)
+    set(chr(i) for i in range(0x1F680, 0x1F6FF + 1)) |  # Emoji range (transportation and map symbols)
+    set(chr(i) for i in range(0x1F700, 0x1F77F + 1)) |  # Emoji range (alchemical symbols)
+    set(chr(i) for i in range(0x1F780, 0x1F7FF + 1)) |  # Emoji range (geometric shapes)
+    set(chr(i) for i in range(0x1F800, 0x1F8FF + 1)) |  # Emoji range (Supplemental Arrows-C)
+    set(chr(i) for i in range(0x1F900, 0x1F9FF + 1)) |  # Emoji range (Supplemental Symbols and Pictographs)
+    set(chr(i) for i in range(0x1FA00, 0x1FA6F + 1)) |  # Emoji range (symbols and pictographs)
+    set(chr(i) for i in range(0x1FA70, 0x1FAFF + 1)) |  # Emoji range (symbols)
+    set(chr(i) for i in range(0x2600, 0x26FF + 1)) |  # Emoji range (Miscellaneous symbols)
+    set(chr(i) for i in range(0x2700, 0x27BF + 1)) |  # Emoji range (Dingbats)
+    set(chr(i) for i in range(0x1F1E6, 0x1F1FF + 1)) |  # Regional indicators (pairs of them are flags)
+    set('\u200d\ufe0e\ufe0f') |  # Zero-width joiner and variation selectors of emoji sequences
+    set(chr(i) for i in range(0xE0020, 0xE007F + 1)) |  # Tags of subdivision flags
+    set(' ') |  # Space character
+    set('_')  # Underscore
+)
+
+# Joiners, variation selectors and tags left without the emoji they belonged to (e.g. the VS16 of
+# a removed '‼️'). Once the other characters are filtered, everything from U+200D up is an emoji
+# or a part of an emoji sequence.
+ORPHAN_EMOJI_MODIFIERS = re.compile('(?<![\u200d-\U000E007F])[\u200d\ufe0e\ufe0f\U000E0020-\U000E007F]+')
+
 
 class TextPreprocessor:
     @staticmethod
@@ -51,32 +85,8 @@ class TextPreprocessor:
         This step ensures that only Arabic letters, spaces, and relevant punctuation remain,
         while preserving emojis and underscores, by filtering out unwanted characters from an array.
         """
-        # Define the allowed characters as an array
-        allowed_chars = (
-            set('0123456789') |  # Arabic/Western digits
-            set('ء-ي') |  # Arabic letters
-            set('،؛؟') |  # Relevant Arabic punctuation marks
-            set('ًٌٍَُِّْْ') |  # Arabic diacritics (fatha, kasra, damma, etc.)
-            set(chr(i) for i in range(0x0600, 0x06FF + 1)) |  # Arabic block (more characters)
-            set(chr(i) for i in range(0x0750, 0x077F + 1)) |  # Arabic Supplement block (additional Arabic characters)
-            set(chr(i) for i in range(0x08A0, 0x08FF + 1)) |  # Arabic Extended-A block
-            set(chr(i) for i in range(0x1F600, 0x1F64F + 1)) |  # Emoji range (smiling faces)
-            set(chr(i) for i in range(0x1F300, 0x1F5FF + 1)) |  # Emoji range (symbols and pictographs)
-            set(chr(i) for i in range(0x1F680, 0x1F6FF + 1)) |  # Emoji range (transportation and map symbols)
-            set(chr(i) for i in range(0x1F700, 0x1F77F + 1)) |  # Emoji range (alchemical symbols)
-            set(chr(i) for i in range(0x1F780, 0x1F7FF + 1)) |  # Emoji range (geometric shapes)
-            set(chr(i) for i in range(0x1F800, 0x1F8FF + 1)) |  # Emoji range (Supplemental Arrows-C)
-            set(chr(i) for i in range(0x1F900, 0x1F9FF + 1)) |  # Emoji range (Supplemental Symbols and Pictographs)
-            set(chr(i) for i in range(0x1FA00, 0x1FA6F + 1)) |  # Emoji range (symbols and pictographs)
-            set(chr(i) for i in range(0x1FA70, 0x1FAFF + 1)) |  # Emoji range (symbols)
-            set(chr(i) for i in range(0x2600, 0x26FF + 1)) |  # Emoji range (Miscellaneous symbols)
-            set(chr(i) for i in range(0x2700, 0x27BF + 1)) |  # Emoji range (Dingbats)
-            set(' ') |  # Space character
-            set('_')  # Underscore
-        )
-
         # Filter out characters that are not in the allowed set
-        return ''.join([char for char in text if char in allowed_chars])
+        return ''.join([char for char in text if char in ALLOWED_CHARS])
 
 
 
@@ -111,6 +121,14 @@ class TextPreprocessor:
         """
         return text.replace('#', '').replace('_', ' ')
 
+    @staticmethod
+    def remove_orphan_emoji_modifiers(text):
+        """
+        Remove the zero-width joiners, variation selectors and tags that no longer follow an emoji.
+        The ones inside emoji sequences (e.g. "👨‍👩‍👧", "❤️") are kept, so each sequence is still one emoji.
+        """
+        return ORPHAN_EMOJI_MODIFIERS.sub('', text)
+
     @staticmethod
     def remove_extra_whitespaces(text):
         """
@@ -129,7 +147,7 @@ class TextPreprocessor:
         Example: "أنا أحب البرمجة" becomes "أحب البرمجة".
         """
 
-        stop_words = Configuration.fetch_data_from_file(Configuration.FileName.stopWordsFileName)
+        stop_words = set(Configuration.fetch_data_from_file(Configuration.FileName.stopWordsFileName))
 
         # Split the text into words
         words = text.split()
@@ -143,7 +161,8 @@ class TextPreprocessor:
 
     @staticmethod
     def preprocess_text(text):
-        
+        if Instrumentation.enabled:
+            return TextPreprocessor.preprocess_text_instrumented(text)
         
         # Normalize Arabic text to standard form
         text = TextPreprocessor.normalize_arabic_text(text)
@@ -159,6 +178,8 @@ class TextPreprocessor:
         text = TextPreprocessor.remove_elongation(text)
         # Remove hash symbols
         text = TextPreprocessor.remove_hash_symbols(text)
+        # Remove orphan emoji modifiers
+        text = TextPreprocessor.remove_orphan_emoji_modifiers(text)
         # Remove extra whitespaces
         text = TextPreprocessor.remove_extra_whitespaces(text)
 
@@ -169,3 +190,165 @@ class TextPreprocessor:
 
 
         return text
+
+    @staticmethod
+    def preprocess_text_instrumented(text):
+        """
+        Same as preprocess_text, timing each of its steps (see Instrumentation).
+        """
+        measure = Instrumentation.measure
+        text = measure('preprocess.normalize', TextPreprocessor.normalize_arabic_text, text)
+        text = measure('preprocess.non_arabic_chars', TextPreprocessor.remove_non_arabic_chars, text)
+        text = measure('preprocess.numbers', TextPreprocessor.remove_numbers, text)
+        text = measure('preprocess.special_chars', TextPreprocessor.remove_special_chars, text)
+        text = measure('preprocess.diacritics', TextPreprocessor.remove_diacritics, text)
+        text = measure('preprocess.elongation', TextPreprocessor.remove_elongation, text)
+        text = measure('preprocess.hash_symbols', TextPreprocessor.remove_hash_symbols, text)
+        text = measure('preprocess.orphan_emoji_modifiers', TextPreprocessor.remove_orphan_emoji_modifiers, text)
+        text = measure('preprocess.whitespaces', TextPreprocessor.remove_extra_whitespaces, text)
+        return measure('preprocess.stop_words', TextPreprocessor.remove_stop_words, text)
+
+
+class PreprocessorPipeline:
+    """
+    Fused, precompiled version of TextPreprocessor.preprocess_text.
+
+    The normalization patterns and stop words are loaded once, and the character-level
+    steps (non-Arabic chars, numbers, special chars, diacritics, elongation, hash symbols)
+    are compiled into a single regex (followed by the removal of orphan emoji modifiers),
+    so each tweet is processed in a handful of passes.
+    The output is identical to TextPreprocessor.preprocess_text.
+    """
+
+    def __init__(self, normalization_patterns=None, stop_words=None):
+        """
+        :param normalization_patterns: Dictionary of pattern -> replacement (defaults to the normalization_patterns sheet).
+        :param stop_words: Iterable of stop words (defaults to the stop words file).
+        """
+        if normalization_patterns is None:
+            normalization_patterns = Configuration.fetch_setting_pattern(Configuration.SheetName.normalization_patterns)
+        if stop_words is None:
+            stop_words = set(Configuration.fetch_data_from_file(Configuration.FileName.stopWordsFileName))
+
+        self.normalization_steps = self.compile_normalization(normalization_patterns)
+        self.removed_chars = self.compile_removed_chars()
+        self.stop_words = frozenset(stop_words)
+
+    @staticmethod
+    def compile_normalization(normalization_patterns):
+        """
+        Compile the ordered normalization patterns into as few passes as possible.
+
+        Consecutive single-character patterns are composed into one str.translate table
+        (applying them one after another is a per-character mapping). Multi-character
+        patterns keep their place in the sequence and are applied with str.replace.
+
+        :return: List of ('translate', table) and ('replace', pattern, replacement) steps.
+        """
+        steps = []
+        run = []
+
+        def flush_run():
+            table = {}
+            for char in dict.fromkeys(pattern for pattern, _ in run):
+                image = char
+                for pattern, replacement in run:
+                    image = image.replace(pattern, replacement)
+                if image != char:
+                    table[ord(char)] = image
+            if table:
+                steps.append(('translate', table))
+            run.clear()
+
+        for pattern, replacement in normalization_patterns.items():
+            if len(pattern) == 1:
+                run.append((pattern, replacement))
+            else:
+                flush_run()
+                steps.append(('replace', pattern, replacement))
+        flush_run()
+        return steps
+
+    @staticmethod
+    def compile_removed_chars():
+        """
+        Compile the character filters of Algorithm 1 into one regex matching every removed character.
+
+        A character is kept if it is in ALLOWED_CHARS and survives the non-Arabic, number,
+        diacritic, elongation and hash-symbol steps unchanged. The underscore is kept here
+        and turned into a space afterwards, as remove_hash_symbols does.
+        """
+        kept = set()
+        for char in ALLOWED_CHARS:
+            output = TextPreprocessor.remove_non_arabic_chars(char)
+            output = TextPreprocessor.remove_numbers(output)
+            output = TextPreprocessor.remove_diacritics(output)
+            output = TextPreprocessor.remove_elongation(output)
+            output = output.replace('#', '')
+            if output == char:
+                kept.add(ord(char))
+
+        # Build a negated character class out of contiguous code point ranges
+        ranges = []
+        for code in sorted(kept):
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([code, code])
+        char_class = ''.join(
+            re.escape(chr(start)) if start == end else f"{re.escape(chr(start))}-{re.escape(chr(end))}"
+            for start, end in ranges
+        )
+        return re.compile(f"[^{char_class}]+")
+
+    def normalize(self, text):
+        """
+        Apply the compiled normalization steps (same result as TextPreprocessor.normalize_arabic_text).
+        """
+        for step in self.normalization_steps:
+            if step[0] == 'translate':
+                text = text.translate(step[1])
+            else:
+                text = text.replace(step[1], step[2])
+        return text
+
+    def remove_chars(self, text):
+        # Remove non-Arabic characters, numbers, special characters, diacritics, elongation, hash symbols
+        # and orphan emoji modifiers
+        return ORPHAN_EMOJI_MODIFIERS.sub('', self.removed_chars.sub('', text).replace('_', ' '))
+
+    def remove_stop_words(self, text):
+        # Remove extra whitespaces and stop words (only plain spaces are left at this point)
+        stop_words = self.stop_words
+        return ' '.join([word for word in text.split() if word not in stop_words])
+
+    def preprocess_text(self, text):
+        """
+        Run the whole of Algorithm 1 on a tweet.
+        """
+        if Instrumentation.enabled:
+            return self.preprocess_text_instrumented(text)
+
+        # Normalize Arabic text to standard form
+        text = self.normalize(text)
+        # Remove non-Arabic characters, numbers, special characters, diacritics, elongation, hash symbols
+        # and orphan emoji modifiers
+        text = ORPHAN_EMOJI_MODIFIERS.sub('', self.removed_chars.sub('', text).replace('_', ' '))
+        # Remove extra whitespaces and stop words (only plain spaces are left at this point)
+        stop_words = self.stop_words
+        return ' '.join([word for word in text.split() if word not in stop_words])
+
+    def preprocess_text_instrumented(self, text):
+        """
+        Same as preprocess_text, timing each fused step (see Instrumentation).
+        """
+        measure = Instrumentation.measure
+        text = measure('preprocess.normalize', self.normalize, text)
+        text = measure('preprocess.special_chars', self.remove_chars, text)
+        return measure('preprocess.stop_words', self.remove_stop_words, text)
+
+    def preprocess_batch(self, tweets):
+        """
+        Run Algorithm 1 on a list of tweets.
+        """
+        return [self.preprocess_text(tweet) for tweet in tweets]
@@ -0,0 +1,117 @@
+# Memoization of Algorithms 1 to 3 for duplicated tweets (retweets, copy-paste campaigns)
+
+import hashlib
+import os
+from collections import OrderedDict
+
+from Configuration import Configuration
+from LexiconCache import LexiconCache
+
+
+class TweetCache:
+    """
+    Bounded LRU cache of the per-tweet pipeline results, keyed by a hash of the raw tweet.
+
+    The key is a 128-bit BLAKE2b digest of the tweet salted with the lexicon version, so
+    results computed with other lexicons, stop words or normalization patterns are never
+    returned. Cached results are shared between the duplicates of a tweet and must be
+    treated as read-only. Hits, misses and evictions are counted for the hit-rate metrics.
+    """
+
+    def __init__(self, capacity=Configuration.Memoization.capacity, lexicon_version=None):
+        """
+        :param capacity: Maximum number of cached tweets (0 disables the cache).
+        :param lexicon_version: Version string of the resources (defaults to TweetCache.lexicon_version()).
+        """
+        self.capacity = capacity
+        self.version = (lexicon_version if lexicon_version is not None else TweetCache.lexicon_version()).encode('utf-8')
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def lexicon_version():
+        """
+        Return a hash of every resource Algorithms 1 to 3 depend on (the lexicon workbook,
+        the stop words and the emojis file).
+        """
+        digest = hashlib.sha256()
+        for file_name in (Configuration.FileName.sentiment_lexicon, Configuration.FileName.stopWordsFileName,
+                          Configuration.FileName.emojis):
+            digest.update(file_name.encode('utf-8'))
+            digest.update(LexiconCache.file_hash(file_name).encode('ascii') if os.path.exists(file_name) else b'-')
+        return digest.hexdigest()[:16]
+
+    def key(self, tweet):
+        return hashlib.blake2b(tweet.encode('utf-8'), digest_size=16, salt=self.version[:16]).digest()
+
+    def get(self, tweet):
+        """
+        Return the cached result of a tweet, or None (and count a miss).
+        """
+        if not self.capacity:
+            self.misses += 1
+            return None
+        key = self.key(tweet)
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, tweet, result):
+        if not self.capacity:
+            return
+        key = self.key(tweet)
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, tweet, compute):
+        """
+        Return the cached result of a tweet, computing and caching it with compute(tweet) on a miss.
+        """
+        result = self.get(tweet)
+        if result is None:
+            result = compute(tweet)
+            self.put(tweet, result)
+        return result
+
+    def clear(self):
+        self.entries.clear()
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'hit_rate': self.hit_rate(),
+        }
+
+
+def main():
+    from TextPreprocessor import PreprocessorPipeline
+
+    preprocessor = PreprocessorPipeline()
+    cache = TweetCache(capacity=1000)
+    tweets = Configuration.fetch_tweets()
+
+    # The second pass over the tweets is served from the cache
+    for tweet in tweets + tweets:
+        cache.get_or_compute(tweet, preprocessor.preprocess_text)
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# Synthetic Arabic tweets built from the lexicons, stop words and emoji lists, for benchmarks
+
+import random
+import re
+
+from Configuration import Configuration
+
+ARABIC_LETTERS = 'ابتثجحخدذرزسشصضطظعغفقكلمنهوي'
+DIACRITICS = 'ًٌٍَُِّْ'
+LATIN_WORDS = ('good', 'bad', 'lol', 'OMG', 'love', 'fail', 'RT', 'via')
+
+
+class TweetGenerator:
+    """
+    Generate realistic synthetic Arabic tweets at any scale.
+
+    Tweets mix words of the positive and negative lexicons, stop words, neutral words taken
+    from the tweets file and emojis of the emoji lists, and contain the noise Algorithm 1 has
+    to clean: mentions, hashtags, URLs, Latin words, digits, diacritics, elongated letters and
+    repeated emojis. Each tweet leans positive, negative or neutral. The same seed always
+    gives the same tweets.
+    """
+
+    def __init__(self, seed=0, min_words=4, max_words=30):
+        """
+        :param seed: Seed of the random generator.
+        :param min_words: Minimum number of words per tweet.
+        :param max_words: Maximum number of words per tweet.
+        """
+        self.random = random.Random(seed)
+        self.min_words = min_words
+        self.max_words = max_words
+
+        self.positive_words = Configuration.fetch_data_from_file(Configuration.FileName.positive_lexicon)
+        self.negative_words = Configuration.fetch_data_from_file(Configuration.FileName.negative_lexicon)
+        self.stop_words = Configuration.fetch_data_from_file(Configuration.FileName.stopWordsFileName)
+
+        # Emojis of the emojis file and of the emoji sentiment lexicon, split by the sign of their score
+        emoji_scores = Configuration.fetch_setting(Configuration.SheetName.emoji_sentiment_lexicon)
+        emojis = set(Configuration.fetch_data_from_file(Configuration.FileName.emojis)) | set(emoji_scores)
+        self.positive_emojis = sorted(emoji for emoji in emojis if emoji_scores.get(emoji, 0) > 0)
+        self.negative_emojis = sorted(emoji for emoji in emojis if emoji_scores.get(emoji, 0) < 0)
+        self.neutral_emojis = sorted(emoji for emoji in emojis if emoji_scores.get(emoji, 0) == 0)
+
+        # Neutral vocabulary: the Arabic words of the tweets file that are not in a lexicon
+        known = set(self.positive_words) | set(self.negative_words) | set(self.stop_words)
+        words = set()
+        for tweet in Configuration.fetch_tweets():
+            words.update(re.findall(r'[ء-ي]{2,}', tweet))
+        self.neutral_words = sorted(words - known) or [ARABIC_LETTERS[:4]]
+
+    def pick_emoji(self, polarity):
+        pools = {1: self.positive_emojis, -1: self.negative_emojis, 0: self.neutral_emojis}
+        # Mostly emojis matching the tweet's polarity, sometimes any emoji (sarcasm, noise)
+        pool = pools[polarity] if self.random.random() < 0.8 else pools[self.random.choice((1, -1, 0))]
+        pool = pool or self.positive_emojis or self.negative_emojis or self.neutral_emojis
+        emoji = self.random.choice(pool)
+        return emoji * self.random.choice((1, 1, 1, 2, 3))
+
+    def pick_word(self, polarity):
+        draw = self.random.random()
+        if draw < 0.25:
+            return self.random.choice(self.stop_words)
+        if draw < 0.45:
+            # Sentiment word, usually matching the tweet's polarity
+            if polarity == 0 or self.random.random() < 0.2:
+                pool = self.random.choice((self.positive_words, self.negative_words))
+            else:
+                pool = self.positive_words if polarity > 0 else self.negative_words
+            return self.random.choice(pool)
+        return self.random.choice(self.neutral_words)
+
+    def decorate(self, word):
+        # Diacritics or an elongated letter on some Arabic words
+        draw = self.random.random()
+        if draw < 0.05:
+            position = self.random.randrange(len(word))
+            return word[:position + 1] + self.random.choice(DIACRITICS) + word[position + 1:]
+        if draw < 0.08:
+            position = self.random.randrange(len(word))
+            return word[:position + 1] + word[position] * self.random.randint(2, 5) + word[position + 1:]
+        return word
+
+    def generate_tweet(self):
+        """
+        Return one synthetic tweet.
+        """
+        polarity = self.random.choice((1, 1, -1, -1, 0))
+        tokens = []
+        for _ in range(self.random.randint(self.min_words, self.max_words)):
+            draw = self.random.random()
+            if draw < 0.12:
+                # Emojis are often glued to the previous word
+                emoji = self.pick_emoji(polarity)
+                if tokens and self.random.random() < 0.5:
+                    tokens[-1] += emoji
+                else:
+                    tokens.append(emoji)
+            elif draw < 0.15:
+                tokens.append('#' + '_'.join(self.pick_word(polarity) for _ in range(self.random.randint(1, 3))))
+            elif draw < 0.17:
+                tokens.append('@user' + str(self.random.randint(1, 99999)))
+            elif draw < 0.18:
+                tokens.append('https://t.co/' + ''.join(self.random.choice('abcdefghXYZ0123') for _ in range(10)))
+            elif draw < 0.20:
+                tokens.append(self.random.choice(LATIN_WORDS))
+            elif draw < 0.21:
+                tokens.append(str(self.random.randint(0, 2024)))
+            else:
+                tokens.append(self.decorate(self.pick_word(polarity)))
+        if self.random.random() < 0.3:
+            tokens[-1] += self.random.choice(('!', '!!', '؟', '...', '.'))
+        return ' '.join(tokens)
+
+    def generate(self, count):
+        """
+        Return a list of count synthetic tweets.
+        """
+        return [self.generate_tweet() for _ in range(count)]
+
+    def iter_tweets(self, count):
+        """
+        Yield count synthetic tweets without holding them in memory.
+        """
+        for _ in range(count):
+            yield self.generate_tweet()
+
+    @staticmethod
+    def replay(tweets, count):
+        """
+        Return count tweets by repeating a list of real tweets (e.g. Configuration.fetch_tweets()).
+        """
+        if not tweets:
+            return []
+        return [tweets[i % len(tweets)] for i in range(count)]
+
+    def write(self, file_name, count):
+        """
+        Write count synthetic tweets to a text file, one per line.
+        """
+        with open(file_name, 'w', encoding='utf-8') as file:
+            for tweet in self.iter_tweets(count):
+                file.write(tweet + '\n')
+
+
+def main():
+    generator = TweetGenerator(seed=42)
+    for tweet in generator.generate(10):
+        print(tweet)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import gzip
+import hashlib
+import io
+import json
+
+from Configuration import Configuration
+
+
+class TweetReader:
+    """
+    Generator-based tweet reader that yields fixed-size chunks of tweets.
+
+    Supported inputs are plain text (one tweet per line), JSONL (one JSON object per
+    line, the tweet text is read from a configurable field) and gzip-compressed
+    versions of both. Only one chunk and one read buffer are held in memory at a time,
+    so arbitrarily large dumps can be streamed through the pipeline.
+    """
+
+    # Public strings
+    class Format:
+        text = "text"
+        jsonl = "jsonl"
+
+    GZIP_MAGIC = b"\x1f\x8b"
+    JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+    @staticmethod
+    def detect_format(file_name):
+        """
+        Guess the input format from the file name ('.jsonl'/'.ndjson', optionally followed by '.gz').
+        """
+        name = file_name.lower()
+        if name.endswith(".gz"):
+            name = name[:-3]
+        return TweetReader.Format.jsonl if name.endswith(TweetReader.JSONL_SUFFIXES) else TweetReader.Format.text
+
+    @staticmethod
+    def open_binary(file_name, buffer_size=Configuration.Ingestion.buffer_size):
+        """
+        Open a plain or gzip-compressed file as a binary stream of its (decompressed) content
+        with a bounded read buffer. Compression is detected from the file's magic bytes.
+        """
+        raw = open(file_name, 'rb', buffering=buffer_size)
+        try:
+            if raw.peek(len(TweetReader.GZIP_MAGIC))[:len(TweetReader.GZIP_MAGIC)] == TweetReader.GZIP_MAGIC:
+                return io.BufferedReader(gzip.GzipFile(fileobj=raw, mode='rb'), buffer_size=buffer_size)
+            return raw
+        except Exception:
+            raw.close()
+            raise
+
+    @staticmethod
+    def open_text(file_name, buffer_size=Configuration.Ingestion.buffer_size):
+        """
+        Open a plain or gzip-compressed file as a UTF-8 text stream with a bounded read buffer.
+        """
+        return io.TextIOWrapper(TweetReader.open_binary(file_name, buffer_size), encoding='utf-8')
+
+    @staticmethod
+    def extract_text(record, text_field):
+        """
+        Return the tweet text of a JSON record. Dotted fields (e.g. 'extended_tweet.full_text')
+        select nested values. Returns None when the field is missing or not a string.
+        """
+        value = record
+        for key in text_field.split('.'):
+            if not isinstance(value, dict) or key not in value:
+                return None
+            value = value[key]
+        return value if isinstance(value, str) else None
+
+    @staticmethod
+    def iter_tweets(file_name=Configuration.FileName.tweets, file_format=None,
+                    text_field=Configuration.Ingestion.text_field, buffer_size=Configuration.Ingestion.buffer_size):
+        """
+        Yield tweets one by one (stripped, empty lines skipped, like Configuration.fetch_tweets).
+
+        :param file_name: Path to the input file.
+        :param file_format: TweetReader.Format.text or TweetReader.Format.jsonl (detected from the name if None).
+        :param text_field: Field holding the tweet text in JSONL input.
+        :param buffer_size: Size in bytes of the read buffer.
+        """
+        file_format = file_format or TweetReader.detect_format(file_name)
+        try:
+            file = TweetReader.open_text(file_name, buffer_size)
+        except FileNotFoundError:
+            print(f"The file '{file_name}' was not found.")
+            return
+
+        with file:
+            for line_number, line in enumerate(file, 1):
+                tweet = TweetReader.parse_line(line, file_format, text_field, f"line {line_number} of '{file_name}'")
+                if tweet:
+                    yield tweet
+
+    @staticmethod
+    def parse_line(line, file_format, text_field, location):
+        """
+        Return the stripped tweet of one input line, or None for empty lines and JSONL records
+        without a tweet text.
+
+        :param location: Description of the line for the invalid JSON message.
+        """
+        if file_format == TweetReader.Format.jsonl:
+            if not line.strip():
+                return None
+            try:
+                tweet = TweetReader.extract_text(json.loads(line), text_field)
+            except json.JSONDecodeError:
+                print(f"Skipping invalid JSON on {location}.")
+                return None
+            if tweet is None:
+                return None
+        else:
+            tweet = line
+        return tweet.strip() or None
+
+    @staticmethod
+    def iter_chunks(file_name=Configuration.FileName.tweets, chunk_size=Configuration.Ingestion.chunk_size,
+                    file_format=None, text_field=Configuration.Ingestion.text_field,
+                    buffer_size=Configuration.Ingestion.buffer_size):
+        """
+        Yield lists of at most chunk_size tweets. Takes the same options as iter_tweets.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        chunk = []
+        for tweet in TweetReader.iter_tweets(file_name, file_format, text_field, buffer_size):
+            chunk.append(tweet)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def iter_chunks_from(file_name=Configuration.FileName.tweets, offset=0, end_offset=None,
+                         chunk_size=Configuration.Ingestion.chunk_size, file_format=None,
+                         text_field=Configuration.Ingestion.text_field, buffer_size=Configuration.Ingestion.buffer_size,
+                         partial_tail=False):
+        """
+        Yield (chunk, offset) pairs, where offset is the byte offset in the (decompressed) input
+        just after the chunk's last line, so a later call with that offset continues with the
+        next line. Lines are split on '\\n' only (a '\\r' before it is stripped with the rest of
+        the whitespace). Gzip input has no random access: the first offset bytes are
+        decompressed and skipped.
+
+        A last line without a terminating '\\n' may still be being written, so it is left for a
+        later call unless partial_tail is set (or it ends before end_offset).
+
+        :param offset: Byte offset of a line start to read from (0 reads the whole file).
+        :param end_offset: Byte offset of a line start to stop at (None reads to the end of the file).
+        :param partial_tail: Also read an unterminated last line (the input is complete).
+        Takes the other options of iter_chunks.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        file_format = file_format or TweetReader.detect_format(file_name)
+        try:
+            file = TweetReader.open_binary(file_name, buffer_size)
+        except FileNotFoundError:
+            print(f"The file '{file_name}' was not found.")
+            return
+
+        with file:
+            file.seek(offset)
+            chunk = []
+            chunk_offset = offset
+            for line in file:
+                if end_offset is not None and offset >= end_offset:
+                    break
+                if not (line.endswith(b'\n') or partial_tail or (end_offset is not None and offset + len(line) <= end_offset)):
+                    break
+                location = f"byte {offset} of '{file_name}'"
+                offset += len(line)
+                tweet = TweetReader.parse_line(line.decode('utf-8'), file_format, text_field, location)
+                if tweet:
+                    chunk.append(tweet)
+                    if len(chunk) == chunk_size:
+                        yield chunk, offset
+                        chunk = []
+                        chunk_offset = offset
+            # The last chunk also covers trailing empty lines
+            if chunk or offset > chunk_offset:
+                yield chunk, offset
+
+    @staticmethod
+    def fingerprint(file_name, offset, size=1 << 16, buffer_size=Configuration.Ingestion.buffer_size):
+        """
+        Return a hash of the first and of the last `size` bytes before offset, or None when the
+        input is shorter than offset. It tells whether the first offset bytes of a file are
+        still the ones read earlier, or the file was replaced or rewritten. Only the first
+        bytes of gzip input are hashed, since reaching the offset means decompressing the
+        whole prefix.
+        """
+        digest = hashlib.sha256()
+        try:
+            with TweetReader.open_binary(file_name, buffer_size) as file:
+                head = file.read(min(offset, size))
+                if len(head) < min(offset, size):
+                    return None
+                digest.update(head)
+                if not isinstance(getattr(file, 'raw', None), gzip.GzipFile):
+                    start = max(offset - size, 0)
+                    file.seek(start)
+                    tail = file.read(offset - start)
+                    if len(tail) < offset - start:
+                        return None
+                    digest.update(tail)
+        except FileNotFoundError:
+            return None
+        return digest.hexdigest()[:16]
+
+
+def main():
+    for i, chunk in enumerate(TweetReader.iter_chunks(chunk_size=100), 1):
+        print(f"Chunk {i}: {len(chunk)} tweets, first tweet: {chunk[0]}")
+
+
+if __name__ == "__main__":
+    main()
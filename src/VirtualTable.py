@@ -0,0 +1,171 @@
+# Virtual-scrolling Treeview over a columnar backing store, for tables of millions of rows
+
+import tkinter as tk
+from tkinter import ttk
+
+
+class ColumnStore:
+    """
+    Rows of a table kept column by column in plain lists.
+
+    Rows are stored as the raw objects (e.g. FeatureVector instances) and only turned into
+    display strings when they are shown. clear() replaces the lists, so it does not depend on
+    the number of rows in the widget.
+    """
+
+    def __init__(self, columns):
+        """
+        :param columns: Names of the columns.
+        """
+        self.columns = tuple(columns)
+        self.clear()
+
+    def clear(self):
+        self.data = {column: [] for column in self.columns}
+        self.column_lists = [self.data[column] for column in self.columns]
+
+    def __len__(self):
+        return len(self.column_lists[0])
+
+    def append(self, *values):
+        for column_list, value in zip(self.column_lists, values):
+            column_list.append(value)
+
+    def column(self, name):
+        return self.data[name]
+
+    def row(self, index):
+        return tuple(column_list[index] for column_list in self.column_lists)
+
+
+class VirtualTable:
+    """
+    A ttk.Treeview that only materializes the rows currently visible.
+
+    The Treeview holds a fixed pool of `height` items whose values are rewritten when the view
+    scrolls, so loading, scrolling and clearing cost the same for 100 or 10 million rows.
+    The vertical scrollbar and the mouse wheel move over the rows of the store, not over the
+    Treeview items.
+    """
+
+    def __init__(self, parent, columns, store, format_row, height=20, item_tags=()):
+        """
+        :param parent: Frame holding the table and its scrollbars.
+        :param columns: Column identifiers of the Treeview.
+        :param store: ColumnStore with the rows.
+        :param format_row: Callable(index, row) returning the display values of a row.
+        :param height: Number of visible rows.
+        :param item_tags: Tags of the Treeview items (e.g. for fonts).
+        """
+        self.store = store
+        self.format_row = format_row
+        self.height = height
+        self.first_row = 0
+
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", height=height)
+
+        # The vertical scrollbar drives the virtual view; the horizontal one scrolls the Treeview itself
+        self.v_scroll = tk.Scrollbar(parent, orient="vertical", command=self.yview)
+        self.h_scroll = tk.Scrollbar(parent, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.h_scroll.set)
+
+        # Mouse wheel on Windows/macOS and on X11
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-1))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(1))
+
+        # Pool of items reused for the visible rows, detached while there are fewer rows than items
+        self.items = [self.tree.insert("", "end", values=(), tags=item_tags) for _ in range(height)]
+        self.attached_count = height
+        self.refresh()
+
+    def pack(self, **options):
+        self.v_scroll.pack(side="right", fill="y")
+        self.h_scroll.pack(side="bottom", fill="x")
+        self.tree.pack(**options)
+
+    def max_first_row(self):
+        return max(len(self.store) - self.height, 0)
+
+    def yview(self, *args):
+        """
+        Command of the vertical scrollbar ('moveto', fraction) or ('scroll', number, 'units'|'pages').
+        """
+        if args[0] == "moveto":
+            self.first_row = int(float(args[1]) * len(self.store))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.first_row += step * self.height if args[2] == "pages" else step
+        self.refresh()
+
+    def scroll(self, rows):
+        self.first_row += rows
+        self.refresh()
+
+    def see(self, index):
+        """
+        Scroll so that the row at index is visible.
+        """
+        if index < self.first_row:
+            self.first_row = index
+        elif index >= self.first_row + self.height:
+            self.first_row = index - self.height + 1
+        self.refresh()
+
+    def refresh(self):
+        """
+        Show the rows of the store from first_row on. Call after the store changed.
+        """
+        row_count = len(self.store)
+        self.first_row = min(max(self.first_row, 0), self.max_first_row())
+        visible_count = min(self.height, row_count - self.first_row)
+
+        # Attach or detach pool items so the Treeview has exactly one item per visible row
+        if visible_count != self.attached_count:
+            for position, item in enumerate(self.items):
+                if position < visible_count:
+                    self.tree.move(item, "", position)
+                else:
+                    self.tree.detach(item)
+            self.attached_count = visible_count
+
+        for position in range(visible_count):
+            index = self.first_row + position
+            self.tree.item(self.items[position], values=self.format_row(index, self.store.row(index)))
+
+        if row_count:
+            self.v_scroll.set(self.first_row / row_count, (self.first_row + visible_count) / row_count)
+        else:
+            self.v_scroll.set(0.0, 1.0)
+
+    def clear(self):
+        """
+        Remove all the rows.
+        """
+        self.store.clear()
+        self.first_row = 0
+        self.refresh()
+
+
+def main():
+    # Browse a million rows
+    root = tk.Tk()
+    root.title("Virtual Table")
+    frame = tk.Frame(root)
+    frame.pack(fill="both", expand=True)
+
+    store = ColumnStore(("tweet", "length"))
+    for i in range(1000000):
+        store.append(f"Tweet {i}", i % 140)
+
+    table = VirtualTable(frame, ("Row", "Tweet", "Length"), store,
+                         lambda index, row: (index + 1,) + row)
+    for column in ("Row", "Tweet", "Length"):
+        table.tree.heading(column, text=column)
+    table.pack(fill="both", expand=True)
+    table.refresh()
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
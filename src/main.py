@@ -1,14 +1,15 @@
 import tkinter as tk
 from tkinter import scrolledtext
-from EmojiCounter import count_emojis
+from tkinter import ttk
 from EmojiSentimentScoreCalculator import calculate_sentiment_scores
-from SentimentFeatureExtractor import SentimentFeatureExtractor
-from TextPreprocessor import TextPreprocessor
+from PipelineWorker import PipelineWorker
 from Configuration import Configuration
 
 class SentimentAnalysisApp:
-    def __init__(self, root):
+    def __init__(self, root, bundle=None):
         self.root = root
+        # Directory of a ModelBundle the analysis starts from (None reads the xlsx and txt files)
+        self.bundle = bundle
         self.root.title("Sentiment Analysis for Arabic Tweets")
 
         # Set window to full screen (or dynamically fit it based on screen size)
@@ -17,6 +18,9 @@ class SentimentAnalysisApp:
         # Make the window resizable
         self.root.resizable(True, True)
 
+        # Background PipelineWorker of the current analysis
+        self.worker = None
+
         # Create a frame to hold everything
         self.main_frame = tk.Frame(self.root)
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -59,9 +63,19 @@ class SentimentAnalysisApp:
         self.analyze_button = tk.Button(self.main_frame, text="Analyze Tweets", command=self.analyze_tweets, font=("Arial", 12))
         self.analyze_button.grid(row=6, column=0, columnspan=2, pady=10)
 
+        # Adding a progress bar, throughput readout and cancel button for the background analysis
+        self.progress_bar = ttk.Progressbar(self.main_frame, orient="horizontal", mode="determinate")
+        self.progress_bar.grid(row=7, column=0, padx=10, pady=5, sticky='ew')
+
+        self.progress_label = tk.Label(self.main_frame, text="0 / 0 tweets, 0.0 tweets/sec", font=("Arial", 12))
+        self.progress_label.grid(row=7, column=1, pady=5, sticky='w')
+
+        self.cancel_button = tk.Button(self.main_frame, text="Cancel", command=self.cancel_analysis, font=("Arial", 12), state=tk.DISABLED)
+        self.cancel_button.grid(row=8, column=0, columnspan=2, pady=10)
+
         # Adding a close button to quit the app
         self.quit_button = tk.Button(self.main_frame, text="Close", command=self.close_app, font=("Arial", 12))
-        self.quit_button.grid(row=7, column=0, columnspan=2, pady=10)
+        self.quit_button.grid(row=9, column=0, columnspan=2, pady=10)
 
         # Handle window close event
         self.root.protocol("WM_DELETE_WINDOW", self.close_app)
@@ -69,10 +83,6 @@ class SentimentAnalysisApp:
     def analyze_tweets(self):
         # Sample tweets 
         tweets = Configuration.fetch_tweets()
-        extractor = SentimentFeatureExtractor()
-
-        total_positive_emojis = {}
-        total_negative_emojis = {}
 
         # Clear previous output
         self.output_text.delete(1.0, tk.END)
@@ -80,45 +90,62 @@ class SentimentAnalysisApp:
         self.negative_emojis_text.delete(1.0, tk.END)
         self.sentiment_scores_text.delete(1.0, tk.END)
 
-        # Process each tweet
-        for tweet in tweets:
-            # Algorithm 1 Enhanced Preprocess Arabic Tweets for Sentiment Analysis
-            processed_text = TextPreprocessor.preprocess_text(tweet)
-
-            # Display processed text in the scrolled text widget
-            self.output_text.insert(tk.END, f"Processed Text: {processed_text}\n\n")
-
-            # Extract features from the tweet using SentimentFeatureExtractor
-            feature_vector = extractor.extract_features_from_tweet(processed_text)
-            self.output_text.insert(tk.END, f"Feature Vector: {feature_vector.to_one_line()}\n\n")
-
-            # Algorithm 3 Counting Emoji Occurrences
-            # Use the output from Feature Extraction (Algorithm 2) for Emoji Counting (Algorithm 3)
-            positive_emojis, negative_emojis = count_emojis(feature_vector, extractor)
-
-            # Aggregate positive emojis
-            for emoji, count in positive_emojis.items():
-                if emoji in total_positive_emojis:
-                    total_positive_emojis[emoji] += count
-                else:
-                    total_positive_emojis[emoji] = count
-
-            # Aggregate negative emojis
-            for emoji, count in negative_emojis.items():
-                if emoji in total_negative_emojis:
-                    total_negative_emojis[emoji] += count
-                else:
-                    total_negative_emojis[emoji] = count
-
+        # Process the tweets in a background thread so the window stays responsive
+        self.worker = PipelineWorker(tweets, bundle=self.bundle)
+        self.progress_bar.config(maximum=max(self.worker.total_count, 1), value=0)
+        self.analyze_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.worker.start()
+        self.worker.poll(self.root, self.display_results, self.analysis_finished, self.analysis_cancelled, self.analysis_failed)
+
+    def display_results(self, results):
+        # Batches still queued when the analysis was cancelled are dropped
+        if self.worker.cancel_event.is_set():
+            return
+
+        # Display the processed text and feature vector of a batch of tweets in one insert
+        lines = []
+        for tweet, processed_text, feature_vector, positive_emojis, negative_emojis in results:
+            lines.append(f"Processed Text: {processed_text}\n\n")
+            lines.append(f"Feature Vector: {feature_vector.to_one_line()}\n\n")
+        self.output_text.insert(tk.END, "".join(lines))
+        self.update_progress()
+
+    def update_progress(self):
+        self.progress_bar.config(value=self.worker.processed_count)
+        self.progress_label.config(text=f"{self.worker.processed_count} / {self.worker.total_count} tweets, "
+                                        f"{self.worker.tweets_per_second():.1f} tweets/sec")
+
+    def analysis_finished(self, pipeline, summary):
         # Display the aggregated positive and negative emojis
-        self.display_emoji_counts(total_positive_emojis, self.positive_emojis_text)
-        self.display_emoji_counts(total_negative_emojis, self.negative_emojis_text)
+        self.display_emoji_counts(pipeline.total_positive_emojis, self.positive_emojis_text)
+        self.display_emoji_counts(pipeline.total_negative_emojis, self.negative_emojis_text)
 
         # Calculate sentiment scores
-        emoji_sentiment_scores = calculate_sentiment_scores(total_positive_emojis, total_negative_emojis)
+        emoji_sentiment_scores = calculate_sentiment_scores(pipeline.total_positive_emojis, pipeline.total_negative_emojis)
 
         # Display emoji sentiment scores
         self.display_sentiment_scores(emoji_sentiment_scores)
+        self.end_analysis()
+
+    def analysis_cancelled(self, processed_count):
+        self.output_text.insert(tk.END, f"Analysis cancelled after {processed_count} tweets.\n")
+        self.end_analysis()
+
+    def analysis_failed(self, error):
+        self.output_text.insert(tk.END, f"An error occurred: {error}\n")
+        self.end_analysis()
+
+    def end_analysis(self):
+        self.update_progress()
+        self.analyze_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def cancel_analysis(self):
+        # Ask the background worker to stop after the current tweet
+        if self.worker and self.worker.is_running():
+            self.worker.cancel()
+            self.cancel_button.config(state=tk.DISABLED)
 
     def display_emoji_counts(self, emoji_counts, text_widget):
         """Helper function to display emoji counts in the provided text widget"""
@@ -131,21 +158,26 @@ class SentimentAnalysisApp:
             self.sentiment_scores_text.insert(tk.END, f"{emoji}: {score:.2f}\n")
 
     def close_app(self):
-        # Close the application
+        # Stop a running analysis and close the application
+        self.cancel_analysis()
         self.root.quit()
 
 
 # Main function to run the application
-def main():
+def main(bundle=None):
     # Create a Tkinter window
     root = tk.Tk()
 
     # Create an instance of the SentimentAnalysisApp
-    app = SentimentAnalysisApp(root)
+    app = SentimentAnalysisApp(root, bundle)
 
     # Run the Tkinter event loop
     root.mainloop()
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyze the sentiment of Arabic tweets.")
+    parser.add_argument('--bundle', default=None, help="Directory of a ModelBundle")
+    main(parser.parse_args().bundle)
@@ -0,0 +1,8 @@
+# Run the tests like the scripts: modules imported from src/ and data paths relative to the repository root
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.chdir(ROOT)
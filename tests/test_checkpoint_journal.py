@@ -0,0 +1,88 @@
+import csv
+import os
+import shutil
+
+import pytest
+
+import Application_LV
+from Configuration import Configuration
+from ReportSinks import TABLE_FILE_NAMES, CsvSink
+
+
+@pytest.fixture
+def reports(tmp_path, monkeypatch):
+    """
+    Write the reports of Application_LV.main as CSV under tmp_path and return the list of their tables.
+    """
+    tables = []
+
+    def create_sink(report_format='xlsx', output_path=None, **options):
+        output_path = str(tmp_path / f"report_{len(tables)}")
+        tables.append(output_path)
+        return CsvSink(output_path, **options)
+
+    monkeypatch.setattr(Application_LV, 'create_sink', create_sink)
+    return tables
+
+
+def read_report(output_path):
+    """
+    :return: Dictionary of table -> rows. The report keeps the input order, the other tables are sorted.
+    """
+    report = {}
+    for table, file_name in TABLE_FILE_NAMES.items():
+        with open(os.path.join(output_path, f"{file_name}.csv"), 'r', encoding='utf-8', newline='') as file:
+            rows = list(csv.reader(file))
+        report[table] = rows if table == 'report' else sorted(rows)
+    return report
+
+
+@pytest.fixture
+def tweets_file(tmp_path):
+    # The sample file has no newline after its last tweet
+    file_name = str(tmp_path / "tweets.txt")
+    shutil.copyfile(Configuration.FileName.tweets, file_name)
+    with open(file_name, 'rb') as file:
+        assert not file.read().endswith(b'\n')
+    return file_name
+
+
+def run(file_name, journal=None, final=False):
+    Application_LV.main(file_name, chunk_size=50, journal=journal, checkpoint_interval=0, final=final)
+
+
+def test_resumed_and_appended_run_equals_plain_run(tmp_path, reports, tweets_file):
+    run(tweets_file)
+    expected = read_report(reports[-1])
+
+    # First run over the beginning of the file, cut inside a multi-byte character of a line
+    with open(tweets_file, 'rb') as file:
+        data = file.read()
+    cut = data.index(b'\n', len(data) // 2) + 2
+    assert data[cut] & 0xC0 == 0x80
+    with open(tweets_file, 'wb') as file:
+        file.write(data[:cut])
+    journal = str(tmp_path / "journal")
+    run(tweets_file, journal)
+    partial = read_report(reports[-1])['report']
+    assert len(partial) - 1 == data[:cut].count(b'\n')
+
+    # Second run over the appended rest of the file
+    with open(tweets_file, 'ab') as file:
+        file.write(data[cut:])
+    run(tweets_file, journal, final=True)
+    assert read_report(reports[-1]) == expected
+
+
+def test_unterminated_tail_is_left_for_the_next_run(tmp_path, reports, tweets_file, capsys):
+    run(tweets_file)
+    expected = read_report(reports[-1])
+    tweet_count = len(expected['report']) - 1
+
+    journal = str(tmp_path / "journal")
+    run(tweets_file, journal)
+    assert len(read_report(reports[-1])['report']) - 1 == tweet_count - 1
+    assert "has no terminating newline yet" in capsys.readouterr().out
+
+    run(tweets_file, journal, final=True)
+    assert read_report(reports[-1]) == expected
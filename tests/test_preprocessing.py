@@ -0,0 +1,37 @@
+import pytest
+
+from Configuration import Configuration
+from EmojiExtractor import EmojiExtractor
+from TextPreprocessor import PreprocessorPipeline, TextPreprocessor
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    return PreprocessorPipeline()
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return EmojiExtractor.from_lexicon(Configuration.fetch_setting(Configuration.SheetName.emoji_sentiment_lexicon))
+
+
+@pytest.mark.parametrize('tweet, emoji', [
+    ('سعيد 👨‍👩‍👧 جدا', '👨‍👩‍👧'),
+    ('مصر 🇪🇬 حلوة', '🇪🇬'),
+    ('اسكتلندا 🏴\U000E0067\U000E0062\U000E0073\U000E0063\U000E0074\U000E007F', '🏴\U000E0067\U000E0062\U000E0073\U000E0063\U000E0074\U000E007F'),
+])
+def test_emoji_sequences_survive_preprocessing(pipeline, extractor, tweet, emoji):
+    assert extractor.extract(pipeline.preprocess_text(tweet)) == [emoji]
+    assert extractor.extract(TextPreprocessor.preprocess_text(tweet)) == [emoji]
+
+
+def test_orphan_emoji_modifiers_are_removed(pipeline):
+    # The VS16 of the removed '‼️' must not stick to the word
+    assert pipeline.preprocess_text('حلو‼️ جدا') == TextPreprocessor.preprocess_text('حلو‼️ جدا')
+    assert '\ufe0f' not in pipeline.preprocess_text('حلو‼️ جدا')
+
+
+def test_pipeline_matches_step_by_step_preprocessing(pipeline):
+    tweets = Configuration.fetch_tweets()[:200] + ['❤️ #حب_كبير 123 abc \u200d😀', '\ufe0f\u200d🇪 ـًسعيد']
+    for tweet in tweets:
+        assert pipeline.preprocess_text(tweet) == TextPreprocessor.preprocess_text(tweet)
@@ -0,0 +1,75 @@
+import asyncio
+
+from ScoringServer import ScoringServer, request
+
+
+def run_with_server(test, **options):
+    """
+    Start a ScoringServer on a free localhost port, run the coroutine function test(server) and stop the server.
+    """
+    async def main():
+        server = await ScoringServer(port=0, **options).start()
+        try:
+            return await test(server)
+        finally:
+            await server.stop()
+
+    return asyncio.run(main())
+
+
+def test_score_tweets():
+    async def test(server):
+        status, payload = await request('POST', '/score', {'tweet': "أنا سعيد جدا 😊"}, port=server.port)
+        assert status == 200
+        assert payload['tweet'] == "أنا سعيد جدا 😊"
+        assert payload['feature_vector']['emojis'] == ['😊']
+
+        status, payload = await request('POST', '/score', {'tweets': ["سعيد 😊", "غاضب 😡"]}, port=server.port)
+        assert status == 200
+        assert [result['tweet'] for result in payload['results']] == ["سعيد 😊", "غاضب 😡"]
+
+    run_with_server(test)
+
+
+def test_invalid_requests():
+    async def test(server):
+        assert (await request('POST', '/score', {'text': "سعيد"}, port=server.port))[0] == 400
+        assert (await request('POST', '/score', {'tweets': ["سعيد", 1]}, port=server.port))[0] == 400
+        assert (await request('GET', '/score', port=server.port))[0] == 405
+        assert (await request('POST', '/health', port=server.port))[0] == 405
+        assert (await request('GET', '/unknown', port=server.port))[0] == 404
+
+    run_with_server(test)
+
+
+def test_request_larger_than_the_queue_is_rejected_with_413():
+    async def test(server):
+        status, payload = await request('POST', '/score', {'tweets': ["سعيد"] * 5}, port=server.port)
+        assert status == 413
+        assert "At most 4 tweets" in payload['error']
+        assert (await request('POST', '/score', {'tweets': ["سعيد"] * 4}, port=server.port))[0] == 200
+
+    run_with_server(test, max_queue=4)
+
+
+def test_full_queue_is_rejected_with_503():
+    async def test(server):
+        # Stop taking tweets out of the queue and fill it
+        batcher = server.batcher
+        batcher.collector.cancel()
+        await asyncio.gather(batcher.collector, return_exceptions=True)
+        batcher.collector = None
+        batcher.submit(["سعيد", "غاضب"])
+
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        body = '{"tweet": "سعيد"}'.encode('utf-8')
+        writer.write(b"POST /score HTTP/1.1\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body))
+        response = await reader.read()
+        writer.close()
+        head = response.partition(b'\r\n\r\n')[0].decode('latin-1')
+        assert head.startswith("HTTP/1.1 503")
+        assert "Retry-After: 1" in head
+        assert server.stats()['rejected'] == 1
+
+    run_with_server(test, max_queue=2)